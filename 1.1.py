@@ -1,101 +1,40 @@
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-import re
+from popup_guard import PopupGuard
+from selector_race import click_first_anywhere, list_item_strategies
+from run_profile import current_profile
+from waits import wait_any, wait_dom_settled, wait_url_change, print_wait_summary
 
 def click_lax_anywhere(page) -> bool:
-    """嘗試用多種方式點擊『洛杉磯』選項；包含主頁、所有 iframe，以及 JS 兜底。"""
-    candidates = [
-        # 依你提供的結構：li > span
-        lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text="洛杉磯")),
-        # ARIA role
-        lambda ctx: ctx.get_by_role("listitem", name=re.compile(r"^\s*洛杉磯\s*$")),
-        # 直接用文字（可能抓到 span）
-        lambda ctx: ctx.get_by_text("洛杉磯", exact=True),
-        # XPath（針對 li[span[text()='洛杉磯']]）
-        lambda ctx: ctx.locator("xpath=//li[span[normalize-space()='洛杉磯']]"),
-        # 再保險：先找到 span 再往上找 li
-        lambda ctx: ctx.locator("span:has-text('洛杉磯')"),
-    ]
+    """在主頁 + 所有 iframe 點『洛杉磯』選項（策略競速 + JS 兜底，見 selector_race.click_first_anywhere）。"""
+    return click_first_anywhere(page, list_item_strategies("洛杉磯"), timeout=5000,
+                                fallback_text="洛杉磯", key="click_lax")
 
-    def try_click_on_ctx(ctx) -> bool:
-        for build in candidates:
-            try:
-                loc = build(ctx).first
-                loc.wait_for(state="visible", timeout=5000)
-                # 若抓到的是 span，就往上找到最近的 li
-                try:
-                    tag = loc.evaluate("el => el.tagName.toLowerCase()")
-                    if tag == "span":
-                        loc = loc.locator("xpath=ancestor::li[1]")
-                except Exception:
-                    pass
 
-                loc.scroll_into_view_if_needed()
-                # 先一般 click，不行就強制
-                try:
-                    loc.click()
-                except Exception:
-                    loc.click(force=True)
-                return True
-            except Exception:
-                continue
-        return False
-
-    # 1) 先在主頁面試
-    if try_click_on_ctx(page):
-        return True
-
-    # 2) 再到所有 iframe 試（有些站把卡片/推薦清單放在 iframe）
-    for frame in page.frames:
-        if frame == page.main_frame:
-            continue
-        if try_click_on_ctx(frame):
-            return True
-
-    # 3) 最後用 JS 兜底（直接找到文字等於『洛杉磯』的 span，點它的最近 li）
-    js = """
-    const nodes = Array.from(document.querySelectorAll('li span'));
-    const el = nodes.find(n => (n.textContent || '').trim() === '洛杉磯');
-    if (el) {
-        const li = el.closest('li');
-        if (li) {
-            li.click();
-            return true;
-        }
-    }
-    return false;
-    """
-    try:
-        ok = page.evaluate(js)
-        return bool(ok)
-    except Exception:
-        return False
-
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    page = browser.new_page()
+# 帶入上次保存的 cookies/localStorage：同意過的 cookie 橫幅、首次造訪導轉都不會再出現
+# 預設 headless；加 --debug（或 SCRAPER_PROFILE=debug）才開視窗、放慢並錄 trace
+with current_profile().lease(trace_name="eztravel_packages", state_site="packages.eztravel.com.tw") as page:
+    # cookie/彈窗一出現就自動關掉，避免遮擋（不必逐一試按鈕）
+    guard = PopupGuard(log=print).install(page)
     page.goto("https://packages.eztravel.com.tw/", timeout=60000, wait_until="domcontentloaded")
 
-    # 可能的 cookie/彈窗先關掉，避免遮擋
-    for txt in ["同意", "接受", "我知道了", "關閉"]:
-        try:
-            page.get_by_role("button", name=txt).click(timeout=2000)
-            break
-        except Exception:
-            pass
-
     # 有些頁面要先打開「目的地」分頁/區塊才看得到清單（可忽略失敗）
     try:
         page.get_by_text("目的地", exact=False).click(timeout=2000)
     except Exception:
         pass
 
-    # 等待清單載入一下
-    page.wait_for_timeout(1500)
+    # 等清單出現（有『洛杉磯』字樣即可），再等 DOM 安靜下來
+    wait_any(page, ["text=洛杉磯", "li span"], timeout=5000, label="目的地清單")
+    wait_dom_settled(page, label="清單渲染")
+    guard.disarm()  # 首頁載入完成，之後的浮層交給流程自己處理
 
+    start_url = page.url
     success = click_lax_anywhere(page)
     if not success:
         print("找不到或無法點擊『洛杉磯』，可能在隱藏分頁/滾動區塊/iframe。請確認清單是否需要先滑動或切換分頁。")
+    else:
+        # 點擊結果：等跳到洛杉磯頁面並渲染完成
+        wait_url_change(page, start_url, timeout=15000, label="跳轉目的地頁")
+        wait_dom_settled(page, quiet_ms=500, timeout=15000, label="目的地頁渲染")
 
-    page.wait_for_timeout(10000)  # 觀察點擊結果
-    browser.close()
+    guard.report()
+    print_wait_summary()
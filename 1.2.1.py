@@ -8,6 +8,12 @@ import re
 import time
 from playwright.sync_api import sync_playwright
 
+from popup_guard import PopupGuard
+from run_profile import current_profile
+from waits import wait_dom_settled, wait_url_change, print_wait_summary
+
+PROFILE = current_profile()   # --debug / SCRAPER_PROFILE=debug 才開視窗、放慢、錄 trace
+
 def log(msg: str):
     """簡易時間戳記 logger（用 print，符合你的需求）。"""
     print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
@@ -46,29 +52,26 @@ def click_lax(page) -> bool:
 
 with sync_playwright() as p:
     log("啟動 Playwright")
-    browser = p.chromium.launch(headless=False)
-    log("已啟動 Chromium（headless=False）")
+    browser = p.chromium.launch(**PROFILE.launch_options())
+    log(f"已啟動 Chromium（設定檔={PROFILE.name}，headless={PROFILE.headless}）")
 
     # 調大 viewport，避免 RWD 把元素藏起來
     page = browser.new_page(viewport={"width": 1440, "height": 900})
+    PROFILE.attach(page.context)
     log("開新分頁並設定 viewport=1440x900")
 
+    # 彈窗守衛：cookie/公告一出現就自動按掉
+    guard = PopupGuard(log=log).install(page)
+
     url = "https://packages.eztravel.com.tw/"
     log(f"前往 {url}")
     page.goto(url, timeout=60000, wait_until="domcontentloaded")
     log("頁面主結構載入完成 (domcontentloaded)")
 
-    # 等待一點點，讓熱門區塊有機會載入
-    page.wait_for_timeout(1200)
-    log("稍等 1.2 秒，讓動態區塊出現")
-
-    # 嘗試關閉可能的彈窗（cookie/公告）
-    log("嘗試關閉可能的彈窗（cookies/公告）")
-    try:
-        page.get_by_role("button", name="接受").click(timeout=1200)
-        log("已點擊彈窗按鈕：接受")
-    except Exception:
-        log("沒有偵測到可關閉的『接受』彈窗按鈕")
+    # 等熱門區塊渲染完（DOM 不再變動），不再固定等 1.2 秒
+    wait_dom_settled(page, label="熱門區塊")
+    log("動態區塊已穩定")
+    guard.disarm()  # 首頁載入完成，之後的浮層交給流程自己處理
 
     # 有些網站會把熱門目的地放在分頁或折疊區塊，先試著打開（本次 LOG 有執行，先保留）
     log("嘗試打開『目的地/熱門目的地』區塊（若無則略過）")
@@ -81,20 +84,26 @@ with sync_playwright() as p:
     # 往下捲一下，避免元素在視窗外
     try:
         page.mouse.wheel(0, 500)
-        page.wait_for_timeout(300)
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label="滾動後載入")
         log("已向下滾動 500 像素")
     except Exception:
         log("滾動失敗（可忽略）")
 
     log("開始執行點擊『洛杉磯』")
+    start_url = page.url
     success = click_lax(page)
     if success:
         log("🎉 全流程成功：已嘗試點擊『洛杉磯』")
+        # 以 URL 變更 + DOM 穩定判斷點擊結果，取代固定觀察 20 秒
+        if wait_url_change(page, start_url, timeout=15000, label="跳轉目的地頁"):
+            log(f"已跳轉：{page.url}")
+        wait_dom_settled(page, quiet_ms=500, timeout=15000, label="目的地頁渲染")
     else:
         log("⚠ 未成功點擊『洛杉磯』，可能在隱藏分頁/滾動容器，或需先觸發其他 UI")
 
-    # 観察一下結果（正式自動化可改為等待條件，如 URL 或欄位值變更）
-    page.wait_for_timeout(20000)
+    guard.report(log)
+    print_wait_summary(log)
+    PROFILE.detach(page.context, "eztravel_lax")
     log("關閉瀏覽器")
     browser.close()
     log("流程結束")
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
-import re, os, time
+import re, time
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.sync_api import sync_playwright
+
+from popup_guard import PopupGuard
+from run_profile import current_profile
+from waits import wait_any, wait_dom_settled, wait_url_change, print_wait_summary
+
+PROFILE = current_profile()   # --debug / SCRAPER_PROFILE=debug 才開視窗、放慢、錄 trace
 
 def log(msg: str):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
@@ -28,13 +34,11 @@ def wait_new_search_bar(page):
         "text=去程",
         "text=回程",
     ]
-    for sel in candidates:
-        try:
-            page.wait_for_selector(sel, timeout=8000)
-            log(f"  - 新頁面搜尋條偵測到：{sel}")
-            return True
-        except PWTimeout:
-            continue
+    # 全部候選同時等，任一出現即通過（原本逐一等，最差要 5 x 8 秒）
+    hit = wait_any(page, candidates, timeout=8000, label="新頁面搜尋條")
+    if hit:
+        log(f"  - 新頁面搜尋條偵測到：{hit}")
+        return True
     log("  ✖ 等待新頁面搜尋條逾時（但可能仍已載入，繼續嘗試）")
     return False
 
@@ -85,7 +89,7 @@ def safe_fill_date(page, label: str, want: str) -> bool:
         page.keyboard.press("Delete")
         loc.fill(want)
         page.keyboard.press("Enter")
-        time.sleep(0.2)
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label=f"{label}日期")
     except Exception as e:
         log(f"  - {label} fill() 失敗：{e.__class__.__name__}，改用 JS 兜底")
         try:
@@ -126,33 +130,33 @@ def safe_fill_date(page, label: str, want: str) -> bool:
 
 def take_final_screenshots(page):
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    os.makedirs("screenshots", exist_ok=True)
+    if not PROFILE.screenshots:
+        log(f"略過截圖（{PROFILE.name} 設定檔不截圖）")
+        return
     vp = f"screenshots/eztravel_viewport_{ts}.png"
     fp = f"screenshots/eztravel_fullpage_{ts}.png"
-    log("擷取截圖（可視區）"); page.screenshot(path=vp); log(f"  ✅ {vp}")
-    log("擷取截圖（整頁）");   page.screenshot(path=fp, full_page=True); log(f"  ✅ {fp}")
+    log("擷取截圖（可視區）"); PROFILE.screenshot(page, vp); log(f"  ✅ {vp}")
+    log("擷取截圖（整頁）");   PROFILE.screenshot(page, fp, full_page=True); log(f"  ✅ {fp}")
 
 with sync_playwright() as p:
     log("啟動 Playwright")
-    browser = p.chromium.launch(headless=False)
-    log("已啟動 Chromium（headless=False）")
+    browser = p.chromium.launch(**PROFILE.launch_options())
+    log(f"已啟動 Chromium（設定檔={PROFILE.name}，headless={PROFILE.headless}）")
     page = browser.new_page(viewport={"width": 1440, "height": 900})
+    PROFILE.attach(page.context)
     log("開新分頁並設定 viewport=1440x900")
 
+    # 彈窗守衛：cookie/公告一出現就自動按掉
+    guard = PopupGuard(log=log).install(page)
+
     url = "https://packages.eztravel.com.tw/"
     log(f"前往 {url}")
     page.goto(url, timeout=60000, wait_until="domcontentloaded")
     log("頁面主結構載入完成 (domcontentloaded)")
 
-    page.wait_for_timeout(1200)
-    log("稍等 1.2 秒，讓動態區塊出現")
-
-    log("嘗試關閉可能的彈窗（cookies/公告）")
-    try:
-        page.get_by_role("button", name="接受").click(timeout=1500)
-        log("已點擊彈窗按鈕：接受")
-    except Exception:
-        log("沒有偵測到可關閉的『接受』彈窗按鈕")
+    wait_dom_settled(page, label="首頁動態區塊")
+    log("動態區塊已穩定")
+    guard.disarm()  # 首頁載入完成；之後的日曆也是浮層、也有「確定」，不能再讓守衛按
 
     # 1) 先點『洛杉磯』，讓站方完成路由與搜尋條初始化
     if not click_lax(page):
@@ -171,17 +175,21 @@ with sync_playwright() as p:
 
         # 4) 點擊搜尋
         log("嘗試點擊『搜尋』按鈕")
+        search_url = page.url
         try:
             page.locator("button.ez-btn.search-lg", has_text="搜尋").click(timeout=3000)
             log("✅ 已點擊『搜尋』按鈕")
+            wait_url_change(page, search_url, timeout=15000, label="跳轉結果頁")
         except Exception as e:
             log(f"✖ 點擊搜尋按鈕失敗：{e.__class__.__name__}")
 
-    # 截圖
-    page.wait_for_timeout(10000)
+    # 截圖：等畫面真的不再變動再拍（取代固定 10 秒）
+    wait_dom_settled(page, quiet_ms=500, timeout=15000, label="截圖前")
     take_final_screenshots(page)
 
-    page.wait_for_timeout(1500)
+    guard.report(log)
+    print_wait_summary(log)
+    PROFILE.detach(page.context, "eztravel_search")
     log("關閉瀏覽器")
     browser.close()
     log("流程結束")
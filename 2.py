@@ -1,15 +1,16 @@
-from playwright.sync_api import sync_playwright
-import os
+from run_profile import current_profile
+
+PROFILE = current_profile()
 
 
 def shot(page, name):
-    os.makedirs("debug", exist_ok=True)
-    page.screenshot(path=f"debug/{name}.png", full_page=True)
+    # 只有 debug 設定檔會真的截圖
+    PROFILE.screenshot(page, f"debug/{name}.png", full_page=True)
 
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False, slow_mo=300)
-    page = browser.new_page()
+# 帶入上次保存的 cookies/localStorage（storage_state.py），歸還分頁時存回
+# headless / slow_mo / tracing 依執行設定檔（--debug 才開視窗、每步放慢 300ms）
+with PROFILE.lease(trace_name="eztravel", state_site="www.eztravel.com.tw") as page:
     page.set_default_timeout(30000)  # 增加預設超時時間
 
     # =====================
@@ -126,6 +127,6 @@ with sync_playwright() as p:
     print("🔹 已進入訂單確認頁")
     shot(page, "10_checkout_page")
 
-    # 暫停程式，手動確認
-    input("🔹 按 Enter 鍵結束程式並關閉瀏覽器...")
-    browser.close()
+    # 暫停程式，手動確認（headless 時沒有人看，不等）
+    if not PROFILE.headless:
+        input("🔹 按 Enter 鍵結束程式並關閉瀏覽器...")
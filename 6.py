@@ -1,9 +1,9 @@
-from playwright.sync_api import sync_playwright
-import requests
+from run_profile import current_profile
+from http_session import get_session
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    page = browser.new_page()
+PROFILE = current_profile()
+
+with PROFILE.lease() as page:
     page.goto("https://rdc28.cwa.gov.tw/TDB/public/warning_typhoon_list/", timeout=60000)
 
     page.wait_for_selector("table")
@@ -32,12 +32,12 @@ with sync_playwright() as p:
 
     # ---- 下載圖片並存檔 ----
     if img_src:
-        img_data = requests.get(img_src).content
+        img_data = get_session().get(img_src).content
         with open("backup/typhoon_track.png", "wb") as f:
             f.write(img_data)
         print("✅ 圖片已儲存成 typhoon_track.png")
 
     # 停留 5 秒給你查看
-    new_page.wait_for_timeout(5000)
+    if not PROFILE.headless:  # headless 時沒有人看，不等
+        new_page.wait_for_timeout(5000)
 
-    browser.close()
@@ -4,128 +4,37 @@
 特色：每個關鍵步驟都 print log，方便你追流程與除錯。
 """
 
+import os
 import re
+import sys
 import time
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+from selector_race import click_first_anywhere, list_item_strategies
+
+PROFILE = current_profile()   # --debug / SCRAPER_PROFILE=debug 才開視窗、放慢、錄 trace
+
 def log(msg: str):
     """簡易時間戳記 logger（用 print，符合你的需求）。"""
     print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
 
 
 def click_lax_anywhere(page) -> bool:
-    """
-    在主頁 + 所有 iframe 逐一嘗試點擊『洛杉磯』。
-    - 多種定位策略（CSS/Role/Text/XPath/JS 兜底）
-    - 若抓到 <span>，會往上找到最近的 <li> 來點
-    - 一般 click 失敗時會退而求其次用 force=True
-    - 每個步驟都會印出 log
-    """
-    strategies = [
-        ("CSS :has 結構匹配 (li > span)",
-         lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text="洛杉磯"))),
-        ("ARIA Role=listitem + 名稱比對",
-         lambda ctx: ctx.get_by_role("listitem", name=re.compile(r"^\s*洛杉磯\s*$"))),
-        ("純文字比對（精確）",
-         lambda ctx: ctx.get_by_text("洛杉磯", exact=True)),
-        ("XPath: //li[span[normalize-space()='洛杉磯']]",
-         lambda ctx: ctx.locator("xpath=//li[span[normalize-space()='洛杉磯']]")),
-        ("先抓 span 再往上找最近 li",
-         lambda ctx: ctx.locator("span:has-text('洛杉磯')")),
-    ]
-
-    def try_click_on_ctx(ctx, ctx_name: str) -> bool:
-        log(f"在 {ctx_name} 嘗試點擊『洛杉磯』")
-        for i, (label, build) in enumerate(strategies, start=1):
-            try:
-                log(f"  策略 {i}: {label}")
-                loc = build(ctx).first
-
-                # 可選：看一下目前這個策略匹配到幾個節點（方便理解）
-                try:
-                    cnt = build(ctx).count()
-                    log(f"    - 匹配到 {cnt} 個候選元素")
-                except Exception:
-                    pass
-
-                loc.wait_for(state="visible", timeout=5000)
-                log("    - 元素可見，準備點擊")
-
-                # 如果拿到的是 span，就往上找 li 再點
-                try:
-                    tag = loc.evaluate("el => el.tagName.toLowerCase()")
-                    if tag == "span":
-                        log("    - 目前抓到的是 <span>，往上找最近的 <li>")
-                        loc = loc.locator("xpath=ancestor::li[1]")
-                except Exception:
-                    log("    - 無法確認節點標籤，直接點原元素")
-
-                # 確保在視口內，避免因為在可滾動容器外而點不到
-                loc.scroll_into_view_if_needed()
-                log("    - 已滾動到可視範圍")
-
-                # 先一般 click，不行再 force
-                try:
-                    loc.click()
-                    log("    ✅ 一般 click 成功")
-                except Exception as e:
-                    log(f"    - 一般 click 失敗：{e.__class__.__name__}，改用 force=True")
-                    loc.click(force=True)
-                    log("    ✅ force click 成功")
-
-                return True
-            except Exception as e:
-                log(f"    ✖ 策略失敗：{e.__class__.__name__}，換下一個策略")
-                continue
-        log(f"  所有策略在 {ctx_name} 都沒成功")
-        return False
-
-    # 1) 先在主頁面試
-    if try_click_on_ctx(page, "主頁面"):
-        return True
-
-    # 2) 再試所有 iframe
-    frames = [f for f in page.frames if f != page.main_frame]
-    log(f"準備嘗試所有 iframe（共 {len(frames)} 個）")
-    for idx, frame in enumerate(frames, start=1):
-        # 有些 frame.url 可能是空字串
-        log(f"- 進入 iframe #{idx}（URL: {getattr(frame, 'url', '') or '(空)'}）")
-        if try_click_on_ctx(frame, f"iframe #{idx}"):
-            return True
-
-    # 3) JS 兜底
-    log("前述策略都失敗，使用 JS 兜底")
-    js = """
-    const nodes = Array.from(document.querySelectorAll('li span'));
-    const el = nodes.find(n => (n.textContent || '').trim() === '洛杉磯');
-    if (el) {
-        const li = el.closest('li');
-        if (li) {
-            li.click();
-            return true;
-        }
-    }
-    return false;
-    """
-    try:
-        ok = page.evaluate(js)
-        if ok:
-            log("✅ JS 兜底點擊成功")
-        else:
-            log("✖ JS 兜底失敗，沒有找到符合條件的 span/li")
-        return bool(ok)
-    except Exception as e:
-        log(f"✖ JS evaluate 失敗：{e.__class__.__name__}")
-        return False
+    """在主頁 + 所有 iframe 點『洛杉磯』選項（策略競速 + JS 兜底，見 selector_race.click_first_anywhere）。"""
+    return click_first_anywhere(page, list_item_strategies("洛杉磯"), timeout=5000,
+                                fallback_text="洛杉磯", key="click_lax", log=log)
 
 
 with sync_playwright() as p:
     log("啟動 Playwright")
-    browser = p.chromium.launch(headless=False)
-    log("已啟動 Chromium（headless=False）")
+    browser = p.chromium.launch(**PROFILE.launch_options())
+    log(f"已啟動 Chromium（設定檔={PROFILE.name}，headless={PROFILE.headless}）")
 
     # 調大 viewport，避免 RWD 把元素藏起來
     page = browser.new_page(viewport={"width": 1440, "height": 900})
+    PROFILE.attach(page.context)
     log("開新分頁並設定 viewport=1440x900")
 
     url = "https://packages.eztravel.com.tw/"
@@ -176,8 +85,10 @@ with sync_playwright() as p:
     else:
         log("⚠ 仍未成功點擊『洛杉磯』，可能在隱藏分頁/滾動容器/跨網域 iframe，或需先觸發其他 UI")
 
-    # 観察一下結果（正式自動化可改為等待條件，如 URL 或欄位值變更）
-    page.wait_for_timeout(20000)
+    # 観察一下結果（正式自動化可改為等待條件，如 URL 或欄位值變更）；headless 時沒有人看，不等
+    if not PROFILE.headless:
+        page.wait_for_timeout(20000)
+    PROFILE.detach(page.context, "eztravel_lax")
     log("關閉瀏覽器")
     browser.close()
     log("流程結束")
@@ -12,10 +12,17 @@
 - 先 fill()，不行就以 JS 設值並觸發 input/change 事件
 """
 
-import re
+import os
+import sys
 import time
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+from selector_race import click_first_anywhere, list_item_strategies
+
+PROFILE = current_profile()   # --debug / SCRAPER_PROFILE=debug 才開視窗、放慢、錄 trace
+
 
 # ------------------- 基礎工具 -------------------
 
@@ -26,74 +33,9 @@ def log(msg: str):
 # ------------------- 點選「洛杉磯」 -------------------
 
 def click_lax_anywhere(page) -> bool:
-    """嘗試用多種方式點擊『洛杉磯』選項；包含主頁、所有 iframe，以及 JS 兜底。"""
-    candidates = [
-        # 依你提供的結構：li > span
-        lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text="洛杉磯")),
-        # ARIA role
-        lambda ctx: ctx.get_by_role("listitem", name=re.compile(r"^\s*洛杉磯\s*$")),
-        # 直接用文字（可能抓到 span）
-        lambda ctx: ctx.get_by_text("洛杉磯", exact=True),
-        # XPath（針對 li[span[text()='洛杉磯']]）
-        lambda ctx: ctx.locator("xpath=//li[span[normalize-space()='洛杉磯']]"),
-        # 再保險：先找到 span 再往上找 li
-        lambda ctx: ctx.locator("span:has-text('洛杉磯')"),
-    ]
-
-    def try_click_on_ctx(ctx) -> bool:
-        for build in candidates:
-            try:
-                loc = build(ctx).first
-                loc.wait_for(state="visible", timeout=5000)
-
-                # 若抓到的是 span，就往上找到最近的 li
-                try:
-                    tag = loc.evaluate("el => el.tagName.toLowerCase()")
-                    if tag == "span":
-                        loc = loc.locator("xpath=ancestor::li[1]")
-                except Exception:
-                    pass
-
-                loc.scroll_into_view_if_needed()
-                # 先一般 click，不行就強制
-                try:
-                    loc.click()
-                except Exception:
-                    loc.click(force=True)
-                return True
-            except Exception:
-                continue
-        return False
-
-    # 1) 先在主頁面試
-    if try_click_on_ctx(page):
-        return True
-
-    # 2) 再到所有 iframe 試（有些站把卡片/推薦清單放在 iframe）
-    for frame in page.frames:
-        if frame == page.main_frame:
-            continue
-        if try_click_on_ctx(frame):
-            return True
-
-    # 3) 最後用 JS 兜底（直接找到文字等於『洛杉磯』的 span，點它的最近 li）
-    js = """
-    const nodes = Array.from(document.querySelectorAll('li span'));
-    const el = nodes.find(n => (n.textContent || '').trim() === '洛杉磯');
-    if (el) {
-        const li = el.closest('li');
-        if (li) {
-            li.click();
-            return true;
-        }
-    }
-    return false;
-    """
-    try:
-        ok = page.evaluate(js)
-        return bool(ok)
-    except Exception:
-        return False
+    """在主頁 + 所有 iframe 點『洛杉磯』選項（策略競速 + JS 兜底，見 selector_race.click_first_anywhere）。"""
+    return click_first_anywhere(page, list_item_strategies("洛杉磯"), timeout=5000,
+                                fallback_text="洛杉磯", key="click_lax")
 
 
 # ------------------- 日期欄位：尋找與填寫 -------------------
@@ -223,8 +165,9 @@ def set_date_in_contexts(page, which: str, value: str, label: str) -> bool:
 if __name__ == "__main__":
     with sync_playwright() as p:
         log("啟動 Playwright")
-        browser = p.chromium.launch(headless=False)
+        browser = p.chromium.launch(**PROFILE.launch_options())
         page = browser.new_page(viewport={"width": 1440, "height": 900})
+        PROFILE.attach(page.context)
 
         url = "https://packages.eztravel.com.tw/"
         log(f"前往 {url}")
@@ -268,7 +211,9 @@ if __name__ == "__main__":
         else:
             log("⚠ 還是找不到/設不進日期；可能該頁是列表頁或日期在另一個分頁/表單或 Shadow DOM 中")
 
-        # 保留時間觀察結果
-        page.wait_for_timeout(50000)
+        # 保留時間觀察結果（headless 時不等）
+        if not PROFILE.headless:
+            page.wait_for_timeout(50000)
+        PROFILE.detach(page.context, "eztravel_dates")
         browser.close()
         log("流程結束")
@@ -14,10 +14,24 @@
 - 設完後讀取畫面上的「去程/回程」顯示文字做驗證，必要時重試
 """
 
+import os
 import re
+import sys
 import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from popup_guard import PopupGuard
+from run_profile import current_profile
+from selector_race import click_first_anywhere, list_item_strategies
+from storage_state import StorageStateStore
+from waits import wait_any, wait_dom_settled, wait_element_stable, wait_url_change, print_wait_summary
+
+PROFILE = current_profile()   # --debug / SCRAPER_PROFILE=debug 才開視窗、放慢、錄 trace
+
+# 日曆彈出面板（用來等面板動畫結束）
+CALENDAR_PANELS = ".flatpickr-calendar, .datepicker, .calendar, .date-picker, .rdp, [role='dialog']"
 
 # ------------------- 基礎工具 -------------------
 
@@ -47,57 +61,9 @@ def to_dt(s: str) -> datetime:
 # ------------------- 點選「洛杉磯」 -------------------
 
 def click_lax_anywhere(page) -> bool:
-    candidates = [
-        lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text="洛杉磯")),
-        lambda ctx: ctx.get_by_role("listitem", name=re.compile(r"^\s*洛杉磯\s*$")),
-        lambda ctx: ctx.get_by_text("洛杉磯", exact=True),
-        lambda ctx: ctx.locator("xpath=//li[span[normalize-space()='洛杉磯']]"),
-        lambda ctx: ctx.locator("span:has-text('洛杉磯')"),
-    ]
-
-    def try_click_on_ctx(ctx):
-        for build in candidates:
-            try:
-                loc = build(ctx).first
-                loc.wait_for(state="visible", timeout=4000)
-                try:
-                    tag = loc.evaluate("el => el.tagName?.toLowerCase && el.tagName.toLowerCase()")
-                    if tag == "span":
-                        loc = loc.locator("xpath=ancestor::li[1]") or loc
-                except Exception:
-                    pass
-                loc.scroll_into_view_if_needed()
-                try:
-                    loc.click()
-                except Exception:
-                    loc.click(force=True)
-                return True
-            except Exception:
-                continue
-        return False
-
-    if try_click_on_ctx(page):
-        return True
-    for fr in page.frames:
-        if fr == page.main_frame:
-            continue
-        if try_click_on_ctx(fr):
-            return True
-
-    # JS 兜底
-    js = """
-    const nodes = Array.from(document.querySelectorAll('li span, span'));
-    const el = nodes.find(n => (n.textContent || '').trim() === '洛杉磯');
-    if (el) {
-        (el.closest('li') || el).click();
-        return true;
-    }
-    return false;
-    """
-    try:
-        return bool(page.evaluate(js))
-    except Exception:
-        return False
+    """在主頁 + 所有 iframe 點『洛杉磯』選項（策略競速 + JS 兜底，見 selector_race.click_first_anywhere）。"""
+    return click_first_anywhere(page, list_item_strategies("洛杉磯"), timeout=4000,
+                                fallback_text="洛杉磯", key="click_lax")
 
 # ------------------- 找到日期區塊 / 打開日曆 -------------------
 
@@ -278,7 +244,7 @@ def pick_date_on_any_calendar(ctx, target_dt: datetime) -> bool:
                     return True
                 if not click_first_exist(next_btn_sel):
                     break
-                ctx.wait_for_timeout(100)
+                wait_dom_settled(ctx, quiet_ms=80, timeout=1000, label="往後翻月")
 
             # 再往前找一輪
             for _ in range(24):
@@ -286,7 +252,7 @@ def pick_date_on_any_calendar(ctx, target_dt: datetime) -> bool:
                     return True
                 if not click_first_exist(prev_btn_sel):
                     break
-                ctx.wait_for_timeout(100)
+                wait_dom_settled(ctx, quiet_ms=80, timeout=1000, label="往前翻月")
         except Exception:
             pass
 
@@ -359,8 +325,8 @@ def set_date_via_ui(page, which: str, value: str) -> bool:
             log(f"在 {ctx_name} 嘗試以『日曆點選』設定 {which}：{value}")
             if not open_calendar_for(ctx, which):
                 continue
-            # 等日曆出現一會兒
-            ctx.wait_for_timeout(150)
+            # 等日曆面板出現且展開動畫結束
+            wait_element_stable(ctx.locator(CALENDAR_PANELS).first, timeout=1500, label="日曆面板")
             if pick_date_on_any_calendar(ctx, dt):
                 log(f"✅ 以日曆完成 {which} = {value}")
                 return True
@@ -420,23 +386,24 @@ def read_display_values(page):
 if __name__ == "__main__":
     with sync_playwright() as p:
         log("啟動 Playwright")
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page(viewport={"width": 1440, "height": 900})
+        browser = p.chromium.launch(**PROFILE.launch_options())
+
+        # 帶入上次保存的 cookies/localStorage（有效期內），結束前存回
+        states = StorageStateStore()
+        state_site = "packages.eztravel.com.tw"
+        state_options = states.context_options(state_site)
+        log("帶入上次保存的瀏覽器狀態" if state_options else "沒有可用的瀏覽器狀態，從全新 context 開始")
+        context = browser.new_context(viewport={"width": 1440, "height": 900}, **state_options)
+        PROFILE.attach(context)
+        page = context.new_page()
+
+        # 彈窗守衛：cookie/公告一出現就自動按掉
+        guard = PopupGuard(log=log).install(page)
 
         url = "https://packages.eztravel.com.tw/"
         log(f"前往 {url}")
         page.goto(url, timeout=60000, wait_until="domcontentloaded")
 
-        # 可能的 cookie/彈窗先關掉
-        log("嘗試關閉可能的彈窗")
-        for txt in ["同意", "接受", "我知道了", "關閉", "我同意", "OK", "確定"]:
-            try:
-                page.get_by_role("button", name=txt).click(timeout=1500)
-                log(f"已處理彈窗按鈕：{txt}")
-                break
-            except Exception:
-                pass
-
         # 有些頁面需要點「目的地」區塊才出現清單
         try:
             page.get_by_text("目的地", exact=False).click(timeout=1500)
@@ -444,12 +411,17 @@ if __name__ == "__main__":
         except Exception:
             pass
 
-        page.wait_for_timeout(800)
+        wait_any(page, ["text=洛杉磯", "li span"], timeout=5000, label="目的地清單")
+        wait_dom_settled(page, label="清單渲染")
+        guard.disarm()  # 首頁載入完成；下面的日曆也是浮層、也有「確定」，不能再讓守衛按
 
         # 點選「洛杉磯」
         log("嘗試點擊『洛杉磯』")
+        start_url = page.url
         if click_lax_anywhere(page):
             log("✅ 已點擊『洛杉磯』")
+            wait_url_change(page, start_url, timeout=15000, label="跳轉目的地頁")
+            wait_dom_settled(page, quiet_ms=500, timeout=15000, label="目的地頁渲染")
         else:
             log("⚠ 未能點擊『洛杉磯』（可能在隱藏分頁/iframe）")
 
@@ -458,11 +430,11 @@ if __name__ == "__main__":
         ret_value = "2025/10/01 (三)"
 
         ok_dep = set_date_via_ui(page, which="start", value=dep_value)
-        page.wait_for_timeout(200)
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label="去程設定後")
         ok_ret = set_date_via_ui(page, which="end",   value=ret_value)
 
-        # 最終驗證
-        page.wait_for_timeout(300)
+        # 最終驗證（等顯示文字更新完）
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label="驗證前")
         shown = read_display_values(page)
         log(f"畫面顯示 → 去程: {shown.get('start')!r}；回程: {shown.get('end')!r}")
 
@@ -478,11 +450,14 @@ if __name__ == "__main__":
             set_date_via_ui(page, which="end", value=ret_value)
 
         # 再讀一次
-        page.wait_for_timeout(300)
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label="二次驗證前")
         shown = read_display_values(page)
         log(f"二次驗證 → 去程: {shown.get('start')!r}；回程: {shown.get('end')!r}")
 
         # 收尾
-        page.wait_for_timeout(12000)
+        guard.report(log)
+        print_wait_summary(log)
+        states.save(context, state_site)
+        PROFILE.detach(context, "eztravel_calendar")
         browser.close()
         log("流程結束")
@@ -1,13 +1,17 @@
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 import pandas as pd
+import os
+import sys
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    page = browser.new_page()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+
+PROFILE = current_profile()
+
+with PROFILE.lease() as page:
     page.goto("https://rdc28.cwa.gov.tw/TDB/public/warning_typhoon_list/", timeout=60000)
 
-    page.wait_for_timeout(5000)  # 等待 JS 載入
+    page.wait_for_selector("table")  # 等表格由 JS 產生出來，不固定睡 5 秒
 
     # 抓取表格
     table_html = page.inner_html("table")
@@ -21,6 +25,6 @@ with sync_playwright() as p:
     new_page.wait_for_load_state("load")
 
     # 停留 5 秒讓你查看
-    new_page.wait_for_timeout(5000)
+    if not PROFILE.headless:  # headless 時沒有人看，不等
+        new_page.wait_for_timeout(5000)
 
-    browser.close()
@@ -1,17 +1,21 @@
 
 
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 import pandas as pd
+import os
+import sys
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    page = browser.new_page()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+
+PROFILE = current_profile()
+
+with PROFILE.lease() as page:
     page.goto("https://packages.eztravel.com.tw/", timeout=60000)
 
-    page.wait_for_timeout(5000)  # 等待 JS 載入
+    page.wait_for_load_state("load")  # 等頁面載入完成，不固定睡 5 秒
 
-    # 停留 5 秒讓你查看
-    page.wait_for_timeout(5000)
+    # 停留 5 秒讓你查看（headless 時沒有人看，不等）
+    if not PROFILE.headless:
+        page.wait_for_timeout(5000)
 
-    browser.close()
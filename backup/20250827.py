@@ -1,14 +1,15 @@
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 import pandas as pd
+import os
+import sys
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    page = browser.new_page()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+
+with current_profile().lease() as page:
     page.goto("https://rdc28.cwa.gov.tw/TDB/public/warning_typhoon_list/", timeout=60000)
-    page.wait_for_timeout(5000) # 等待 JS 載入
+    page.wait_for_selector("table")  # 等表格由 JS 產生出來，不固定睡 5 秒
     table_html = page.inner_html("table")
-    browser.close()
 # 解析 HTML 表格
 soup = BeautifulSoup(table_html, "html.parser")
 rows = soup.find_all("tr")[1:] # 忽略表頭
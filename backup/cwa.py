@@ -1,11 +1,15 @@
+import os
+import sys
 import time
 
-from playwright.sync_api import sync_playwright
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+
+PROFILE = current_profile()
 
 def open_typhoon(name: str | None = None, index: int | None = None):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()  # 方便監聽是否開新頁籤
+    # 借整個 context，方便監聽是否開新頁籤
+    with PROFILE.lease_context() as context:
         page = context.new_page()
         page.goto("https://rdc28.cwa.gov.tw/TDB/public/warning_typhoon_list/", timeout=60_000)
 
@@ -31,7 +35,6 @@ def open_typhoon(name: str | None = None, index: int | None = None):
 
         # 確認真的有找到
         if target_row.count() == 0:
-            browser.close()
             raise RuntimeError("找不到指定的颱風列，請確認名稱或索引是否正確")
 
         link = link_locator(target_row)
@@ -45,7 +48,6 @@ def open_typhoon(name: str | None = None, index: int | None = None):
                 # 如果 click 被攔或沒成功，再直接用 href 導頁（保險作法）
                 href = link.get_attribute("href")
                 if not href:
-                    browser.close()
                     raise RuntimeError("第三個 TD 沒有連結可點")
                 page.goto(href)
 
@@ -70,15 +72,16 @@ def open_typhoon(name: str | None = None, index: int | None = None):
             #time.sleep(5)
             new_page.click("#typhoon_abstract_header")
             print("✅ 已展開『颱風概況表』")
-            time.sleep(5)
+            if not PROFILE.headless:  # 留時間看展開結果；headless 時沒有人看，不等
+                time.sleep(5)
 
         except Exception:
             # 沒開新分頁代表多半是同頁導向
             page.wait_for_load_state("domcontentloaded")
             print("✅ 已在同一頁導向到該颱風資料")
 
-            # 停 5 秒再點開「颱風概況表」
-            time.sleep(5)
+            # 等「颱風概況表」的 header 出現再點（取代固定睡 5 秒）
+            page.wait_for_selector("#typhoon_abstract_header")
             page.click("#typhoon_abstract_header")
             print("✅ 已展開『颱風概況表』")
 
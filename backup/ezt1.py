@@ -1,9 +1,21 @@
+import os
+import sys
+
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 讓 backup/ 的腳本找得到上層模組
+from run_profile import current_profile
+
+PROFILE = current_profile()
+
 with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
+    browser = p.chromium.launch(**PROFILE.launch_options())
     page = browser.new_page()
+    PROFILE.attach(page.context)
     page.goto("https://packages.eztravel.com.tw/", timeout=60000)
 
-    page.wait_for_timeout(5000)  # 等待 JS 載入
+    page.wait_for_load_state("load")  # 等頁面載入完成，不固定睡 5 秒
+    if not PROFILE.headless:  # 留時間看畫面；headless 時沒有人看，不等
+        page.wait_for_timeout(5000)
+    PROFILE.detach(page.context, "eztravel_home")
     browser.close()
\ No newline at end of file
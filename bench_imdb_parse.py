@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+比較 imdb_parse 各解析後端在存檔 HTML 上的解析時間，並確認輸出完全一致。
+
+    python bench_imdb_parse.py            # 預設每個檔案跑 5 次
+    python bench_imdb_parse.py -n 20 imdb_top250_page_source.html
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import imdb_parse
+
+FIXTURES = ["imdb_top250_raw.html", "imdb_top250_raw_zh.html"]
+
+
+def bench(html, backend, repeat):
+    times = []
+    rows = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = imdb_parse.extract_rows_from_html(html, backend)
+        times.append(time.perf_counter() - t0)
+    return rows, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IMDb 解析後端效能比較")
+    parser.add_argument("files", nargs="*", default=FIXTURES)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = imdb_parse.available_backends()
+    if "bs4" not in backends:
+        print("需要 beautifulsoup4 作為比對基準", file=sys.stderr)
+        sys.exit(1)
+
+    ok = True
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        print(f"\n== {path}（{os.path.getsize(path) / 1e6:.1f} MB）==")
+        baseline_rows, baseline = bench(html, "bs4", args.repeat)
+        print(f"{'backend':<12}{'rows':>6}{'median ms':>12}{'speedup':>10}  same")
+        for backend in ["bs4"] + [b for b in backends if b != "bs4"]:
+            rows, t = (baseline_rows, baseline) if backend == "bs4" else bench(html, backend, args.repeat)
+            same = rows == baseline_rows
+            ok &= same
+            print(f"{backend:<12}{len(rows):>6}{t * 1000:>12.1f}{baseline / t:>9.1f}x  {'✓' if same else '✖'}")
+
+    if not ok:
+        print("\n✖ 有後端輸出與 bs4 不一致", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
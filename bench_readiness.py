@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+比較 networkidle 與各頁面的 Readiness 條件（momo_extract.SEARCH_READY / MAIN_READY）：
+從 goto 開始到「可以擷取」花多久，以及當下擷取到幾個商品（確認沒有因為提早開始而少抓）。
+
+    python bench_readiness.py                        # 預設：momo 首頁 + 搜尋「iphone 15」，各 3 次
+    python bench_readiness.py -n 5 "ipad air" "switch"
+    python bench_readiness.py --no-block             # 不擋圖片/字型/追蹤碼（看 route_block 的影響）
+    python bench_readiness.py --debug                # 開視窗看（debug 設定檔；量到的數字僅供參考）
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from momo_extract import MAIN_LAYOUT, MAIN_READY, SEARCH_LAYOUT, SEARCH_READY, extract_momo_products
+from momo_fetch import search_url
+from route_block import SCRAPE_PROFILE
+from run_profile import add_profile_arguments, current_profile
+
+MAIN_URL = "https://www.momoshop.com.tw/main/Main.jsp"
+TIMEOUT = 60000
+STRATEGIES = ("networkidle", "readiness")
+
+
+def measure(pool, url, layout, ready, strategy, block):
+    """回傳 (秒數, 商品數, 是否逾時)。"""
+    with pool.lease(block=block) as page:
+        t0 = time.perf_counter()
+        timed_out = False
+        try:
+            if strategy == "networkidle":
+                page.goto(url, timeout=TIMEOUT)
+                page.wait_for_load_state("networkidle", timeout=TIMEOUT)
+            else:
+                timed_out = not ready.goto(page, url, timeout=TIMEOUT)
+        except PlaywrightTimeoutError:
+            timed_out = True
+        elapsed = time.perf_counter() - t0
+        return elapsed, len(extract_momo_products(page, layout)), timed_out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="networkidle vs. Readiness 延遲比較")
+    parser.add_argument("keywords", nargs="*", default=["iphone 15"])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("--no-main", action="store_true", help="不測 momo 首頁")
+    parser.add_argument("--no-block", action="store_true", help="不套用 route_block.SCRAPE_PROFILE")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profile = current_profile(args.profile)
+
+    targets = [] if args.no_main else [("momo 首頁", MAIN_URL, MAIN_LAYOUT, MAIN_READY)]
+    targets += [(f"搜尋 {kw}", search_url(kw), SEARCH_LAYOUT, SEARCH_READY) for kw in args.keywords]
+    block = None if args.no_block else SCRAPE_PROFILE
+    pool = profile.pool()
+
+    print(f"{'target':<20}{'strategy':<13}{'median ms':>10}{'items':>7}{'timeouts':>10}{'speedup':>9}")
+    for name, url, layout, ready in targets:
+        results = {}
+        # 兩種策略交錯執行，避免快取/網路狀況只偏袒其中一種
+        for _ in range(args.repeat):
+            for strategy in STRATEGIES:
+                results.setdefault(strategy, []).append(measure(pool, url, layout, ready, strategy, block))
+        baseline = statistics.median(r[0] for r in results["networkidle"])
+        for strategy in STRATEGIES:
+            runs = results[strategy]
+            t = statistics.median(r[0] for r in runs)
+            items = statistics.median(r[1] for r in runs)
+            timeouts = sum(r[2] for r in runs)
+            print(f"{name:<20}{strategy:<13}{t * 1000:>10.0f}{items:>7.0f}{timeouts:>10}{baseline / t:>8.1f}x")
+
+    if block is not None:
+        print(block.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+共用的 Playwright 瀏覽器池（同步版）。
+
+各腳本原本每次都 p.chromium.launch() 再 browser.close()，短任務的時間幾乎都花在啟動/關閉上。
+這裡把 browser 與 context 保溫起來重複使用：
+
+    from browser_pool import get_pool
+
+    with get_pool().lease(viewport={"width": 1440, "height": 900}) as page:
+        page.goto(...)
+
+- lease()：借出一個新分頁，用完自動關閉分頁並把 context 還回池中
+- lease(block=SCRAPE_PROFILE)：順便掛上 route_block 的請求攔截（不載圖片/字型/追蹤碼）
+- lease(state_site="flight.eztravel.com.tw")：帶入該網站上次保存的 cookies/localStorage，歸還時存回
+  （見 storage_state.py）
+- 每個 context 開過 MAX_PAGES_PER_CONTEXT 個分頁就丟掉重建（避免記憶體/Cookie 越積越多）
+- 借出前檢查 browser 是否仍連線、context 是否仍可用，壞掉就自動重開
+- Playwright 同步 API 不能跨執行緒共用，所以 get_pool() 是「每個執行緒一個」
+"""
+
+import atexit
+import json
+import sys
+import threading
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+
+from storage_state import StorageStateStore
+
+# ====== 可調參數 ======
+MAX_PAGES_PER_CONTEXT = 20   # context 開過幾個分頁後回收
+MAX_IDLE_CONTEXTS = 4        # 每種 context 設定最多保留幾個閒置的
+BROWSER_TYPE = "chromium"
+
+
+def _options_key(options, state_site=None):
+    # state_site 也算進 key：帶某網站 cookies 的 context 不會借給一般 lease，反之亦然
+    key = json.dumps(options or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{state_site}|{key}" if state_site else key
+
+
+class BrowserPool:
+    """一個 browser + 依 context 設定分組的閒置 context 清單。"""
+
+    def __init__(self, launch_options=None, max_pages_per_context=MAX_PAGES_PER_CONTEXT,
+                 max_idle_contexts=MAX_IDLE_CONTEXTS, browser_type=BROWSER_TYPE, state_store=None):
+        self.launch_options = dict(launch_options or {})
+        self.max_pages_per_context = max_pages_per_context
+        self.max_idle_contexts = max_idle_contexts
+        self.browser_type = browser_type
+        self.state_store = state_store or StorageStateStore()
+        self._playwright = None
+        self._browser = None
+        self._idle = {}          # _options_key(options, state_site) -> [context, ...]
+        self._pages_served = {}  # id(context) -> 已開過的分頁數
+        self.stats = {"launches": 0, "contexts_created": 0, "contexts_recycled": 0, "leases": 0}
+
+    # ---------- browser ----------
+
+    def _browser_healthy(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    def browser(self):
+        """取得（必要時重新啟動）browser。"""
+        if self._browser_healthy():
+            return self._browser
+        if self._browser is not None:
+            print("[pool] browser 已斷線，重新啟動", file=sys.stderr)
+            self._idle.clear()
+            self._pages_served.clear()
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = getattr(self._playwright, self.browser_type).launch(**self.launch_options)
+        self.stats["launches"] += 1
+        return self._browser
+
+    # ---------- context ----------
+
+    def _context_healthy(self, context):
+        try:
+            context.pages  # 已關閉的 context 會丟例外
+            return context.browser is None or context.browser.is_connected()
+        except PlaywrightError:
+            return False
+
+    def _discard(self, context):
+        self._pages_served.pop(id(context), None)
+        try:
+            context.close()
+        except PlaywrightError:
+            pass
+
+    def _acquire_context(self, options, state_site=None):
+        idle = self._idle.setdefault(_options_key(options, state_site), [])
+        while idle:
+            context = idle.pop()
+            if self._context_healthy(context):
+                return context
+            self._discard(context)
+        context = self.browser().new_context(**options)
+        self._pages_served[id(context)] = 0
+        self.stats["contexts_created"] += 1
+        return context
+
+    def _release_context(self, context, options, state_site=None):
+        served = self._pages_served.get(id(context), 0)
+        idle = self._idle.setdefault(_options_key(options, state_site), [])
+        if served >= self.max_pages_per_context or len(idle) >= self.max_idle_contexts \
+                or not self._context_healthy(context):
+            self.stats["contexts_recycled"] += 1
+            self._discard(context)
+        else:
+            idle.append(context)
+
+    def _return(self, context, options, pages_used, state_site=None):
+        """關掉借用期間開的分頁（含 popup），計數後把 context 還回池中。"""
+        self._pages_served[id(context)] = self._pages_served.get(id(context), 0) + pages_used
+        for page in list(context.pages):
+            try:
+                page.close()
+            except PlaywrightError:
+                pass
+        self._release_context(context, options, state_site)
+
+    def _with_state(self, state_site, context_options):
+        """有 state_site 時把保存的 storage state 加進 context 設定（閒置池另外以 state_site 分開存放）。"""
+        if not state_site:
+            return context_options
+        return dict(context_options, **self.state_store.context_options(state_site))
+
+    @contextmanager
+    def lease_context(self, block=None, state_site=None, **context_options):
+        """
+        借出整個 context（需要 expect_page、多分頁時用）。
+        block：route_block.BlockProfile，借用期間掛在 context 上，歸還前卸下。
+        state_site：借出時帶入該網站的 storage state，歸還前存回。
+        """
+        context_options = self._with_state(state_site, context_options)
+        context = self._acquire_context(context_options, state_site)
+        self.stats["leases"] += 1
+        try:
+            if block is not None:
+                block.apply(context)
+            yield context
+        finally:
+            if block is not None:
+                block.remove(context)
+            if state_site:
+                self.state_store.save(context, state_site)
+            self._return(context, context_options, max(len(context.pages), 1), state_site)
+
+    @contextmanager
+    def lease(self, block=None, state_site=None, **context_options):
+        """
+        借出一個新分頁；context_options 會傳給 browser.new_context()。
+        block：route_block.BlockProfile，只掛在這個分頁上（不影響池中其他借用）。
+        state_site：借出時帶入該網站的 storage state，歸還前存回。
+        """
+        context_options = self._with_state(state_site, context_options)
+        context = self._acquire_context(context_options, state_site)
+        try:
+            page = context.new_page()
+        except PlaywrightError:
+            # context 看似正常但已不能用：丟掉重借一次
+            self._discard(context)
+            context = self._acquire_context(context_options, state_site)
+            page = context.new_page()
+        self.stats["leases"] += 1
+        try:
+            if block is not None:
+                block.apply(page)      # 掛失敗也要走 finally 把 context 還回去
+            yield page
+        finally:
+            if state_site:
+                self.state_store.save(context, state_site)
+            self._return(context, context_options, 1, state_site)
+
+    def close(self):
+        for contexts in self._idle.values():
+            for context in contexts:
+                self._discard(context)
+        self._idle.clear()
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except PlaywrightError:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+_local = threading.local()
+
+
+def get_pool(**launch_options):
+    """
+    取得目前執行緒、對應 launch_options 的共用 BrowserPool（第一次呼叫時建立）。
+    例如 get_pool(headless=False) 與 get_pool() 是兩個不同的池。
+    """
+    pools = getattr(_local, "pools", None)
+    if pools is None:
+        pools = _local.pools = {}
+    key = _options_key(launch_options)
+    if key not in pools:
+        pools[key] = BrowserPool(launch_options)
+        atexit.register(pools[key].close)
+    return pools[key]
+
+
+def close_all():
+    """關閉目前執行緒建立的所有池。"""
+    for pool in getattr(_local, "pools", {}).values():
+        pool.close()
+    _local.pools = {}
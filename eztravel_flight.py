@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+ezTravel 純機票搜尋流程（原本寫在 2.1.py 的頂層）：找表單 → 切換來回/單程 → 出發地/目的地 → 日期 → 搜尋。
+
+    guard = PopupGuard(log=log).install(page)          # goto 之前
+    result = search_flights(page, "來回", "台北 TPE", "洛杉磯 LAX", "2025/09/01", "2025/09/10", guard=guard)
+    result["filled"], result["searched"], result["result_url"]
+
+2.1.py 與 scrapejobs 的 eztravel_flight 工作都呼叫這裡。
+"""
+
+import re
+import time
+import urllib.parse
+from datetime import datetime
+
+from run_profile import current_profile
+from selector_cache import SelectorCache
+from waits import is_xhr, wait_any, wait_dom_settled, wait_for_response, wait_url_change
+
+FLIGHT_URL = "https://flight.eztravel.com.tw/"
+STATE_SITE = urllib.parse.urlsplit(FLIGHT_URL).netloc   # storage state 以網站區分
+VIEW_W = 1440
+VIEW_H = 900
+
+# 記住各欄位/按鈕上次是哪個候選成功，下次先試它（.selector_cache.json）
+SELECTORS = SelectorCache.for_url(FLIGHT_URL)
+
+def log(msg: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
+
+def wait_search_form(page):
+    log("等待純機票搜尋表單出現")
+    candidates = [
+        "text=機票搜尋", "text=搜尋機票", "text=出發地", "text=目的地",
+        "input[placeholder='出發地']", "input[placeholder='目的地']",
+        "text=單程", "text=來回",
+    ]
+    # 全部候選同時等，任一出現即通過（原本逐一等，最差要 8 x 8 秒）
+    hit = wait_any(page, candidates, timeout=8000, label="搜尋表單")
+    if hit:
+        log(f"  - 搜尋表單偵測到：{hit}")
+        return True
+    log("  ✖ 等待搜尋表單逾時（仍將繼續嘗試互動）")
+    return False
+
+def ensure_roundtrip_or_oneway(page, trip_type: str):
+    """切換來回/單程（盡量不依賴固定 id）"""
+    log(f"切換行程類型為：{trip_type}")
+    opts = [
+        page.get_by_text(trip_type, exact=True),
+        page.locator(f"label:has-text('{trip_type}')"),
+        page.locator(f"[role='tab']:has-text('{trip_type}')"),
+        page.locator(f"button:has-text('{trip_type}')"),
+    ]
+    for loc in opts:
+        try:
+            if loc.count():
+                loc.first.click(timeout=1500)
+                log("  ✅ 行程類型切換完成")
+                return True
+        except Exception:
+            continue
+    log("  ⚠ 找不到來回/單程切換，可能站方預設已為正確狀態")
+    return False
+
+def set_text_field(page, label_or_placeholder: str, value: str, is_origin=True) -> bool:
+    """
+    盡可能找到「出發地/目的地」輸入框並輸入，處理自動完成清單。
+    """
+    role_names = [label_or_placeholder]
+    placeholders = [label_or_placeholder]
+    # 常見備援關鍵字
+    if is_origin:
+        placeholders += ["出發地", "出發", "From", "出發城市", "城市/機場（出發）"]
+    else:
+        placeholders += ["目的地", "到達", "To", "目的城市", "城市/機場（到達）"]
+
+    # 先找 input
+    candidates = []
+    for ph in placeholders:
+        candidates.append(f"input[placeholder='{ph}']")
+        candidates.append(f"input[aria-label='{ph}']")
+    # 一些常見欄位 class/name 備援
+    candidates += [
+        "input[name*='origin']", "input[id*='origin']",
+        "input[name*='from']", "input[id*='from']",
+        "input[name*='destination']", "input[id*='destination']",
+        "input[name*='to']", "input[id*='to']",
+    ]
+
+    # 也嘗試用 label 錨點找鄰近 input
+    def by_label_neighbor(lbl: str):
+        try:
+            block = page.get_by_text(re.compile(lbl)).first
+            if block.count():
+                container = block.locator("xpath=ancestor-or-self::*[self::div or self::section or self::form][1]")
+                cand = container.locator("input").first
+                if cand.count():
+                    return cand
+        except Exception:
+            pass
+        return None
+
+    # 搜尋候選 input（上次成功的排前面）
+    key = f"set_text_field:{label_or_placeholder}"
+    loc = None
+    hit_sel = None
+    for sel in SELECTORS.ordered(key, candidates):
+        try:
+            l = page.locator(sel)
+            if l.count():
+                loc = l.first
+                hit_sel = sel
+                break
+        except Exception:
+            continue
+    if not loc:
+        loc = by_label_neighbor(label_or_placeholder)
+
+    if not loc:
+        log(f"  ✖ 找不到欄位：{label_or_placeholder}")
+        return False
+
+    try:
+        loc.wait_for(state="visible", timeout=3000)
+        loc.scroll_into_view_if_needed()
+        loc.click()
+        # 清空再填
+        page.keyboard.press("Control+A")
+        page.keyboard.press("Delete")
+        # 慢打讓自動完成彈出；等建議清單的 XHR 回來、清單畫完再選
+        wait_for_response(page, is_xhr, action=lambda: loc.type(value, delay=50),
+                          timeout=3000, label="自動完成回應")
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label="自動完成清單")
+        # 選第一筆候選（常見：按下 ArrowDown + Enter）
+        page.keyboard.press("ArrowDown")
+        page.keyboard.press("Enter")
+        if hit_sel:
+            SELECTORS.record_hit(key, hit_sel)
+        log(f"  ✅ 已輸入：{value}")
+        return True
+    except Exception as e:
+        log(f"  ✖ 欄位輸入失敗：{e.__class__.__name__}")
+        return False
+
+def find_date_input(page, label_text: str, pref_ids: list):
+    """找日期 input（寬鬆策略；上次成功的 selector 排前面）"""
+    # 1) 指定 id
+    candidates = [f"input{sid}" for sid in pref_ids]
+
+    # 2) 以 placeholder/aria-label
+    keys = [label_text, "出發日期", "回程日期", "去程", "回程", "出發日", "返程"]
+    for k in keys:
+        candidates += [f"input[placeholder='{k}']", f"input[aria-label='{k}']"]
+
+    # 3) 模糊 id/name
+    key = "start" if "去程" in label_text or "出發" in label_text else "end"
+    candidates += [
+        f"input[id*='{key}']", f"input[name*='{key}']",
+        "input[name*='depart']", "input[id*='depart']",
+        "input[name*='return']", "input[id*='return']",
+        "input[name*='go']", "input[name*='back']",
+        "input[name*='date']", "input[id*='date']",
+    ]
+
+    cache_key = f"find_date_input:{label_text}"
+    for sel in SELECTORS.ordered(cache_key, candidates):
+        loc = page.locator(sel)
+        if loc.count():
+            SELECTORS.record_hit(cache_key, sel)
+            return loc.first
+
+    # 4) 文字錨點鄰近搜尋
+    try:
+        block = page.get_by_text(re.compile(label_text)).first
+        if block.count():
+            container = block.locator("xpath=ancestor-or-self::*[self::div or self::section or self::form][1]")
+            cand = container.locator("input").first
+            if cand.count():
+                return cand
+    except Exception:
+        pass
+
+    return None
+
+def safe_fill_date(page, label: str, want: str) -> bool:
+    log(f"填入 {label}：{want}")
+    pref_ids = ["#departDate", "#goDate", "#flight-date-start"] if (label in ("去程","出發日期")) else ["#returnDate", "#backDate", "#flight-date-end"]
+    loc = find_date_input(page, label, pref_ids)
+
+    if not loc:
+        log(f"  ✖ 找不到 {label} 的輸入框")
+        return False
+
+    try:
+        loc.wait_for(state="visible", timeout=4000)
+        loc.scroll_into_view_if_needed()
+        loc.click()
+        page.keyboard.press("Control+A")
+        page.keyboard.press("Delete")
+        # 有些站用 readOnly + datepicker，只能點日曆；先填寫，若失敗再改走日曆點擊（此處先嘗試直填）
+        loc.fill(want)
+        page.keyboard.press("Enter")
+        wait_dom_settled(page, quiet_ms=150, timeout=2000, label=f"{label}日期")
+    except Exception as e:
+        log(f"  - {label} fill() 失敗：{e.__class__.__name__}，改用 JS 兜底")
+        try:
+            ok = page.evaluate(
+                """
+                (el, val) => {
+                    if (!el) return false;
+                    el.removeAttribute && el.removeAttribute('readonly');
+                    el.focus();
+                    el.value = val;
+                    el.dispatchEvent(new Event('input', { bubbles: true }));
+                    el.dispatchEvent(new Event('change', { bubbles: true }));
+                    el.blur && el.blur();
+                    return true;
+                }
+                """,
+                loc.element_handle(),
+                want,
+            )
+            if not ok:
+                log(f"  ✖ {label} JS 兜底返回 false")
+                return False
+        except Exception as ee:
+            log(f"  ✖ {label} JS 兜底失敗：{ee.__class__.__name__}")
+            return False
+
+    # 驗證
+    try:
+        real = loc.input_value(timeout=1500)[:10]
+        if real == want[:10]:
+            log(f"  ✅ {label} 寫入並驗證成功：{real}")
+            return True
+        else:
+            log(f"  ⚠ {label} 寫入後不相符：目前是 {real}（期望 {want}）")
+            return False
+    except Exception:
+        log("  ⚠ 無法讀回 input 值，可能由日曆元件接管")
+        return False
+
+def click_search(page):
+    log("嘗試點擊『搜尋』按鈕")
+    candidates = [
+        "button:has-text('搜尋')",
+        "button:has-text('搜尋機票')",
+        "button:has-text('查詢')",
+        "button.ez-btn.search-lg",
+        "button[type='submit']",
+        "[role='button']:has-text('搜尋')",
+    ]
+    for sel in SELECTORS.ordered("click_search", candidates):
+        try:
+            page.locator(sel).first.click(timeout=3000)
+            SELECTORS.record_hit("click_search", sel)
+            log(f"  ✅ 已點擊搜尋：{sel}")
+            return True
+        except Exception:
+            SELECTORS.record_miss("click_search", sel)
+            continue
+    log("  ✖ 沒有找到可點擊的搜尋按鈕")
+    return False
+
+def take_final_screenshots(page, prefix="eztravel_flight"):
+    profile = current_profile()
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if not profile.screenshots:
+        log(f"略過截圖（{profile.name} 設定檔不截圖）")
+        return
+    vp = f"screenshots/{prefix}_viewport_{ts}.png"
+    fp = f"screenshots/{prefix}_fullpage_{ts}.png"
+    log("擷取截圖（可視區）"); profile.screenshot(page, vp); log(f"  ✅ {vp}")
+    log("擷取截圖（整頁）");   profile.screenshot(page, fp, full_page=True); log(f"  ✅ {fp}")
+
+
+def search_flights(page, trip_type, origin, dest, depart_date, return_date=None, guard=None):
+    """
+    在 page 上跑完整個純機票搜尋（含送出與等待結果頁）。
+    guard：PopupGuard；搜尋表單出現後就 disarm，日曆/自動完成的浮層不會被它按掉。
+    回傳 dict：條件、filled（欄位是否全部寫入成功）、searched（是否按到搜尋）、result_url。
+    """
+    log(f"前往 {FLIGHT_URL}")
+    page.goto(FLIGHT_URL, timeout=60000, wait_until="domcontentloaded")
+    log("頁面主結構載入完成 (domcontentloaded)")
+
+    wait_dom_settled(page, label="首頁動態區塊")
+    wait_search_form(page)
+    if guard:
+        guard.disarm()
+
+    # 切換來回 / 單程
+    ensure_roundtrip_or_oneway(page, trip_type)
+
+    # 出發地 / 目的地
+    ok_from = set_text_field(page, "出發地", origin, is_origin=True)
+    ok_to   = set_text_field(page, "目的地", dest,   is_origin=False)
+
+    # 日期（單程時只填去程）
+    ok_go = safe_fill_date(page, "出發日期", depart_date) or safe_fill_date(page, "去程", depart_date)
+    ok_back = True
+    if trip_type == "來回":
+        ok_back = safe_fill_date(page, "回程日期", return_date) or safe_fill_date(page, "回程", return_date)
+
+    filled = ok_from and ok_to and ok_go and ok_back
+    if filled:
+        log("🎉 純機票條件填寫完成")
+    else:
+        log("⚠ 純機票欄位未完全寫入成功，請檢查 selector 或日曆/自動完成互動")
+
+    # 送出搜尋
+    search_url = page.url
+    searched = click_search(page)
+    if searched:
+        wait_url_change(page, search_url, timeout=15000, label="跳轉結果頁")
+
+    # 等結果頁畫面不再變動（取代固定 8 秒）
+    wait_dom_settled(page, quiet_ms=500, timeout=15000, label="結果頁")
+    return {
+        "trip_type": trip_type, "origin": origin, "dest": dest,
+        "depart_date": depart_date, "return_date": return_date if trip_type == "來回" else None,
+        "filled": filled, "searched": searched, "result_url": page.url,
+    }
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+http_session 底下的磁碟快取（只快取 GET 200）。
+
+- FRESH_FOR 秒內再抓同一個網址：完全不發請求，直接回快取
+- 超過 FRESH_FOR：帶 If-None-Match / If-Modified-Since 重新驗證，伺服器回 304 就沿用快取內容
+- 內容以 sha256 當檔名、gzip 壓縮存放（相同內容只存一份），索引放在 sqlite
+- 超過 MAX_AGE 沒更新的項目淘汰；總大小超過 MAX_BYTES 時依最久未使用（LRU）淘汰
+
+    from http_session import get_session
+    resp = get_session(cached=True).get(url)
+    resp.from_cache   # True 表示這次沒有下載內容（新鮮命中或 304）；沒經過快取的（非 GET、stream=True）一律 False
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from http_session import ScraperSession
+
+# ====== 可調參數 ======
+CACHE_DIR = ".http_cache"
+FRESH_FOR = 10 * 60                 # 秒；這段時間內不發任何請求
+MAX_AGE = 7 * 24 * 3600             # 秒；超過就淘汰
+MAX_BYTES = 200 * 1024 * 1024       # 壓縮後總大小上限
+
+# 內容已解壓，這些標頭留著會誤導
+_DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER,
+    headers       TEXT,
+    body_hash     TEXT,
+    size          INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL,
+    accessed_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_entries_hash ON entries(body_hash);
+"""
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_DIR, fresh_for=FRESH_FOR, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        self.path = path
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(path, "bodies"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    # ---------- body store ----------
+
+    def _body_path(self, digest):
+        return os.path.join(self.path, "bodies", digest[:2], digest + ".gz")
+
+    def _write_body(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 多執行緒 / 多行程可能同時寫同一個 body，各用各的暫存檔
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        return digest, os.path.getsize(path)
+
+    def _read_body(self, digest):
+        try:
+            with gzip.open(self._body_path(digest), "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _drop_body_if_orphan(self, digest):
+        if self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (digest,)).fetchone():
+            return
+        try:
+            os.remove(self._body_path(digest))
+        except OSError:
+            pass
+
+    # ---------- entries ----------
+
+    def lookup(self, url):
+        """回傳 dict（含 fresh 與 body）或 None。"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body_hash, etag, last_modified, stored_at FROM entries WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                return None
+            status, headers, digest, etag, last_modified, stored_at = row
+            now = time.time()
+            if now - stored_at > self.max_age:
+                self._delete(url, digest)
+                self._db.commit()
+                return None
+            body = self._read_body(digest)
+            if body is None:
+                self._delete(url, digest)
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+            self._db.commit()
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": now - stored_at <= self.fresh_for,
+        }
+
+    def store(self, url, resp):
+        if "no-store" in resp.headers.get("Cache-Control", ""):
+            return
+        headers = {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS}
+        digest, size = self._write_body(resp.content)      # 壓縮在鎖外做
+        now = time.time()
+        with self._lock:
+            # 寫完到拿到鎖之間，別的執行緒可能把這份（當時還沒有 entry 指向的）body 當孤兒刪掉了
+            if not os.path.exists(self._body_path(digest)):
+                digest, size = self._write_body(resp.content)
+            old = self._db.execute("SELECT body_hash FROM entries WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, resp.status_code, json.dumps(headers), digest, size,
+                 resp.headers.get("ETag"), resp.headers.get("Last-Modified"), now, now))
+            if old and old[0] != digest:
+                self._drop_body_if_orphan(old[0])
+            self.stats["stored"] += 1
+            self._evict()
+            self._db.commit()
+
+    def mark_revalidated(self, url, resp):
+        """收到 304：重設新鮮時間，伺服器若給了新的 ETag/Last-Modified 一併更新。"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), url))
+            self._db.commit()
+
+    def _delete(self, url, digest):
+        self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+        self._drop_body_if_orphan(digest)
+        self.stats["evicted"] += 1
+
+    def _evict(self):
+        """先淘汰過期（MAX_AGE），再依 LRU 砍到 MAX_BYTES 以下。呼叫端需持有 _lock。"""
+        cutoff = time.time() - self.max_age
+        for url, digest in self._db.execute(
+                "SELECT url, body_hash FROM entries WHERE stored_at < ?", (cutoff,)).fetchall():
+            self._delete(url, digest)
+
+        # 同一份 body 可能被多個 url 共用，大小以不重複的 body 計
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, digest, size in self._db.execute(
+                "SELECT url, body_hash, size FROM entries ORDER BY accessed_at").fetchall():
+            shared = self._db.execute(
+                "SELECT COUNT(*) FROM entries WHERE body_hash = ?", (digest,)).fetchone()[0]
+            self._delete(url, digest)
+            if shared == 1:
+                total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            for url, digest in self._db.execute("SELECT url, body_hash FROM entries").fetchall():
+                self._delete(url, digest)
+            self._db.commit()
+
+
+def _cached_response(url, entry):
+    resp = requests.models.Response()
+    resp.status_code = entry["status"]
+    resp.headers = CaseInsensitiveDict(entry["headers"])
+    resp._content = entry["body"]
+    resp.url = url
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.reason = "OK"
+    resp.from_cache = True
+    return resp
+
+
+class CachedSession(ScraperSession):
+    """GET 先查 ResponseCache；其他方法、stream=True 照常發送。"""
+
+    def __init__(self, cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache or ResponseCache()
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != "GET" or kwargs.get("stream"):
+            resp = super().request(method, url, *args, **kwargs)
+            resp.from_cache = False
+            return resp
+
+        full_url = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+        entry = self.cache.lookup(full_url)
+        if entry and entry["fresh"]:
+            self.cache.stats["fresh_hits"] += 1
+            return _cached_response(full_url, entry)
+
+        if entry:
+            headers = dict(kwargs.get("headers") or {})
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+            kwargs["headers"] = headers
+
+        resp = super().request(method, url, *args, **kwargs)
+        if resp.status_code == 304 and entry:
+            self.cache.stats["revalidated"] += 1
+            self.cache.mark_revalidated(full_url, resp)
+            return _cached_response(full_url, entry)
+
+        self.cache.stats["misses"] += 1
+        resp.from_cache = False
+        if resp.status_code == 200:
+            self.cache.store(full_url, resp)
+        return resp
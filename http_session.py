@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+所有 requests 型爬蟲共用的 HTTP Session。
+
+    from http_session import get_session
+    resp = get_session().get(url)
+
+- 連線池 + keep-alive：同一個 host 的 TCP/TLS 握手只做一次
+- Accept-Encoding：gzip/deflate，有裝 brotli 時再加 br
+- 429 / 5xx 以指數退避 + 隨機抖動重試（會看 Retry-After）
+- 沒給 timeout 時套用 DEFAULT_TIMEOUT（原本各腳本多半沒設，卡住就整批卡住）
+- 每個 host 同時在途的請求數上限（HOST_CONCURRENCY / HOST_LIMITS），可選配每秒請求數節流
+- get_session(cached=True)：再加一層磁碟快取與條件式請求（見 http_cache.py）
+"""
+
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ====== 可調參數 ======
+DEFAULT_TIMEOUT = 15          # 秒
+RETRIES = 4
+BACKOFF_FACTOR = 0.5          # 0.5, 1, 2, 4 秒…
+BACKOFF_JITTER = 0.3          # 每次退避再加 0~0.3 秒隨機
+RETRY_STATUS = (429, 500, 502, 503, 504)
+POOL_CONNECTIONS = 16         # 保留幾個 host 的連線池
+POOL_MAXSIZE = 16             # 每個 host 最多保留幾條連線
+HOST_CONCURRENCY = 8          # 每個 host 同時在途的請求數
+HOST_LIMITS = {               # 個別 host 的上限（覆蓋 HOST_CONCURRENCY）
+    "www.ptt.cc": 2,
+    "www.momoshop.com.tw": 4,
+}
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/127.0.0.0 Safari/537.36"
+)
+
+try:
+    import brotli  # noqa: F401  urllib3 有 brotli 才會解 br
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+def _host(url):
+    return urllib.parse.urlsplit(url).netloc
+
+
+class HostRateLimiter:
+    """每個 host 兩次請求之間至少間隔 1 / rate 秒（多執行緒安全）。"""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec else 0.0
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, url):
+        host = _host(url)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ScraperSession(requests.Session):
+    """requests.Session + 預設 timeout + 每個 host 的並行上限 / 節流。"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, host_concurrency=HOST_CONCURRENCY,
+                 host_limits=None, rate_limiter=None):
+        super().__init__()
+        self.timeout = timeout
+        self.host_concurrency = host_concurrency
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.rate_limiter = rate_limiter
+        self._sem_lock = threading.Lock()
+        self._host_sems = {}
+
+    def _semaphore(self, host):
+        with self._sem_lock:
+            sem = self._host_sems.get(host)
+            if sem is None:
+                sem = self._host_sems[host] = threading.BoundedSemaphore(
+                    self.host_limits.get(host, self.host_concurrency))
+            return sem
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        with self._semaphore(_host(url)):
+            return super().request(method, url, *args, **kwargs)
+
+
+def make_retry(retries=RETRIES):
+    kwargs = dict(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,   # 重試用完就把最後的回應交給呼叫端 raise_for_status()
+    )
+    try:
+        return Retry(backoff_jitter=BACKOFF_JITTER, **kwargs)
+    except TypeError:
+        # urllib3 < 2 沒有 backoff_jitter
+        return Retry(**kwargs)
+
+
+def make_session(pool_maxsize=POOL_MAXSIZE, retries=RETRIES, session_class=ScraperSession, **session_options):
+    """建立一個新的 Session（一般直接用 get_session() 共用即可）。"""
+    session = session_class(**session_options)
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize,
+                          max_retries=make_retry(retries))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def get_session(cached=False):
+    """
+    整個行程共用的 Session（requests.Session 可跨執行緒做一般 GET）。
+    cached=True 取得帶磁碟快取的版本，重跑時沒變的頁面只花一個 304 或完全不發請求。
+    """
+    with _shared_lock:
+        if cached not in _shared:
+            if cached:
+                from http_cache import CachedSession  # http_cache 依賴本模組，延後匯入
+                _shared[cached] = make_session(session_class=CachedSession)
+            else:
+                _shared[cached] = make_session()
+        return _shared[cached]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+IMDb Top 250 榜單的取得（imdb-reader.py / imdbreader.py / scrapejobs 共用；解析本身在 imdb_parse.py）。
+
+    from imdb_fetch import load_rows
+
+    rows, html = load_rows()                          # 先試 HTTP + 內嵌 __NEXT_DATA__，不行才開瀏覽器
+    rows, html = load_rows(mode="scroll", backend="lxml")
+
+- "json"：先用共用 Session（含磁碟快取）抓 HTML 讀 __NEXT_DATA__；沒有再開瀏覽器只等 __NEXT_DATA__；
+  都拿不到才退回捲動載入 + DOM 解析
+- "scroll"：直接開瀏覽器捲動到底觸發懶載入，再用 imdb_parse 解析 DOM
+"""
+
+import sys
+import time
+
+import requests
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+import imdb_parse
+from http_session import get_session
+from run_profile import current_profile
+
+URL = "https://www.imdb.com/chart/top/"
+
+# ====== 可調參數 ======
+TARGET_COUNT = 250
+MAX_SCROLLS = 50
+SCROLL_PAUSE = 0.6           # 每次滾動暫停（秒）
+FIRST_LOAD_TIMEOUT = 20_000  # 首批元素等待上限 (ms)
+PARSER_BACKEND = "auto"      # "selectolax" / "lxml" / "bs4"；auto 挑最快的已安裝後端
+EXTRACT_MODE = "json"        # "json"：讀頁面內嵌的 __NEXT_DATA__（免捲動）；"scroll"：捲動載入後解析 DOM
+
+CONTEXT_OPTIONS = dict(
+    locale="zh-TW",
+    user_agent=(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/127.0.0.0 Safari/537.36"
+    ),
+    extra_http_headers={"Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8"},
+    viewport={"width": 1400, "height": 1000},
+)
+
+ITEM_SELECTOR = "li[class*='ipc-metadata-list-summary-item']"
+
+
+def lazy_scroll_to_load_all(page):
+    """滾動到底觸發懶載入，直到數量達標或不再增加。"""
+    last_count = 0
+    same_rounds = 0
+    for i in range(1, MAX_SCROLLS + 1):
+        count = page.locator(ITEM_SELECTOR).count()
+        print(f"[scroll {i}] 目前項目數：{count}", file=sys.stderr)
+        if count >= TARGET_COUNT:
+            break
+
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        time.sleep(SCROLL_PAUSE)
+        page.evaluate("window.scrollBy(0, -300)")
+        time.sleep(SCROLL_PAUSE * 0.6)
+
+        new_count = page.locator(ITEM_SELECTOR).count()
+        if new_count == last_count:
+            same_rounds += 1
+        else:
+            same_rounds = 0
+        last_count = new_count
+
+        if same_rounds >= 3:
+            break
+
+
+def load_html_via_http():
+    """json 模式第一步：不開瀏覽器，用共用 Session（含磁碟快取）抓榜單 HTML。失敗回傳 None。"""
+    try:
+        resp = get_session(cached=True).get(URL, headers=CONTEXT_OPTIONS["extra_http_headers"])
+        resp.raise_for_status()
+        return resp.text
+    except requests.exceptions.RequestException as e:
+        print(f"[warn] HTTP 取得榜單失敗：{e}", file=sys.stderr)
+        return None
+
+
+def load_html_via_browser(scroll=True):
+    """開瀏覽器載入榜單；scroll=False 時只等 __NEXT_DATA__ 出現，不捲動。"""
+    # headless / 擋資源 / tracing 依執行設定檔（--debug 或 SCRAPER_PROFILE=debug 才開視窗）
+    with current_profile().lease(trace_name="imdb_top250", **CONTEXT_OPTIONS) as page:
+        print("[info] 開啟頁面中…", file=sys.stderr)
+
+        try:
+            page.goto(URL, timeout=60_000, wait_until="domcontentloaded")
+            if scroll:
+                page.wait_for_selector(ITEM_SELECTOR, timeout=FIRST_LOAD_TIMEOUT)
+            else:
+                page.wait_for_selector("script#__NEXT_DATA__", state="attached", timeout=FIRST_LOAD_TIMEOUT)
+        except PlaywrightTimeoutError:
+            print("[error] 首批清單載入逾時", file=sys.stderr)
+            sys.exit(1)
+
+        if scroll:
+            lazy_scroll_to_load_all(page)
+
+        return page.content()
+
+
+def load_rows(mode=EXTRACT_MODE, backend=PARSER_BACKEND):
+    """依 mode 取得 (資料列, 整頁 HTML)；json 模式拿不到內嵌 JSON 時退回捲動 + DOM 解析。"""
+    if mode == "json":
+        for loader in (load_html_via_http, lambda: load_html_via_browser(scroll=False)):
+            html = loader()
+            rows = imdb_parse.extract_rows_from_next_data(html) if html else None
+            if rows:
+                print("[info] 已由內嵌 __NEXT_DATA__ 取得資料", file=sys.stderr)
+                return rows, html
+        print("[warn] 找不到 __NEXT_DATA__，改用捲動載入", file=sys.stderr)
+
+    html = load_html_via_browser(scroll=True)
+    return imdb_parse.extract_rows_from_html(html, backend), html
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+IMDb Top 250 頁面（page.content() 存檔）→ 資料列，可切換解析後端：
+
+- "bs4"：BeautifulSoup + html.parser（原本 imdb-reader.py 的寫法，純 Python，最慢）
+- "lxml"：lxml.html + XPath（C 實作）
+- "selectolax"：selectolax / lexbor（C 實作，通常最快）
+- "auto"：依 selectolax → lxml → bs4 順序挑第一個有安裝的
+
+三個後端輸出的 rows 必須完全相同（bench_imdb_parse.py 會比對並計時）。
+
+另外 extract_rows_from_next_data() 直接讀頁面內嵌的 __NEXT_DATA__ JSON：
+首次導覽的 HTML 就帶有全部 250 筆，不必捲動觸發懶載入（DOM 初始只畫 25 筆）。
+"""
+
+import json
+import re
+
+BASE = "https://www.imdb.com"
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+_RANK_RE = re.compile(r"^(\d+)\.\s*(.+)$")
+_NEXT_DATA_RE = re.compile(r'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+_YEAR_RE = re.compile(r"(19|20)\d{2}")
+
+
+def _to_year(val):
+    if val is None:
+        return None
+    m = _YEAR_RE.search(str(val))
+    return int(m.group(0)) if m else None
+
+
+def _clean(x):
+    return None if x is None else str(x).strip()
+
+
+def _join(strings, sep):
+    """等同 BeautifulSoup 的 get_text(sep, strip=True)：每段去空白、丟掉空字串再接起來。"""
+    return sep.join(s for s in (s.strip() for s in strings) if s)
+
+
+def _make_row(href, h3_text, meta_texts):
+    """各後端取出原始字串後，統一在這裡組成一列。"""
+    link = BASE + href if href else None
+    m = _RANK_RE.match(h3_text)
+    if m:
+        rank = int(m.group(1))
+        title = m.group(2).strip()
+    else:
+        rank = None
+        title = h3_text.strip()
+
+    year = runtime = cert = None
+    if meta_texts is not None:
+        if len(meta_texts) >= 1:
+            year = _to_year(meta_texts[0])
+        if len(meta_texts) >= 2:
+            runtime = _clean(meta_texts[1])
+        if len(meta_texts) >= 3:
+            cert = _clean(meta_texts[2])
+
+    return {
+        "排名": rank,
+        "片名": title,
+        "年份": year,
+        "時長": runtime,
+        "分級": cert,
+        "連結": link
+    }
+
+
+# ---------- BeautifulSoup ----------
+
+def _rows_bs4(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for li in soup.select("li[class*='ipc-metadata-list-summary-item']"):
+        # 連結：<a class="ipc-title-link-wrapper" href="/title/tt0111161/?ref_=...">
+        a_tag = li.select_one("a.ipc-title-link-wrapper")
+        href = a_tag.get("href") if a_tag else None
+
+        # 標題+排名：<h3 class="ipc-title__text">1. 刺激1995</h3>
+        h3 = li.select_one("h3.ipc-title__text") or li.find("h3")
+        if not h3:
+            continue
+
+        # 年份 / 時長 / 分級
+        meta_div = li.select_one("div[class*='cli-title-metadata']")
+        meta_texts = None
+        if meta_div:
+            meta_texts = [s.get_text(" ", strip=True)
+                          for s in meta_div.select("span[class*='cli-title-metadata-item']")]
+
+        rows.append(_make_row(href, h3.get_text(strip=True), meta_texts))
+    return rows
+
+
+# ---------- lxml ----------
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _lxml_strings(el):
+    """依文件順序產生 el 底下所有文字節點（略過註解/PI，但保留它們的 tail）。"""
+    if isinstance(el.tag, str) and el.text:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str):
+            yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _rows_lxml(html):
+    import lxml.html
+
+    doc = lxml.html.document_fromstring(html)
+    rows = []
+    for li in doc.xpath("//li[contains(@class, 'ipc-metadata-list-summary-item')]"):
+        a_tags = li.xpath(f".//a[{_has_class('ipc-title-link-wrapper')}]")
+        href = a_tags[0].get("href") if a_tags else None
+
+        h3s = li.xpath(f".//h3[{_has_class('ipc-title__text')}]") or li.xpath(".//h3")
+        if not h3s:
+            continue
+
+        meta_divs = li.xpath(".//div[contains(@class, 'cli-title-metadata')]")
+        meta_texts = None
+        if meta_divs:
+            meta_texts = [_join(_lxml_strings(s), " ")
+                          for s in meta_divs[0].xpath(".//span[contains(@class, 'cli-title-metadata-item')]")]
+
+        rows.append(_make_row(href, _join(_lxml_strings(h3s[0]), ""), meta_texts))
+    return rows
+
+
+# ---------- selectolax ----------
+
+def _lexbor_strings(node):
+    for n in node.traverse(include_text=True):
+        if n.tag == "-text":
+            yield n.text_content
+
+
+def _rows_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    rows = []
+    for li in tree.css("li[class*='ipc-metadata-list-summary-item']"):
+        a_tag = li.css_first("a.ipc-title-link-wrapper")
+        href = a_tag.attributes.get("href") if a_tag else None
+
+        h3 = li.css_first("h3.ipc-title__text") or li.css_first("h3")
+        if not h3:
+            continue
+
+        meta_div = li.css_first("div[class*='cli-title-metadata']")
+        meta_texts = None
+        if meta_div:
+            meta_texts = [_join(_lexbor_strings(s), " ")
+                          for s in meta_div.css("span[class*='cli-title-metadata-item']")]
+
+        rows.append(_make_row(href, _join(_lexbor_strings(h3), ""), meta_texts))
+    return rows
+
+
+_PARSERS = {
+    "bs4": _rows_bs4,
+    "lxml": _rows_lxml,
+    "selectolax": _rows_selectolax,
+}
+
+
+def available_backends():
+    """目前環境有安裝的後端（依速度排序）。"""
+    found = []
+    for name, module in (("selectolax", "selectolax.lexbor"), ("lxml", "lxml.html"), ("bs4", "bs4")):
+        try:
+            __import__(module)
+            found.append(name)
+        except ImportError:
+            continue
+    return found
+
+
+def extract_rows_from_html(html, backend="auto"):
+    """將整頁 HTML 解析成資料列。"""
+    if backend == "auto":
+        candidates = available_backends()
+        if not candidates:
+            raise ImportError("需要安裝 selectolax、lxml 或 beautifulsoup4 其中之一")
+        backend = candidates[0]
+    if backend not in _PARSERS:
+        raise ValueError(f"未知的解析後端：{backend}（可用：{', '.join(BACKENDS)}）")
+    return _PARSERS[backend](html)
+
+
+# ---------- __NEXT_DATA__ JSON ----------
+
+def find_next_data(html):
+    """取出頁面內嵌的 __NEXT_DATA__（dict）；沒有或壞掉回傳 None。"""
+    m = _NEXT_DATA_RE.search(html)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(1))
+    except ValueError:
+        return None
+
+
+def _chart_edges(data):
+    try:
+        return data["props"]["pageProps"]["pageData"]["chartTitles"]["edges"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _format_runtime(seconds):
+    """8520 → "2h 22m"，與清單上顯示的格式相同。"""
+    if not seconds:
+        return None
+    h, m = divmod(int(seconds) // 60, 60)
+    if h and m:
+        return f"{h}h {m}m"
+    return f"{h}h" if h else f"{m}m"
+
+
+def extract_rows_from_next_data(html):
+    """
+    由 __NEXT_DATA__ 組出與 extract_rows_from_html 相同欄位的資料列。
+    找不到 JSON 或結構不符時回傳 None（呼叫端可退回 DOM 解析）。
+    """
+    edges = _chart_edges(find_next_data(html))
+    if edges is None:
+        return None
+
+    rows = []
+    for edge in edges:
+        node = edge.get("node") or {}
+        title = (node.get("titleText") or {}).get("text")
+        if not title:
+            continue
+        rank = edge.get("currentRank")
+        title_id = node.get("id")
+        rows.append({
+            "排名": rank,
+            "片名": title.strip(),
+            "年份": (node.get("releaseYear") or {}).get("year"),
+            "時長": _format_runtime((node.get("runtime") or {}).get("seconds")),
+            "分級": _clean((node.get("certificate") or {}).get("rating")),
+            "連結": f"{BASE}/title/{title_id}/?ref_=chttp_t_{rank}" if title_id else None
+        })
+    return rows
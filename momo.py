@@ -1,22 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
+from momo_extract import absolute_url
+from momo_fetch import fetch_momo_products
+from price_normalize import parse_price
 
 def momo_search(keyword):
-    url = f"https://www.momoshop.com.tw/search/searchShop.jsp?keyword={keyword}&curPage=1"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(url, headers=headers)
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    items = soup.select(".listArea .goodsItemLi")
+    # 先用 requests 抓（momo_fetch 第一層），頁面沒有商品才改用瀏覽器
+    result = fetch_momo_products(keyword)
     results = []
-    for item in items:
-        name = item.select_one(".prdName").get_text(strip=True)
-        price = item.select_one(".price").get_text(strip=True)
-        link = "https://www.momoshop.com.tw" + item.select_one("a")["href"]
-        results.append({"name": name, "price": price, "url": link})
+    for p in result.products:
+        results.append({"name": p.name, "price": parse_price(p.current_price), "url": absolute_url(p.url)})
     return results
 
-# 測試 MOMO
-data = momo_search("iPhone 15")
-for d in data[:5]:
-    print(d)
+if __name__ == "__main__":
+    # 測試 MOMO
+    data = momo_search("iPhone 15")
+    for d in data[:5]:
+        print(d)
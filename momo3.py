@@ -1,52 +1,48 @@
-from playwright.sync_api import sync_playwright
+from momo_extract import absolute_url, extract_momo_products, SEARCH_READY
+from price_history import PriceHistory, snapshot_rows
+from price_normalize import normalize_rows
+from run_profile import current_profile
+from sinks import open_sink
 import pandas as pd
 
-def scrape_iphone_data():
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto("https://www.momoshop.com.tw/search/searchShop.jsp?keyword=iphone%2015&_isFuzzy=0&searchType=1", timeout=60000)
-        page.wait_for_load_state("networkidle", timeout=60000)
-        print("Page loaded successfully.")
+def scrape_iphone_data(pool=None):
+    profile = current_profile()
+    pool = pool or profile.pool()
+    # Images, fonts and trackers are never used here, so the production profile blocks them at the route level
+    with pool.lease(block=profile.block_profile) as page:
+        # Ready once the li.listAreaLi count is stable (SEARCH_READY) rather than at networkidle
+        if SEARCH_READY.goto(page, "https://www.momoshop.com.tw/search/searchShop.jsp?keyword=iphone%2015&_isFuzzy=0&searchType=1", timeout=60000):
+            print("Page loaded successfully.")
+        else:
+            print("Product list did not settle in time; extracting whatever is there.")
+
+        # Each product is an li.listAreaLi: the name is the 'title' of .goods-img-url, the price is in .price b.
+        # All of them are pulled out in a single page.evaluate() call (see momo_extract.SEARCH_LAYOUT).
+        iphone_products = extract_momo_products(page)
+
+        print(f"Found {len(iphone_products)} potential iPhone 15 product elements.")
+
+        # current_price is stored as an integer ('$32,900' -> 32900, missing -> None)
+        products_data = normalize_rows(
+            {**product.to_dict(['name', 'current_price']), 'url': absolute_url(product.url)}
+            for product in iphone_products
+        )
 
-        # Locate product elements. Based on the provided HTML, each product seems to be within an li with class listAreaLi
-        # Let's refine the selector to be more specific if needed after testing.
-        # Looking at the HTML snippet, the link to the product has class 'goods-img-url' and the title attribute seems to contain the name.
-        # The price is within a div with class 'money', and the current price is within a span with class 'price' and a bold tag.
-        iphone_product_elements = page.locator('li.listAreaLi').all()
-
-        print(f"Found {len(iphone_product_elements)} potential iPhone 15 product elements.")
-
-        products_data = []
-        for product_element in iphone_product_elements:
-            # Locate the anchor tag with class 'goods-img-url' within the product element
-            link_element = product_element.locator('.goods-img-url').first
-
-            # Get the product name from the 'title' attribute of the anchor tag
-            name = link_element.get_attribute('title') if link_element.count() > 0 else 'N/A'
-
-            # Locate the element containing the current price using the .price class and the bold tag within it
-            current_price_element = product_element.locator('.price b').first
-            current_price = current_price_element.text_content() if current_price_element.count() > 0 else 'N/A'
-
-            products_data.append({
-                'name': name.strip() if name else 'N/A',
-                'current_price': current_price.strip() if current_price else 'N/A'
-            })
-
-        browser.close()
         return products_data
 
-# Running the sync function and storing the result
-products_data = scrape_iphone_data()
+if __name__ == "__main__":
+    # Running the sync function and storing the result
+    products_data = scrape_iphone_data()
 
-# Convert the list of product dictionaries to a pandas DataFrame
-products_df = pd.DataFrame(products_data)
+    # Stream the rows into the CSV (utf-8-sig, written to a .part file and renamed when complete)
+    with open_sink('iphone_15_products.csv', columns=['name', 'current_price']) as sink:
+        sink.write_many(products_data)
 
-# Display the DataFrame using print for standard Python environments
-print(products_df.head().to_markdown(index=False))
+    # Keep every run in the date-partitioned price history (the CSV above is overwritten each time)
+    saved = PriceHistory().append(snapshot_rows(products_data, source='Momo', keyword='iphone 15'))
+    print(f"Appended {saved} price snapshots to the price history.")
 
-# Save the DataFrame to a CSV file with utf-8-sig encoding
-products_df.to_csv('iphone_15_products.csv', index=False, encoding='utf-8-sig')
+    # Display a preview using print for standard Python environments
+    print(pd.DataFrame(products_data[:5]).to_markdown(index=False))
 
-print("\n商品資訊已儲存至 iphone_15_products.csv 檔案。")
\ No newline at end of file
+    print("\n商品資訊已儲存至 iphone_15_products.csv 檔案。")
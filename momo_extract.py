@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+momo 商品列表的批次擷取。
+
+原本每個 li 都要 locator().first / count() / get_attribute() / text_content() 來回好幾次，
+30~100 個商品就是幾百次 IPC。這裡改成：
+- extract_momo_products(page)：一次 page.evaluate() 在瀏覽器內把所有商品欄位整理好傳回來
+- parse_momo_products_html(html)：拿 page.content() 或 requests 抓到的 HTML 離線解析
+
+兩者吃同一份版面設定（SEARCH_LAYOUT / MAIN_LAYOUT），回傳 MomoProduct list。
+SEARCH_READY / MAIN_READY 則是各版面「商品列表畫完、可以擷取了」的條件（取代 networkidle）。
+"""
+
+from dataclasses import dataclass, asdict
+
+from bs4 import BeautifulSoup
+
+from waits import Readiness
+
+MOMO_BASE = "https://www.momoshop.com.tw"
+
+# 搜尋結果頁（searchShop.jsp）
+SEARCH_LAYOUT = {
+    "item": "li.listAreaLi",
+    "link": ".goods-img-url",
+    "name_fallback": ".prdName",
+    "price": ".price b",
+    "original_price": ".oPrice b",
+}
+
+# 首頁（Main.jsp）的商品區塊
+MAIN_LAYOUT = {
+    "item": 'li[class*="prd"]',
+    "link": "a",
+    "name_fallback": ".prdname",
+    "price": ".price b",
+    "original_price": ".oPrice b",
+}
+
+# 搜尋頁的商品是伺服器端輸出的，出現後很快就固定
+SEARCH_READY = Readiness(SEARCH_LAYOUT["item"], min_count=1, stable_ms=200, name="momo 搜尋列表")
+# 首頁的商品區塊是 JS 分批長出來的，穩定時間放寬
+MAIN_READY = Readiness(MAIN_LAYOUT["item"], min_count=1, stable_ms=500, name="momo 首頁商品")
+
+# 舊版搜尋頁（momo.py 用的 .listArea .goodsItemLi）
+GOODS_ITEM_LAYOUT = {
+    "item": ".listArea .goodsItemLi",
+    "link": "a",
+    "name_fallback": ".prdName",
+    "price": ".price",
+    "original_price": None,
+}
+
+
+@dataclass
+class MomoProduct:
+    name: str = 'N/A'
+    current_price: str = 'N/A'
+    original_price: str = 'N/A'
+    url: str = 'N/A'
+
+    def to_dict(self, fields=None):
+        """轉成 dict；fields 可指定只保留哪些欄位（依給定順序）。"""
+        d = asdict(self)
+        return {k: d[k] for k in fields} if fields else d
+
+
+# 在瀏覽器內一次跑完所有商品；欄位沒有就回 null，由 Python 端補 'N/A'
+# （async 版可直接 to_products(await page.evaluate(EXTRACT_JS, layout))）
+EXTRACT_JS = """
+(layout) => {
+    const text = el => el ? (el.textContent || '').trim() : null;
+    return Array.from(document.querySelectorAll(layout.item)).map(li => {
+        const q = sel => sel ? li.querySelector(sel) : null;
+        const link = q(layout.link);
+        let name = link ? link.getAttribute('title') : null;
+        if (!name) name = text(q(layout.name_fallback));
+        return {
+            name: name,
+            current_price: text(q(layout.price)),
+            original_price: text(q(layout.original_price)),
+            url: link ? link.getAttribute('href') : null,
+        };
+    });
+}
+"""
+
+
+def _to_product(raw):
+    return MomoProduct(**{k: (v.strip() if isinstance(v, str) and v.strip() else 'N/A') for k, v in raw.items()})
+
+
+def to_products(raw_list):
+    """把 EXTRACT_JS 回傳的 dict list 轉成 MomoProduct list。"""
+    return [_to_product(raw) for raw in raw_list]
+
+
+def extract_momo_products(page, layout=SEARCH_LAYOUT):
+    """一次 evaluate 取出頁面上所有商品。"""
+    return to_products(page.evaluate(EXTRACT_JS, layout))
+
+
+def parse_momo_products_html(html, layout=SEARCH_LAYOUT):
+    """離線解析一份 HTML（page.content() 或 requests 回應），欄位規則與 extract_momo_products 相同。"""
+    soup = BeautifulSoup(html, "html.parser")
+    products = []
+    for li in soup.select(layout["item"]):
+        link = li.select_one(layout["link"])
+        name = link.get("title") if link else None
+        if not name and layout.get("name_fallback"):
+            el = li.select_one(layout["name_fallback"])
+            name = el.get_text() if el else None
+        price = li.select_one(layout["price"])
+        original_price = li.select_one(layout["original_price"]) if layout.get("original_price") else None
+        products.append(_to_product({
+            "name": name,
+            "current_price": price.get_text() if price else None,
+            "original_price": original_price.get_text() if original_price else None,
+            "url": link.get("href") if link else None,
+        }))
+    return products
+
+
+def absolute_url(href):
+    """momo 的 href 常是相對路徑（/goods/GoodsDetail.jsp?i_code=...），補成完整網址。"""
+    if not href or href == 'N/A':
+        return 'N/A'
+    if href.startswith("//"):
+        return "https:" + href
+    if href.startswith("/"):
+        return MOMO_BASE + href
+    return href
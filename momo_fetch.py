@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+momo 搜尋的分層抓取：先用 requests 抓 searchShop.jsp（輕量），確認裡面真的有商品節點才採用；
+抓不到、被擋或只拿到空殼頁，才升級成 Playwright（從 browser_pool 借分頁）。
+
+    result = fetch_momo_products("iphone 15")
+    result.tier      # "http" 或 "browser"
+    result.products  # list[MomoProduct]
+
+TIER_STATS 會累計每一層各服務了幾次，方便觀察有多少搜尋省掉了瀏覽器。
+"""
+
+import sys
+import time
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass, field
+
+import requests
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from http_session import get_session
+from momo_extract import SEARCH_LAYOUT, SEARCH_READY, GOODS_ITEM_LAYOUT, extract_momo_products, parse_momo_products_html
+from route_block import SCRAPE_PROFILE
+from run_profile import current_profile
+
+MOMO_SEARCH_URL = "https://www.momoshop.com.tw/search/searchShop.jsp?keyword={keyword}&_isFuzzy=0&searchType=1&curPage={page}"
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/127.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
+}
+HTTP_TIMEOUT = 15
+BROWSER_TIMEOUT = 60000
+BROWSER_BLOCK = SCRAPE_PROFILE   # 瀏覽器層不載圖片/字型/追蹤碼；設 None 則全部放行（debug 設定檔一律放行）
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIER_NONE = "none"
+
+TIER_STATS = Counter()
+
+
+@dataclass
+class FetchResult:
+    keyword: str
+    tier: str
+    products: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def search_url(keyword, page=1):
+    return MOMO_SEARCH_URL.format(keyword=urllib.parse.quote(keyword), page=page)
+
+
+def has_real_products(products, min_products=1):
+    """至少 min_products 筆同時有品名與價格，才算真的拿到商品（空殼頁/驗證頁會是 0）。"""
+    real = [p for p in products if p.name != 'N/A' and p.current_price != 'N/A']
+    return len(real) >= min_products
+
+
+def parse_search_html(html):
+    """依序嘗試已知的搜尋頁版面，回傳第一個有商品的結果。"""
+    for layout in (SEARCH_LAYOUT, GOODS_ITEM_LAYOUT):
+        products = parse_momo_products_html(html, layout)
+        if products:
+            return products
+    return []
+
+
+def fetch_momo_http(keyword, page=1, session=None):
+    """第一層：純 HTTP + 離線解析。失敗回傳空 list。"""
+    session = session or get_session()
+    try:
+        resp = session.get(search_url(keyword, page), headers=HEADERS, timeout=HTTP_TIMEOUT)
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"[momo:http] '{keyword}' 取得失敗：{e}", file=sys.stderr)
+        return []
+    return parse_search_html(resp.text)
+
+
+def fetch_momo_browser(keyword, page=1, pool=None):
+    """第二層：Playwright 開頁，等商品列表數量穩定（SEARCH_READY）後一次擷取。失敗回傳空 list。"""
+    profile = current_profile()
+    pool = pool or profile.pool()
+    try:
+        with pool.lease(block=BROWSER_BLOCK if profile.block else None) as tab:
+            try:
+                ready = SEARCH_READY.goto(tab, search_url(keyword, page), timeout=BROWSER_TIMEOUT)
+            except PlaywrightTimeoutError:
+                ready = False
+            if not ready:
+                print(f"[momo:browser] '{keyword}' 等不到商品節點", file=sys.stderr)
+                return []
+            return extract_momo_products(tab)
+    except PlaywrightError as e:        # 導覽被中斷、分頁被關、evaluate 失敗…都只算這個關鍵字抓不到
+        print(f"[momo:browser] '{keyword}' 取得失敗：{e.__class__.__name__}: {e}", file=sys.stderr)
+        return []
+
+
+def fetch_momo_products(keyword, page=1, pool=None, session=None, min_products=1):
+    """先 HTTP、不行才開瀏覽器；回傳 FetchResult（含服務的 tier）。"""
+    start = time.perf_counter()
+
+    products = fetch_momo_http(keyword, page, session=session)
+    tier = TIER_HTTP
+    if not has_real_products(products, min_products):
+        print(f"[momo] '{keyword}' HTTP 結果不足（{len(products)} 筆），改用瀏覽器", file=sys.stderr)
+        products = fetch_momo_browser(keyword, page, pool=pool)
+        tier = TIER_BROWSER if products else TIER_NONE
+
+    TIER_STATS[tier] += 1
+    result = FetchResult(keyword, tier, products, time.perf_counter() - start)
+    print(f"[momo] '{keyword}' 由 {tier} 取得 {len(products)} 筆（{result.elapsed:.2f}s）", file=sys.stderr)
+    return result
@@ -1,9 +1,12 @@
-import requests
 import pandas as pd
 
+from http_session import get_session
+from pchome_crawl import iter_pchome_products
+from price_normalize import parse_price
+
 def pchome_search(keyword, page=1):
     url = f"https://ecshweb.pchome.com.tw/search/v3.3/all/results?q={keyword}&page={page}&sort=sale/dc"
-    resp = requests.get(url)
+    resp = get_session(cached=True).get(url)
     data = resp.json()
     items = data['prods']
 
@@ -11,12 +14,18 @@ def pchome_search(keyword, page=1):
     for item in items:
         results.append({
             "name": item["name"],
-            "price": item["price"],
+            "price": parse_price(item["price"]),
             "url": f"https://24h.pchome.com.tw/prod/{item['Id']}"
         })
     return results
 
-# 測試抓 iPhone 15
-data = pchome_search("iPhone 15")
-df = pd.DataFrame(data)
-print(df.head())
+def pchome_search_all(keyword, max_pages=None):
+    """讀 totalPage 後平行抓其餘頁面，逐筆產生（不會一次載入全部結果）"""
+    for item in iter_pchome_products(keyword, sort="sale/dc", max_pages=max_pages):
+        yield {"name": item["name"], "price": parse_price(item["price"]), "url": item["url"]}
+
+if __name__ == "__main__":
+    # 測試抓 iPhone 15
+    data = pchome_search("iPhone 15")
+    df = pd.DataFrame(data)
+    print(df.head())
@@ -1,7 +1,10 @@
-import requests, urllib.parse
+import urllib.parse
 
-q = urllib.parse.quote("iphone 15")
-url = f"https://ecshweb.pchome.com.tw/search/v3.3/all/results?q={q}&page=1&sort=sale/dc"
-data = requests.get(url, timeout=10).json()
-for p in data.get("prods", [])[:10]:
-    print(p["name"], p["price"], "https://24h.pchome.com.tw/prod/" + p["Id"])
+from http_session import get_session
+
+if __name__ == "__main__":
+    q = urllib.parse.quote("iphone 15")
+    url = f"https://ecshweb.pchome.com.tw/search/v3.3/all/results?q={q}&page=1&sort=sale/dc"
+    data = get_session().get(url, timeout=10).json()
+    for p in data.get("prods", [])[:10]:
+        print(p["name"], p["price"], "https://24h.pchome.com.tw/prod/" + p["Id"])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+PChome 搜尋 API（search/v3.3/all/results）多頁爬取。
+
+先抓第 1 頁讀 totalPage，其餘頁面用執行緒平行抓，所有請求共用同一個 keep-alive Session，
+並以每個 host 的速率上限節流（Session 與節流器都來自 http_session）。
+結果用 generator 逐筆吐出，整個關鍵字的結果不必同時放在記憶體裡：
+
+    for prod in iter_pchome_products("iphone 15"):
+        print(prod["name"], prod["price"])
+"""
+
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from http_session import HostRateLimiter, get_session
+
+PCHOME_API = "https://ecshweb.pchome.com.tw/search/v3.3/all/results"
+PROD_URL = "https://24h.pchome.com.tw/prod/{id}"
+
+# ====== 可調參數 ======
+MAX_WORKERS = 4          # 同時抓幾頁
+RATE_PER_SEC = 5.0       # 對同一 host 每秒最多幾個請求
+HTTP_TIMEOUT = 15
+
+_limiter = HostRateLimiter(RATE_PER_SEC)
+
+
+def fetch_page(session, keyword, page=1, sort=None, limiter=None):
+    """抓單一頁，回傳 API 的 JSON dict。"""
+    params = {"q": keyword, "page": page}
+    if sort:
+        params["sort"] = sort
+    url = f"{PCHOME_API}?{urllib.parse.urlencode(params)}"
+    if limiter:
+        limiter.wait(url)
+    resp = session.get(url, timeout=HTTP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _rows(data):
+    for item in (data or {}).get("prods") or []:
+        product_id = item.get("Id")
+        yield {
+            "Id": product_id,
+            "name": item.get("name", "N/A"),
+            "price": item.get("price", "N/A"),
+            "url": PROD_URL.format(id=product_id) if product_id else "N/A",
+        }
+
+
+def iter_pchome_products(keyword, sort=None, max_pages=None, max_workers=MAX_WORKERS,
+                         session=None, limiter=None):
+    """
+    逐筆產生某關鍵字所有頁面的商品。
+    第 1 頁依序吐出；第 2 頁以後依完成順序吐出（不保證頁序）。
+    同時在途的頁面最多 max_workers 個，所以記憶體用量與總頁數無關。
+    """
+    session = session or get_session()
+    limiter = limiter or _limiter
+
+    first = fetch_page(session, keyword, 1, sort, limiter)
+    total_pages = int(first.get("totalPage") or 1)
+    if max_pages:
+        total_pages = min(total_pages, max_pages)
+    print(f"[pchome] '{keyword}' 共 {total_pages} 頁", file=sys.stderr)
+    yield from _rows(first)
+
+    pages = iter(range(2, total_pages + 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        in_flight = {}
+        for page in pages:
+            in_flight[ex.submit(fetch_page, session, keyword, page, sort, limiter)] = page
+            if len(in_flight) >= max_workers:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                page = in_flight.pop(fut)
+                try:
+                    data = fut.result()
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    print(f"[pchome] '{keyword}' 第 {page} 頁失敗：{e}", file=sys.stderr)
+                    data = None
+                # 補一頁進來，維持在途數量
+                nxt = next(pages, None)
+                if nxt is not None:
+                    in_flight[ex.submit(fetch_page, session, keyword, nxt, sort, limiter)] = nxt
+                yield from _rows(data)
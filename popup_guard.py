@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+彈窗守衛：在頁面載入時注入一個 MutationObserver，cookie 同意/公告/訂閱這類彈窗一出現就自動按掉。
+
+原本 2.1.py 的 close_popups 是十個候選按鈕各 click(timeout=1200) 逐一試，再每次命中 sleep 0.3 秒，
+完全沒有彈窗的頁面也要白等十幾秒；1.1.py / 1.2.1.py / backup/1.4.py 也各有一份自己的版本。
+改成：
+
+    guard = PopupGuard(log=log).install(page)   # goto 之前呼叫
+    page.goto(...)
+    wait_dom_settled(page)
+    guard.disarm()                              # 首頁載入完就停手，之後的日曆/確認框交給流程自己處理
+    ...
+    guard.report(log)                           # 列出這次自動關掉了哪些彈窗
+
+- 只按「看起來是彈窗」裡的按鈕：在 [role=dialog]、.modal、cookie/consent 區塊，或 position:fixed 的浮層內
+- 按鈕文字完全等於 DISMISS_TEXTS 之一，或符合 DISMISS_SELECTORS（×、.close 這類）才會按
+- add_init_script 讓每次換頁、每個 iframe 都自動裝上；install() 時也對目前已載入的頁面補裝一次
+- 每按掉一個就透過 expose_function 回報給 Python，記在 guard.closed
+- 流程自己打開的日曆、確認框也是 fixed 浮層、也有「確定」「關閉」，所以載入完就要 disarm()；
+  按之前會先問 Python 還能不能按，disarm 之後各分頁、iframe、換頁後的新文件都不會再按
+"""
+
+import json
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+
+DISMISS_TEXTS = ["接受", "同意", "我同意", "我知道了", "關閉", "確定", "OK", "Accept", "Got it"]
+DISMISS_SELECTORS = [".close", "button.close", ".btn-close", "[aria-label='關閉']", "[aria-label='Close']"]
+POPUP_CONTAINERS = [
+    "[role='dialog']", "[role='alertdialog']", "[aria-modal='true']", ".modal", ".popup",
+    "[class*='cookie']", "[id*='cookie']", "[class*='consent']", "[id*='consent']",
+]
+
+_REPORT_BINDING = "__popupGuardReport"
+_ARMED_BINDING = "__popupGuardArmed"
+
+_GUARD_JS = """
+(config) => {
+    if (window.__popupGuardInstalled) return;
+    window.__popupGuardInstalled = true;
+
+    const texts = new Set(config.texts);
+    const closeSel = config.selectors.join(', ');
+    const containerSel = config.containers.join(', ');
+    const buttonSel = 'button, a, [role="button"]' + (closeSel ? ', ' + closeSel : '');
+
+    const visible = el => {
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 || r.height === 0) return false;
+        const st = getComputedStyle(el);
+        return st.visibility !== 'hidden' && st.display !== 'none';
+    };
+    // 往上找「彈窗容器」：符合容器 selector，或 position 為 fixed 的浮層
+    const overlayOf = el => {
+        for (let n = el; n && n !== document.body && n !== document.documentElement; n = n.parentElement) {
+            if (n.matches(containerSel)) return n;
+            if (getComputedStyle(n).position === 'fixed') return n;
+        }
+        return null;
+    };
+    const report = info => {
+        try { window[config.binding] && window[config.binding](info); } catch (e) {}
+    };
+    // disarm() 之後 Python 回傳 false；binding 不在（沒有 expose）時一律不按
+    let observer = null;
+    const armed = async () => {
+        try { return !!(window[config.armed] && await window[config.armed]()); } catch (e) { return false; }
+    };
+
+    const scan = async () => {
+        const found = [];
+        for (const btn of document.querySelectorAll(buttonSel)) {
+            if (btn.dataset.popupGuard) continue;
+            const text = (btn.innerText || btn.getAttribute('aria-label') || '').trim();
+            const byText = texts.has(text);
+            const bySel = closeSel && btn.matches(closeSel);
+            if (!byText && !bySel) continue;
+            if (!visible(btn)) continue;
+            const overlay = overlayOf(btn);
+            if (!overlay) continue;
+            found.push({ btn, text, byText, overlay });
+        }
+        if (!found.length) return;
+        if (!(await armed())) {
+            observer && observer.disconnect();
+            return;
+        }
+        for (const { btn, text, byText, overlay } of found) {
+            if (!btn.isConnected) continue;
+            btn.dataset.popupGuard = '1';
+            btn.click();
+            report({
+                text: text || null,
+                match: byText ? 'text' : 'selector',
+                container: (overlay.id ? '#' + overlay.id : '') || overlay.className || overlay.tagName.toLowerCase(),
+                url: location.href,
+            });
+        }
+    };
+
+    // 同一批變動只掃一次
+    let pending = false;
+    const schedule = () => {
+        if (pending) return;
+        pending = true;
+        setTimeout(() => { pending = false; scan(); }, 50);
+    };
+    const start = () => {
+        observer = new MutationObserver(schedule);
+        observer.observe(document.documentElement, {
+            subtree: true, childList: true, attributes: true, attributeFilter: ['class', 'style', 'hidden', 'open'],
+        });
+        schedule();
+    };
+    if (document.documentElement) start();
+    else document.addEventListener('DOMContentLoaded', start, { once: true });
+}
+"""
+
+
+class PopupGuard:
+    def __init__(self, texts=None, selectors=None, containers=None, log=None):
+        self.config = {
+            "texts": list(DISMISS_TEXTS if texts is None else texts),
+            "selectors": list(DISMISS_SELECTORS if selectors is None else selectors),
+            "containers": list(POPUP_CONTAINERS if containers is None else containers),
+            "binding": _REPORT_BINDING,
+            "armed": _ARMED_BINDING,
+        }
+        self.log = log
+        self.closed = []
+        self.armed = True
+
+    def _on_report(self, info):
+        info["at"] = time.strftime("%H:%M:%S")
+        self.closed.append(info)
+        if self.log:
+            self.log(f"  - 已自動關閉彈窗：{info.get('text') or info.get('match')}（{info.get('container')}）")
+
+    def install(self, page):
+        """裝到一個 page 上（每個 page 只能裝一次）；回傳自己方便串接。"""
+        page.expose_function(_REPORT_BINDING, self._on_report)
+        page.expose_function(_ARMED_BINDING, lambda: self.armed)
+        script = f"({_GUARD_JS})({json.dumps(self.config, ensure_ascii=False)})"
+        page.add_init_script(script=script)
+        # 已經載入的文件不會再跑 init script，補裝一次
+        try:
+            page.evaluate(script)
+        except PlaywrightError:
+            pass
+        return self
+
+    def disarm(self):
+        """初始載入完成後呼叫：之後再出現的浮層（日曆、確認框）一律不按；回傳自己方便串接。"""
+        self.armed = False
+        return self
+
+    def report(self, log=print):
+        if not self.closed:
+            log("彈窗守衛：這次沒有需要關閉的彈窗")
+            return
+        log(f"彈窗守衛：共自動關閉 {len(self.closed)} 個彈窗")
+        for info in self.closed:
+            log(f"  [{info['at']}] {info.get('text') or info.get('match')} ← {info.get('container')}  {info.get('url')}")
@@ -1,95 +1,78 @@
-from playwright.sync_api import sync_playwright
+import argparse
+import os
+import sys
 import requests
 import urllib.parse
 import pandas as pd
-from fuzzywuzzy import fuzz
 
-# Function to scrape data from momoshop search results (Synchronous version)
-def scrape_momo_data_sync(keyword):
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        encoded_keyword = urllib.parse.quote(keyword)
-        url = f"https://www.momoshop.com.tw/search/searchShop.jsp?keyword={encoded_keyword}&_isFuzzy=0&searchType=1"
-        page.goto(url, timeout=60000)
-        page.wait_for_load_state("networkidle", timeout=60000)
-        print(f"Momo search page for '{keyword}' loaded successfully.")
-
-        # Locate product elements
-        product_elements = page.locator('li.listAreaLi').all()
-
-        print(f"Found {len(product_elements)} potential product elements on Momo for '{keyword}'.")
-
-        products_data = []
-        for product_element in product_elements:
-            link_element = product_element.locator('.goods-img-url').first
+from momo_fetch import fetch_momo_products
+from pchome_crawl import iter_pchome_products
+from price_changes import FEED_PATH, ChangeTracker, summarize
+from price_history import PriceHistory, snapshot_rows
+from price_normalize import normalize_prices, normalize_rows, parse_price
+from product_match import best_prices
+from route_block import SCRAPE_PROFILE
+from run_profile import add_profile_arguments, current_profile
+from sinks import open_sink
+
+MOMO_SEARCH_URL = "https://www.momoshop.com.tw/search/searchShop.jsp?keyword={keyword}&_isFuzzy=0&searchType=1"
+PCHOME_SEARCH_URL = "https://ecshweb.pchome.com.tw/search/v3.3/all/results?q={keyword}"
+RESULT_COLUMNS = ['name', 'current_price', 'url']
+RAW_OUTPUT = 'combined_products_sync.jsonl'  # every scraped row, streamed as it arrives
+# Column types for the streamed rows; a Parquet RAW_OUTPUT needs them when the first batch has no prices
+RESULT_SCHEMA = {'Source': 'string', 'name': 'string', 'current_price': 'int64', 'url': 'string'}
 
-            # Get the product name from the 'title' attribute of the anchor tag
-            name = link_element.get_attribute('title') if link_element.count() > 0 else 'N/A'
-
-            # Locate the element containing the current price using the .price class and the bold tag within it
-            current_price_element = product_element.locator('.price b').first
-            current_price = current_price_element.text_content() if current_price_element.count() > 0 else 'N/A'
-
-            product_url = link_element.get_attribute('href') if link_element.count() > 0 else 'N/A'
+# Function to scrape data from momoshop search results (Synchronous version)
+def scrape_momo_data_sync(keyword, pool=None):
+    # Try the plain HTTP search page first; a pooled browser page is only used when it has no real products
+    result = fetch_momo_products(keyword, pool=pool)
+    print(f"Momo search results for '{keyword}' served by the '{result.tier}' tier.")
 
-            products_data.append({
-                'name': name.strip() if name else 'N/A',
-                'current_price': current_price.strip() if current_price else 'N/A',
-                'url': product_url
-            })
+    print(f"Found {len(result.products)} potential product elements on Momo for '{keyword}'.")
 
-        browser.close()
-        return products_data
+    return normalize_rows(product.to_dict(RESULT_COLUMNS) for product in result.products)
 
-# Function to scrape data from PChome search results (using requests - Synchronous version)
-def scrape_pchome_data_sync(keyword):
+# Yield PChome search results one row at a time (pages are fetched in parallel, see pchome_crawl.py)
+# max_pages=None crawls every page of the search API
+def iter_pchome_rows(keyword, max_pages=1):
     encoded_keyword = urllib.parse.quote(keyword)
-    url = f"https://ecshweb.pchome.com.tw/search/v3.3/all/results?q={encoded_keyword}"
+    url = PCHOME_SEARCH_URL.format(keyword=encoded_keyword)
     print(f"Fetching PChome search results for '{keyword}' from: {url}")
+    for product in iter_pchome_products(keyword, max_pages=max_pages):
+        yield {
+            'name': product['name'],
+            'current_price': parse_price(product['price']),
+            'url': product['url']
+        }
+    print(f"PChome search results for '{keyword}' fetched successfully.")
+
+# Function to scrape data from PChome search results (using requests - Synchronous version)
+def scrape_pchome_data_sync(keyword, max_pages=1):
     try:
-        resp = requests.get(url)
-        resp.raise_for_status() # Raise an exception for bad status codes
-        data = resp.json()
-        print(f"PChome search results for '{keyword}' fetched successfully.")
-        pchome_products_data = []
-        if data and 'prods' in data:
-            for product in data['prods']:
-                name = product.get('name', 'N/A')
-                price = product.get('price', 'N/A')
-                product_id = product.get('Id', None)
-                product_url = f"https://24h.pchome.com.tw/prod/{product_id}" if product_id else 'N/A'
-
-                pchome_products_data.append({
-                    'name': name,
-                    'current_price': str(price) if price != 'N/A' else 'N/A',
-                    'url': product_url
-                })
-        return pchome_products_data
+        return list(iter_pchome_rows(keyword, max_pages))
     except requests.exceptions.RequestException as e:
         print(f"Failed to fetch PChome search results: {e}")
         return []
 
 
-# Define a synchronous function to get and combine data
-def get_combined_data_sync(keyword):
-    # Run scraping functions (synchronously)
-    momo_results = scrape_momo_data_sync(keyword)
-    pchome_results = scrape_pchome_data_sync(keyword)
-
+# Combine Momo / PChome results into one DataFrame sorted by price
+def combine_results(momo_results, pchome_results):
     # Convert results to DataFrames and add source
-    momo_df = pd.DataFrame(momo_results)
+    momo_df = pd.DataFrame(momo_results, columns=RESULT_COLUMNS)
     momo_df['Source'] = 'Momo'
 
-    pchome_df = pd.DataFrame(pchome_results)
+    pchome_df = pd.DataFrame(pchome_results, columns=RESULT_COLUMNS)
     pchome_df['Source'] = 'PChome'
 
     # Combine DataFrames
     combined_df = pd.concat([momo_df, pchome_df], ignore_index=True)
 
-    # Clean and convert price to numeric for sorting
-    combined_df['current_price'] = combined_df['current_price'].astype(str).str.replace(',', '', regex=False)
-    combined_df['current_price'] = pd.to_numeric(combined_df['current_price'], errors='coerce')
+    return sort_combined(combined_df)
+
+# Clean the price column and sort by it, with 'Source' as the first column
+def sort_combined(combined_df):
+    # Prices as Int64 ('$1,299', full-width digits, 'N/A'... handled in one pass by price_normalize)
+    combined_df['current_price'] = normalize_prices(combined_df['current_price'])
 
     # Sort by price (ascending)
     sorted_df = combined_df.sort_values(by='current_price', ascending=True).reset_index(drop=True)
@@ -102,19 +85,94 @@ def get_combined_data_sync(keyword):
 
     return sorted_df
 
+# Define a synchronous function to get and combine data
+# (see price_async.py for the concurrent version that queries both sites at once)
+def get_combined_data_sync(keyword):
+    # Run scraping functions (synchronously)
+    momo_results = scrape_momo_data_sync(keyword)
+    pchome_results = scrape_pchome_data_sync(keyword)
+
+    return combine_results(momo_results, pchome_results)
+
+# Yield every Momo / PChome row (with its 'Source') as soon as it is scraped
+def iter_combined_sync(keyword, pool=None, max_pages=1):
+    for row in scrape_momo_data_sync(keyword, pool=pool):
+        yield {'Source': 'Momo', **row}
+    try:
+        for row in iter_pchome_rows(keyword, max_pages):
+            yield {'Source': 'PChome', **row}
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch PChome search results: {e}")
+
+# Stream every Momo / PChome row into a sink (sinks.py) as soon as it is scraped, so a crash
+# halfway through keeps what was already fetched and memory does not grow with the result size
+def stream_combined_sync(keyword, sink, pool=None, max_pages=1):
+    sink.write_many(iter_combined_sync(keyword, pool, max_pages))
+    return sink.rows
+
+# Load a streamed JSONL file back as the combined, price-sorted DataFrame
+def load_combined(path):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['Source'] + RESULT_COLUMNS)
+    return sort_combined(pd.read_json(path, lines=True, dtype=False))
+
 # Example usage: Get and display combined and sorted data for "iphone 15"
 # This part should be run in a standard Python environment like PyCharm
 if __name__ == "__main__":
-    combined_sorted_df_sync = get_combined_data_sync("iphone 15")
+    parser = argparse.ArgumentParser(description="Compare Momo / PChome prices for one keyword")
+    parser.add_argument("keyword", nargs="?", default="iphone 15")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only diff against the last run and append price drops / new / delisted items "
+                             f"to {FEED_PATH} (see price_changes.py) instead of rewriting the tables")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    current_profile(args.profile)
+    keyword = args.keyword
+
+    if args.incremental:
+        # Unchanged products produce no output at all; the full tables below are skipped
+        events = ChangeTracker(keyword).update(iter_combined_sync(keyword))
+        print(f"{len(events)} changes for '{keyword}' {summarize(events)}, appended to {FEED_PATH}.")
+        for event in events:
+            print(f"  [{event['event']}] {event['source']} {event['name']}: {event['old_price']} -> {event['price']}")
+        sys.exit(0)
+
+    with open_sink(RAW_OUTPUT, schema=RESULT_SCHEMA) as sink:
+        stream_combined_sync(keyword, sink)
+    print(f"Streamed {sink.rows} rows to {RAW_OUTPUT}.")
+
+    # A sink that got no rows writes no file, so whatever sits at RAW_OUTPUT is an earlier run's output:
+    # drop it rather than read it back (and re-append it to the history) as this run's data
+    if not sink.rows and os.path.exists(RAW_OUTPUT):
+        os.remove(RAW_OUTPUT)
+
+    # The sorted views need every row, so they are built from the streamed file
+    combined_sorted_df_sync = load_combined(RAW_OUTPUT)
+
+    # Append this run to the date-partitioned price history (the CSV/HTML below are overwritten every run)
+    saved = PriceHistory().append(snapshot_rows(combined_sorted_df_sync.to_dict('records'), keyword=keyword))
+    print(f"Appended {saved} price snapshots to the price history.")
 
     # Display the DataFrame using print for standard Python environments
     print("\nCombined and Sorted Product Data:")
     print(combined_sorted_df_sync.to_markdown(index=False)) # Use to_markdown for better console display
 
-    # Save the combined and sorted DataFrame to a CSV file with utf-8-sig encoding
-    combined_sorted_df_sync.to_csv('combined_products_sync.csv', index=False, encoding='utf-8-sig')
+    # Save the combined and sorted DataFrame to a CSV file with utf-8-sig encoding (written to .part, then renamed)
+    with open_sink('combined_products_sync.csv') as csv_sink:
+        csv_sink.write_frame(combined_sorted_df_sync)
     print("\n合併後的商品資訊已儲存至 combined_products_sync.csv 檔案。")
 
+    # Group the same product across Momo/PChome and keep the cheapest listing of each
+    if combined_sorted_df_sync.empty:
+        print("\nNo listings this run; skipping the best-price table.")
+    else:
+        best_df = best_prices(combined_sorted_df_sync)
+        with open_sink('best_price_products_sync.csv') as best_sink:
+            best_sink.write_frame(best_df)
+        print(f"\nBest price per product ({len(best_df)} products from {len(combined_sorted_df_sync)} listings):")
+        print(best_df.drop(columns=['best_url']).head(20).to_markdown(index=False))
+        print("跨站比價結果已儲存至 best_price_products_sync.csv 檔案。")
+
     # Convert DataFrame to HTML with clickable links and styling
     def make_clickable(url):
         return f'<a href="{url}" target="_blank">{url}</a>'
@@ -160,4 +218,7 @@ if __name__ == "__main__":
     with open('combined_products_sync.html', 'w', encoding='utf-8') as f:
         f.write(html_output)
 
-    print("合併後的商品資訊已儲存至 combined_products_sync.html 檔案。")
\ No newline at end of file
+    print("合併後的商品資訊已儲存至 combined_products_sync.html 檔案。")
+
+    # momo's browser tier (momo_fetch) loads pages without images, fonts or trackers
+    print(SCRAPE_PROFILE.summary())
\ No newline at end of file
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+price.py 的非同步版：同一個關鍵字同時向 momo（Playwright async）與 PChome（aiohttp）發出請求，
+先回來的先收；多個關鍵字則以 Semaphore 限制同時進行的數量，整批共用一個 browser 與一個 HTTP session。
+
+用法：
+    python price_async.py "iphone 15" "ipad air"
+    python price_async.py --file keywords.txt --concurrency 16
+    python price_async.py --debug "iphone 15"        # 開視窗、不擋資源、每個 context 錄 trace
+"""
+
+import argparse
+import asyncio
+import sys
+import urllib.parse
+
+import aiohttp
+import pandas as pd
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from momo_extract import EXTRACT_JS, SEARCH_LAYOUT, SEARCH_READY, to_products
+from momo_fetch import HEADERS, TIER_BROWSER, TIER_HTTP, TIER_NONE, TIER_STATS, has_real_products, parse_search_html
+from route_block import SCRAPE_PROFILE
+from run_profile import add_profile_arguments, current_profile
+from price import MOMO_SEARCH_URL, PCHOME_SEARCH_URL, RESULT_COLUMNS, combine_results
+from price_normalize import normalize_rows, parse_price
+
+# ====== 可調參數 ======
+KEYWORD_CONCURRENCY = 8      # 同時處理的關鍵字數
+MOMO_PAGE_CONCURRENCY = 4    # 同時開著的 momo 分頁數（分頁最吃記憶體，另外限制）
+HTTP_TIMEOUT = 20            # PChome API 逾時（秒）
+OUTPUT_CSV = "combined_products_async.csv"
+
+
+async def scrape_momo_http_async(session, keyword):
+    """第一層：aiohttp 抓搜尋頁離線解析；沒有真的商品就回傳空 list。"""
+    url = MOMO_SEARCH_URL.format(keyword=urllib.parse.quote(keyword))
+    try:
+        async with session.get(url, headers=HEADERS) as resp:
+            resp.raise_for_status()
+            html = await resp.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[momo:http] '{keyword}' 取得失敗：{e}", file=sys.stderr)
+        return []
+    products = parse_search_html(html)
+    return products if has_real_products(products) else []
+
+
+async def scrape_momo_browser_async(browser, keyword):
+    """第二層：開一個獨立 context 抓 momo 搜尋結果；失敗回傳空 list，不影響其他關鍵字。"""
+    profile = current_profile()
+    context = None
+    try:
+        context = await browser.new_context()
+        if profile.tracing:
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        page = await context.new_page()
+        if profile.block:
+            await SCRAPE_PROFILE.apply_async(page)  # 不載圖片/字型/追蹤碼
+        url = MOMO_SEARCH_URL.format(keyword=urllib.parse.quote(keyword))
+        # 商品列表數量穩定就擷取，不等 networkidle（廣告/追蹤請求會一直拖著）
+        if not await SEARCH_READY.goto_async(page, url, timeout=60000):
+            print(f"[momo] '{keyword}' 商品列表未在時限內穩定", file=sys.stderr)
+        return to_products(await page.evaluate(EXTRACT_JS, SEARCH_LAYOUT))
+    except PlaywrightTimeoutError as e:
+        print(f"[momo] '{keyword}' 載入逾時：{e}", file=sys.stderr)
+        return []
+    except PlaywrightError as e:  # 導覽被中斷、分頁/context 被關掉…都只影響這個關鍵字
+        print(f"[momo] '{keyword}' 瀏覽器錯誤：{e}", file=sys.stderr)
+        return []
+    finally:
+        if context is not None:
+            try:
+                if profile.tracing:
+                    await context.tracing.stop(path=profile.trace_path(f"momo_{keyword}"))
+                await context.close()
+            except PlaywrightError as e:
+                print(f"[momo] '{keyword}' 關閉 context 失敗：{e}", file=sys.stderr)
+
+
+async def scrape_momo_data_async(browser, session, keyword, momo_sem):
+    """先 HTTP，不行才佔用一個瀏覽器分頁名額。"""
+    products = await scrape_momo_http_async(session, keyword)
+    tier = TIER_HTTP
+    if not products:
+        async with momo_sem:
+            products = await scrape_momo_browser_async(browser, keyword)
+        tier = TIER_BROWSER if products else TIER_NONE
+    TIER_STATS[tier] += 1
+    print(f"[momo] '{keyword}': {len(products)} 個商品（{tier}）", file=sys.stderr)
+    return normalize_rows(product.to_dict(RESULT_COLUMNS) for product in products)
+
+
+async def scrape_pchome_data_async(session, keyword):
+    """呼叫 PChome 搜尋 API；失敗回傳空 list。"""
+    url = PCHOME_SEARCH_URL.format(keyword=urllib.parse.quote(keyword))
+    try:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[pchome] '{keyword}' 取得失敗：{e}", file=sys.stderr)
+        return []
+
+    pchome_products_data = []
+    for product in (data or {}).get('prods') or []:
+        product_id = product.get('Id', None)
+        pchome_products_data.append({
+            'name': product.get('name', 'N/A'),
+            'current_price': parse_price(product.get('price')),
+            'url': f"https://24h.pchome.com.tw/prod/{product_id}" if product_id else 'N/A'
+        })
+    print(f"[pchome] '{keyword}': {len(pchome_products_data)} 筆", file=sys.stderr)
+    return pchome_products_data
+
+
+async def get_combined_data_async(keyword, browser, session, momo_sem):
+    """同時送出兩個來源，依完成順序收集，最後合併成與 get_combined_data_sync 相同格式的 DataFrame。"""
+    async def momo():
+        return 'Momo', await scrape_momo_data_async(browser, session, keyword, momo_sem)
+
+    async def pchome():
+        return 'PChome', await scrape_pchome_data_async(session, keyword)
+
+    results = {'Momo': [], 'PChome': []}
+    for fut in asyncio.as_completed([momo(), pchome()]):
+        source, rows = await fut
+        results[source] = rows
+
+    return combine_results(results['Momo'], results['PChome'])
+
+
+async def run_keywords(keywords, concurrency=KEYWORD_CONCURRENCY, on_result=None):
+    """
+    以最多 concurrency 個關鍵字同時進行；每完成一個就呼叫 on_result(keyword, df)。
+    回傳 {keyword: DataFrame}。
+    """
+    results = {}
+    sem = asyncio.Semaphore(concurrency)
+    momo_sem = asyncio.Semaphore(MOMO_PAGE_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=concurrency * 2)
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**current_profile().launch_options())
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                async def one(keyword):
+                    async with sem:
+                        return keyword, await get_combined_data_async(keyword, browser, session, momo_sem)
+
+                for fut in asyncio.as_completed([one(k) for k in keywords]):
+                    keyword, df = await fut
+                    results[keyword] = df
+                    if on_result:
+                        on_result(keyword, df)
+        finally:
+            await browser.close()
+
+    return results
+
+
+def get_combined_data(keywords, concurrency=KEYWORD_CONCURRENCY):
+    """同步呼叫入口：給一般腳本使用。"""
+    return asyncio.run(run_keywords(keywords, concurrency=concurrency))
+
+
+def _read_keywords(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="momo / PChome 並行比價")
+    parser.add_argument("keywords", nargs="*", help="搜尋關鍵字")
+    parser.add_argument("--file", help="關鍵字清單檔（一行一個）")
+    parser.add_argument("--concurrency", type=int, default=KEYWORD_CONCURRENCY)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    current_profile(args.profile)
+
+    keywords = list(args.keywords)
+    if args.file:
+        keywords += _read_keywords(args.file)
+    if not keywords:
+        keywords = ["iphone 15"]
+
+    done = []
+
+    def on_result(keyword, df):
+        done.append(keyword)
+        print(f"[{len(done)}/{len(keywords)}] '{keyword}' 完成，共 {len(df)} 筆", file=sys.stderr)
+
+    results = asyncio.run(run_keywords(keywords, concurrency=args.concurrency, on_result=on_result))
+
+    frames = [df.assign(Keyword=kw) for kw, df in results.items()]
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    combined.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"momo 各層服務次數：{dict(TIER_STATS)}", file=sys.stderr)
+    print(SCRAPE_PROFILE.summary(), file=sys.stderr)
+    print(f"\n合併後的商品資訊已儲存至 {args.output} 檔案。")
+
+
+if __name__ == "__main__":
+    main()
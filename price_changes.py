@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+增量價格變動偵測：每個關鍵字只記住上一次的快照（以穩定的商品編號為 key），
+新抓到的結果只和它比對，只把「降價 / 新上架 / 下架」寫進 JSONL 變動紀錄，沒變的商品不輸出。
+
+    from price_changes import ChangeTracker
+
+    tracker = ChangeTracker("iphone 15")
+    events = tracker.update(rows)      # rows：Source / name / current_price / url（可選 Id）
+
+    python price.py --incremental "iphone 15"
+
+- 商品編號：PChome 用 Id（或網址 /prod/ 後面那段），momo 用網址裡的 i_code（見 price_history.product_id_from_url）
+- 快照：price_state/<關鍵字>-<雜湊>.json，每次比對完以 .part + os.replace 換新
+  （雜湊取原始關鍵字，"iphone 15" 和 "iphone_15" 不會共用同一個檔）
+- 變動紀錄：price_changes.jsonl，一行一個事件，只追加
+    {"ts", "keyword", "event": "drop" | "new" | "delisted", "source", "product_id", "name", "url",
+     "price", "old_price", "delta", "pct"}
+- 漲價只更新快照、不發事件（EMIT_PRICE_UP 可打開）
+- 只抓第一頁時商品常常只是被擠到後面，所以要連續 DELIST_AFTER 次沒出現才算下架；
+  某個來源這次一筆都沒抓到（多半是抓取失敗）就不替那個來源判定下架
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from price_history import product_id_from_url
+from price_normalize import parse_price
+
+# ====== 可調參數 ======
+STATE_DIR = "price_state"
+FEED_PATH = "price_changes.jsonl"
+DELIST_AFTER = 2            # 連續幾次沒出現才算下架
+EMIT_PRICE_UP = False       # 漲價要不要也發事件
+
+EVENT_DROP = "drop"
+EVENT_UP = "up"
+EVENT_NEW = "new"
+EVENT_DELISTED = "delisted"
+
+
+def product_key(row):
+    """(來源, 商品編號)；沒有網址也沒有 Id 時以品名代替。"""
+    pid = row.get("Id") or product_id_from_url(row.get("url")) or row.get("name")
+    return row.get("Source"), None if pid is None else str(pid)
+
+
+def _slug(keyword):
+    return re.sub(r"[^\w.-]+", "_", keyword.strip().lower()) or "_"
+
+
+def _state_path(state_dir, keyword):
+    digest = hashlib.sha1(keyword.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(state_dir, f"{_slug(keyword)}-{digest}.json")
+
+
+def _legacy_state_path(state_dir, keyword):
+    """舊版只用 slug 當檔名；讀得到而且 keyword 相同才接著用。"""
+    return os.path.join(state_dir, f"{_slug(keyword)}.json")
+
+
+def _event(kind, key, item, old_price=None):
+    source, product_id = key
+    price = item.get("price")
+    event = {"event": kind, "source": source, "product_id": product_id,
+             "name": item.get("name"), "url": item.get("url"), "price": price, "old_price": old_price}
+    if price is not None and old_price:
+        event["delta"] = price - old_price
+        event["pct"] = round((price - old_price) / old_price * 100, 1)
+    return event
+
+
+def diff_snapshot(previous, rows, delist_after=DELIST_AFTER, emit_price_up=EMIT_PRICE_UP):
+    """
+    previous：{(來源, 編號): {"name", "url", "price", "missed"}}（上一次的快照）
+    rows：這次抓到的資料列
+    回傳 (事件 list, 新的快照)。沒變的商品只是搬到新快照，不產生任何輸出。
+    """
+    current = {}
+    events = []
+    for row in rows:
+        key = product_key(row)
+        item = {"name": row.get("name"), "url": row.get("url"),
+                "price": parse_price(row.get("current_price", row.get("price"))), "missed": 0}
+        if key in current:                     # 同一個商品在結果裡出現兩次，留便宜的那筆
+            kept = current[key]["price"]
+            if kept is not None and (item["price"] is None or item["price"] >= kept):
+                continue
+        current[key] = item
+
+    seen_sources = {source for source, _ in current}
+    for key, item in current.items():
+        old = previous.get(key)
+        if old is None:
+            events.append(_event(EVENT_NEW, key, item))
+            continue
+        old_price, price = old.get("price"), item["price"]
+        if price is None:
+            item["price"] = old_price          # 這次沒抓到價格，不當成變動
+        elif old_price is not None and price < old_price:
+            events.append(_event(EVENT_DROP, key, item, old_price))
+        elif old_price is not None and price > old_price and emit_price_up:
+            events.append(_event(EVENT_UP, key, item, old_price))
+
+    for key, old in previous.items():
+        if key in current:
+            continue
+        if key[0] not in seen_sources:
+            current[key] = old                 # 那個來源這次沒抓到東西，原樣保留
+            continue
+        missed = old.get("missed", 0) + 1
+        if missed >= delist_after:
+            events.append(_event(EVENT_DELISTED, key, {**old, "price": None}, old.get("price")))
+        else:
+            current[key] = {**old, "missed": missed}
+    return events, current
+
+
+class ChangeTracker:
+    def __init__(self, keyword, state_dir=STATE_DIR, feed_path=FEED_PATH,
+                 delist_after=DELIST_AFTER, emit_price_up=EMIT_PRICE_UP):
+        self.keyword = keyword
+        self.state_path = _state_path(state_dir, keyword)
+        self._legacy_path = _legacy_state_path(state_dir, keyword)
+        self.feed_path = feed_path
+        self.delist_after = delist_after
+        self.emit_price_up = emit_price_up
+
+    def load(self):
+        """上一次的快照；第一次跑回傳空 dict（所有商品都會是 new）。"""
+        path = self.state_path
+        if not os.path.exists(path):
+            path = self._legacy_path
+            if not os.path.exists(path):
+                return {}
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("keyword") != self.keyword:       # 舊檔名撞名，是別的關鍵字的快照
+            return {}
+        return {(source, product_id): item for source, product_id, item in data["items"]}
+
+    def save(self, snapshot, ts):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        data = {"keyword": self.keyword, "ts": ts,
+                "items": [[source, product_id, item] for (source, product_id), item in snapshot.items()]}
+        tmp = self.state_path + ".part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.state_path)
+
+    def update(self, rows, ts=None):
+        """比對 → 事件追加進變動紀錄 → 存新快照；回傳事件 list。"""
+        ts = (ts or datetime.now()).replace(microsecond=0).isoformat()
+        events, snapshot = diff_snapshot(self.load(), rows, self.delist_after, self.emit_price_up)
+        if events:
+            os.makedirs(os.path.dirname(self.feed_path) or ".", exist_ok=True)
+            with open(self.feed_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps({"ts": ts, "keyword": self.keyword, **event}, ensure_ascii=False) + "\n")
+        self.save(snapshot, ts)
+        return events
+
+
+def summarize(events):
+    """{'drop': 3, 'new': 1, ...}"""
+    counts = {}
+    for event in events:
+        counts[event["event"]] = counts.get(event["event"], 0) + 1
+    return counts
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+價格歷史：每次抓到的價格都追加進依日期分區的 Parquet，不再每次覆蓋 CSV。
+
+    from price_history import PriceHistory, snapshot_rows
+
+    history = PriceHistory()
+    history.append(snapshot_rows(rows, source="Momo", keyword="iphone 15"))   # rows：name / current_price / url
+    history.price_over_time("iPhone 15 128G", start="2025-09-01")             # 品名子字串
+    history.price_over_time(product_id="DYAJ9A-A900G5FNZ", source="PChome")
+
+目錄結構（hive 分區，只追加、不改舊檔）：
+    price_history/date=2025-09-01/part-103015-<uuid>.parquet
+
+- 欄位：ts、source、keyword、product_id、name、price（Int64，抓不到價格為 null）
+- source / keyword 以 dictionary 型別存；所有字串欄位用 Parquet 字典編碼 + zstd 壓縮
+- 查詢只讀 start~end 之間的日期分區、只讀需要的欄位，其餘條件也下推給 pyarrow
+"""
+
+import operator
+import os
+import re
+import urllib.parse
+import uuid
+from datetime import date, datetime
+from functools import reduce
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from price_normalize import parse_price
+
+HISTORY_DIR = "price_history"
+COMPRESSION = "zstd"
+
+SCHEMA = pa.schema([
+    ("ts", pa.timestamp("s")),
+    ("source", pa.dictionary(pa.int32(), pa.string())),
+    ("keyword", pa.dictionary(pa.int32(), pa.string())),
+    ("product_id", pa.string()),
+    ("name", pa.string()),
+    ("price", pa.int64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+QUERY_COLUMNS = ["ts", "source", "product_id", "name", "price"]
+
+def product_id_from_url(url):
+    """momo 取 i_code，PChome 取 /prod/ 後面那段；都不是就回傳 None。"""
+    if not url or url == "N/A":
+        return None
+    parts = urllib.parse.urlsplit(url)
+    i_code = urllib.parse.parse_qs(parts.query).get("i_code")
+    if i_code:
+        return i_code[0]
+    m = re.search(r"/prod/([^/?#]+)", parts.path)
+    return m.group(1) if m else None
+
+
+def snapshot_rows(rows, source=None, keyword=None):
+    """
+    把爬蟲的資料列（name / current_price / url，可選 Source、Id）轉成歷史紀錄。
+    source 沒給時讀每列的 'Source'；沒有 url 的列以品名當 product_id。
+    """
+    for row in rows:
+        name = row.get("name")
+        pid = row.get("Id") or product_id_from_url(row.get("url")) or name
+        yield {
+            "source": source or row.get("Source"),
+            "keyword": keyword or row.get("keyword"),
+            "product_id": None if pid is None else str(pid),
+            "name": name,
+            "price": parse_price(row.get("current_price", row.get("price"))),
+        }
+
+
+class PriceHistory:
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+
+    def append(self, records, ts=None):
+        """追加一批紀錄（同一個時間點），寫成該日分區下的一個新檔；回傳寫入筆數。"""
+        ts = (ts or datetime.now()).replace(microsecond=0)
+        records = list(records)
+        if not records:
+            return 0
+        columns = {name: [r.get(name) for r in records] for name in SCHEMA.names if name != "ts"}
+        columns["ts"] = [ts] * len(records)
+        table = pa.Table.from_pydict(columns, schema=SCHEMA)
+
+        partition = os.path.join(self.path, f"date={ts.date().isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+        filename = f"part-{ts:%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        final = os.path.join(partition, filename)
+        tmp = os.path.join(partition, f".{filename}.part")   # 以 . 開頭，查詢時會被略過
+        pq.write_table(table, tmp, compression=COMPRESSION, use_dictionary=True)
+        os.replace(tmp, final)  # 讀的人只會看到完整的檔案
+        return len(records)
+
+    def dataset(self):
+        return ds.dataset(self.path, format="parquet", partitioning=PARTITIONING,
+                          exclude_invalid_files=True, ignore_prefixes=[".", "_"])
+
+    def query(self, columns=QUERY_COLUMNS, start=None, end=None, source=None, product_id=None, name=None):
+        """
+        讀出符合條件的紀錄（DataFrame）。start / end 為日期（含），只掃這段期間的分區；
+        name 是品名子字串（不分大小寫）。
+        """
+        if not os.path.isdir(self.path):
+            return pd.DataFrame(columns=list(columns))
+        filters = []
+        if start:
+            filters.append(ds.field("date") >= _iso(start))
+        if end:
+            filters.append(ds.field("date") <= _iso(end))
+        if source:
+            filters.append(ds.field("source") == source)
+        if product_id:
+            filters.append(ds.field("product_id") == str(product_id))
+        if name:
+            filters.append(pc.match_substring(ds.field("name"), name, ignore_case=True))
+        expr = reduce(operator.and_, filters) if filters else None
+        table = self.dataset().to_table(columns=list(columns), filter=expr)
+        return table.to_pandas()
+
+    def price_over_time(self, name=None, product_id=None, source=None, start=None, end=None):
+        """某商品（品名子字串或 product_id）的價格走勢，依時間排序。"""
+        if not name and not product_id:
+            raise ValueError("name 與 product_id 至少要給一個")
+        df = self.query(QUERY_COLUMNS, start, end, source, product_id, name)
+        if df.empty:
+            return df
+        df["price"] = df["price"].astype("Int64")
+        return df.sort_values(["ts", "source", "product_id"]).reset_index(drop=True)
+
+
+def _iso(d):
+    if isinstance(d, datetime):
+        d = d.date()
+    return d.isoformat() if isinstance(d, date) else str(d)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+價格正規化：各站的價格字串一次整欄轉成整數（pandas Int64），抓不到的一律是空值。
+
+    from price_normalize import normalize_frame, normalize_rows, parse_price
+
+    df = normalize_frame(df)              # current_price / original_price / price 轉成 Int64，並加 discount_pct
+    rows = normalize_rows(products_data)  # list of dict 版本，空值是 None（給 sinks 直接寫）
+    parse_price("$1,299")                 # 單一值 → 1299（串流時一筆一筆用）
+
+可處理的格式：
+    32900、32900.0、"32900"           → 32900
+    "$32,900"、"NT$ 32,900 元"       → 32900
+    "＄３２，９００"（全形）           → 32900
+    "1,299~1,599"、"$1299 - $1599"  → 1299（範圍取前面那個，也就是最低價）
+    "N/A"、""、None、"價格請洽"        → 空值
+    "-100"、"1e3"                   → 100、1（字串只取第一段數字，不解讀正負號與指數；價格不會是負的）
+    True / False、inf              → 空值
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# ====== 可調參數 ======
+PRICE_COLUMNS = ["current_price", "original_price", "price"]
+CURRENT_COLUMN = "current_price"
+ORIGINAL_COLUMN = "original_price"
+DISCOUNT_COLUMN = "discount_pct"      # 折扣百分比：(原價 - 售價) / 原價，四捨五入到整數
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_NUMBER_RE = re.compile(_NUMBER)
+
+
+def parse_price(value):
+    """單一價格 → int；抓不到數字就回傳 None。規則與 normalize_prices 相同。"""
+    if value is None or value is pd.NA or isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return int(round(value)) if np.isfinite(value) else None
+    m = _NUMBER_RE.search(unicodedata.normalize("NFKC", str(value)).replace(",", ""))
+    return int(round(float(m.group()))) if m else None
+
+
+def normalize_prices(values):
+    """
+    一整欄價格 → Int64 Series（保留原本的 index）。
+    已經是數字的直接轉；字串一律做 NFKC（全形 → 半形）、去千分位逗號，取第一個數字
+    （不交給 to_numeric，否則 "-100"、"1e3" 會和 parse_price 的結果不同）。
+    """
+    s = pd.Series(values, dtype="object") if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_bool_dtype(s):
+        return pd.Series(pd.NA, index=s.index, dtype="Int64")
+    if pd.api.types.is_numeric_dtype(s):
+        numeric = s.astype("float64")
+    else:
+        obj = s.astype(object)
+        text_rows = obj.map(lambda v: isinstance(v, str))
+        skip = text_rows | obj.map(lambda v: isinstance(v, (bool, np.bool_)))
+        numeric = pd.to_numeric(obj.where(~skip), errors="coerce").astype("float64")
+        if text_rows.any():
+            text = obj[text_rows].astype(str).str.normalize("NFKC").str.replace(",", "", regex=False)
+            numeric[text_rows] = pd.to_numeric(text.str.extract(f"({_NUMBER})")[0], errors="coerce")
+    return numeric.where(np.isfinite(numeric)).round().astype("Int64")
+
+
+def discount_percent(original, current):
+    """原價 / 售價 → 折扣百分比（Int64）；沒有原價、原價為 0 或售價比原價高時為空值。"""
+    original = normalize_prices(original).astype("Float64")
+    current = normalize_prices(current).astype("Float64")
+    pct = ((original - current) / original * 100).round()
+    valid = (original > 0) & (current <= original)
+    return pct.where(valid.fillna(False)).astype("Int64")
+
+
+def normalize_frame(df, columns=PRICE_COLUMNS, discount=True):
+    """回傳複本：columns 中存在的價格欄轉成 Int64；同時有原價與售價時加上 discount_pct 欄。"""
+    df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = normalize_prices(df[col])
+    if discount and ORIGINAL_COLUMN in df.columns and CURRENT_COLUMN in df.columns:
+        df[DISCOUNT_COLUMN] = discount_percent(df[ORIGINAL_COLUMN], df[CURRENT_COLUMN])
+    return df
+
+
+def normalize_rows(rows, columns=PRICE_COLUMNS, discount=True):
+    """list of dict 版的 normalize_frame；空值一律是 None，欄位順序不變（discount_pct 接在最後）。"""
+    rows = list(rows)
+    if not rows:
+        return rows
+    df = normalize_frame(pd.DataFrame(rows), columns, discount)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+跨站商品比對：把 momo / PChome 上「同一個商品」的不同刊登歸成一組，輸出每個商品的最低價。
+
+    from product_match import best_prices
+    best = best_prices(combined_df)      # 欄位至少要有 Source / name / current_price / url
+
+流程（全部以整欄向量化處理，沒有 n×m 的 Python 迴圈）：
+1. 正規化品名：NFKC（全形 → 半形）、小寫、拿掉「(贈…)」這類贈品括號、容量統一成 128gb / 1tb
+2. 抽出 型號（iphone 15 pro…）、容量、顏色，並標記 配件 / 福利品
+3. 分塊（blocking）：只有 福利品與否 + 配件與否 + 型號 + 容量 都相同的刊登才互相比較；
+   沒認出型號的，用正規化品名的前兩個詞當型號
+4. 每個區塊用 rapidfuzz.process.cdist 一次算完兩兩相似度（C++、多執行緒），
+   分數 >= MATCH_THRESHOLD 且顏色不衝突的配成一對，再以 numpy 標籤傳遞求連通分量，串成群組：
+   先只用顏色相同（或都沒顏色）的配對分群，沒顏色的群再整群併進分數最高的那個有顏色的鄰居，
+   所以一個沒寫顏色的刊登不會把黑色和藍色串成同一組
+5. 每組取最低價，並列出各站的最低價
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from price_normalize import normalize_prices
+
+# ====== 可調參數 ======
+MATCH_THRESHOLD = 80          # token_set_ratio 分數門檻（0~100）
+MAX_BLOCK = 5000              # 單一區塊超過這個數量就再用品名前幾個詞細分，避免 cdist 矩陣過大
+MIN_CAPACITY_GB = 16          # 小於這個的「xxg」多半是 5G / RAM，不當容量
+SCORER = fuzz.token_set_ratio
+BEST_COLUMNS = ["canonical", "listings", "sources", "best_price", "best_source", "best_name", "best_url"]
+
+# 贈品/加購說明的括號：「(贈充電線+玻璃貼)」「(含原廠配件)」
+_GIFT_PARENS = r"\([^()]*(?:贈|送|含|加購|配件)[^()]*\)"
+_CAPACITY = r"(\d+(?:\.\d+)?)\s*(gb|g|tb|t)(?![a-z])"
+_MODEL_NAMES = r"iphone|ipad|galaxy|pixel|macbook|airpods|apple watch|switch|xperia|redmi|xiaomi|zenfone|rog phone"
+_MODEL = (
+    rf"({_MODEL_NAMES})"
+    r"\s*((?:[a-z]?\d+[a-z]?)?)"
+    r"\s*(pro max|pro|plus|max|mini|ultra|air|lite|fe|oled)?"
+)
+_COLORS = [
+    "午夜", "星光", "天峰藍", "遠峰藍", "深紫", "太空黑", "太空灰", "石墨", "原色", "沙漠",
+    "黑", "白", "藍", "綠", "粉", "紅", "黃", "紫", "銀", "金", "灰", "鈦", "橙", "橘",
+    "black", "white", "blue", "green", "pink", "red", "yellow", "purple", "silver", "gold",
+    "gray", "grey", "titanium", "midnight", "starlight",
+]
+_COLOR = "(" + "|".join(sorted(map(re.escape, _COLORS), key=len, reverse=True)) + ")"
+# 中日韓文字（假名、漢字、諺文）；不用 \w，因為 pandas 的 pyarrow 字串用 RE2 比對，\w 只認 ASCII
+CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_ACCESSORY = r"殼|保護貼|玻璃貼|保護套|皮套|貼膜|保護膜|充電器|充電座|充電線|傳輸線|支架|鏡頭貼|轉接頭|耳機|錶帶|觸控筆"
+_REFURB = r"福利品|認證|展示機|二手|整新|近全新"
+
+
+def normalize_titles(titles):
+    """品名 Series → 正規化後的 Series（全部 pandas .str 向量化操作）。"""
+    s = pd.Series(titles, dtype="object").fillna("").astype(str)
+    s = s.str.normalize("NFKC").str.lower()
+    s = s.str.replace(_GIFT_PARENS, " ", regex=True)
+    s = s.str.replace(_CAPACITY, lambda m: f"{m.group(1)}{'tb' if m.group(2).startswith('t') else 'gb'}", regex=True)
+    s = s.str.replace(rf"[^0-9a-z.+{CJK}]+", " ", regex=True)   # 括號、斜線、破折號… → 空白
+    return s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def title_features(titles):
+    """
+    回傳 DataFrame：norm、model、capacity、color、accessory、refurb、block。
+    block 是分塊鍵，只有同一個 block 的刊登才會互相比分。
+    """
+    norm = normalize_titles(titles)
+    model = norm.str.extract(_MODEL)
+    model_key = (model[0].fillna("") + " " + model[1].fillna("") + " " + model[2].fillna("")).str.split().str.join(" ")
+    first_words = norm.str.split().str[:2].str.join(" ").fillna("")
+    feats = pd.DataFrame({
+        "norm": norm,
+        "model": model_key.where(model_key != "", first_words),
+        "capacity": _capacities(norm),
+        "color": norm.str.extract(_COLOR)[0].fillna(""),
+        "accessory": norm.str.contains(_ACCESSORY, regex=True),
+        "refurb": norm.str.contains(_REFURB, regex=True),
+    }, index=norm.index)
+    feats["block"] = (
+        np.where(feats["refurb"], "refurb", "new") + "|"
+        + np.where(feats["accessory"], "acc", "dev") + "|"
+        + feats["model"] + "|" + feats["capacity"]
+    )
+    return feats
+
+
+def _capacities(norm):
+    """每個品名取最大的容量（「12gb+256gb」取 256gb）；沒有就是空字串。"""
+    found = norm.str.extractall(r"(\d+)(gb|tb)")
+    out = pd.Series("", index=norm.index, dtype="object")
+    if found.empty:
+        return out
+    size = found[0].astype(int) * np.where(found[1] == "tb", 1024, 1)
+    found = found[size >= MIN_CAPACITY_GB].assign(size=size)
+    if found.empty:
+        return out
+    top = found.loc[found.groupby(level=0)["size"].idxmax()].droplevel(1)
+    out.loc[top.index] = top[0] + top[1]
+    return out
+
+
+def _connected_labels(n, a, b):
+    """n 個點、邊 (a[k], b[k]) 的連通分量；每個點的標籤是所屬分量中最小的索引。"""
+    labels = np.arange(n)
+    if len(a) == 0:
+        return labels
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        before = labels.copy()
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        labels = labels[labels]                  # 指標跳躍，加快收斂
+        if np.array_equal(labels, before):
+            return labels
+
+
+def _blocks(feats):
+    """依 block 分組；過大的區塊再用品名前三個詞細分。回傳位置索引陣列的 list。"""
+    out = []
+    for _, idx in feats.groupby("block", sort=False).indices.items():
+        if len(idx) <= MAX_BLOCK:
+            out.append(idx)
+            continue
+        sub = feats["norm"].iloc[idx].str.split().str[:3].str.join(" ")
+        out.extend(idx[v] for v in sub.groupby(sub.values, sort=False).indices.values())
+    return out
+
+
+def match_groups(titles, threshold=MATCH_THRESHOLD, feats=None):
+    """
+    把品名分群：回傳與 titles 等長的 int 陣列，同一個商品的刊登有相同的群組編號。
+    """
+    feats = title_features(titles) if feats is None else feats
+    # 正規化後一模一樣的品名只比一次（其他特徵都由 norm 推得），最後再對回每一列
+    codes, _ = pd.factorize(feats["norm"])
+    feats = feats.drop_duplicates("norm")            # 順序與 factorize 的編號一致
+    norm = feats["norm"].to_numpy()
+    color = feats["color"].to_numpy()
+    edges_a, edges_b, edges_s = [], [], []
+    for idx in _blocks(feats):
+        if len(idx) < 2:
+            continue
+        choices = norm[idx].tolist()
+        scores = process.cdist(choices, choices, scorer=SCORER, score_cutoff=threshold,
+                               dtype=np.uint8, workers=-1)
+        i, j = np.nonzero(np.triu(scores, k=1))
+        ci, cj = color[idx[i]], color[idx[j]]
+        ok = (ci == "") | (cj == "") | (ci == cj)       # 兩邊都有顏色且不同就不算同一個商品
+        edges_a.append(idx[i[ok]])
+        edges_b.append(idx[j[ok]])
+        edges_s.append(scores[i[ok], j[ok]])
+    if not edges_a:
+        return codes
+    return _colour_groups(len(feats), color, np.concatenate(edges_a), np.concatenate(edges_b),
+                          np.concatenate(edges_s))[codes]
+
+
+def _colour_groups(n, color, a, b, score):
+    """
+    連通分量，但每一組最多只有一種顏色：
+    1. 只用兩端顏色相同（含都沒顏色）的邊分群 → 有顏色的群都是單一顏色，沒顏色的群完全沒顏色
+    2. 每個沒顏色的群只接到「分數最高的那條邊」連到的有顏色群
+    """
+    pure = color[a] == color[b]
+    labels = _connected_labels(n, a[pure], b[pure])
+    mixed = ~pure                                  # 一端沒顏色、一端有顏色
+    if not mixed.any():
+        return labels
+    a, b, score = a[mixed], b[mixed], score[mixed]
+    blank = color[a] == ""
+    src = labels[np.where(blank, a, b)]            # 沒顏色那端所在的群
+    dst = labels[np.where(blank, b, a)]
+    order = np.lexsort((-score.astype(np.int16), src))   # 依群排序，同群內分數高的在前
+    src, dst = src[order], dst[order]
+    first = np.r_[True, src[1:] != src[:-1]]
+    # 群的代表點（labels 的值）本身的標籤就是自己，所以在代表點之間連邊、再對回每個點即可
+    return _connected_labels(n, src[first], dst[first])[labels]
+
+
+def _canonical_names(feats, groups):
+    """
+    每組一個代表名稱：有認出型號的用「型號 容量 顏色 [福利品] [配件]」，否則用正規化品名；
+    每組最多只有一種顏色，有寫顏色的名稱優先；其次取組內最多刊登共用的那個，一樣多就取最短的。
+    """
+    key = (feats["model"] + " " + feats["capacity"] + " " + feats["color"]
+           + np.where(feats["refurb"], " 福利品", "") + np.where(feats["accessory"], " 配件", ""))
+    key = key.str.split().str.join(" ")
+    recognised = feats["model"].str.match(rf"(?:{_MODEL_NAMES})")
+    label = key.where(recognised, feats["norm"])
+    ranked = pd.DataFrame({"group": groups, "label": label, "has_color": feats["color"] != ""})
+    ranked = ranked.value_counts().rename("n").reset_index()
+    ranked["len"] = ranked["label"].str.len()
+    ranked = ranked.sort_values(["group", "has_color", "n", "len"], ascending=[True, False, False, True])
+    return ranked.groupby("group")["label"].first()
+
+
+def best_prices(df, name_col="name", price_col="current_price", source_col="Source", url_col="url",
+                threshold=MATCH_THRESHOLD):
+    """
+    每個 canonical 商品一列：canonical、listings、sources、best_price、best_source、best_name、best_url，
+    另加各站的最低價欄位（例如 Momo_price、PChome_price）。依 best_price 由低到高排序。
+    沒有任何刊登時回傳只有 BEST_COLUMNS 欄位的空表。
+    """
+    if df.empty:
+        return pd.DataFrame(columns=BEST_COLUMNS).astype({"listings": "int64", "best_price": "Int64"})
+    df = df.reset_index(drop=True).copy()
+    df[price_col] = normalize_prices(df[price_col])
+    feats = title_features(df[name_col])
+    df["group"] = match_groups(df[name_col], threshold, feats)
+    canonical = _canonical_names(feats, df["group"])
+
+    priced = df.dropna(subset=[price_col])
+    best = priced.loc[priced.groupby("group")[price_col].idxmin()].set_index("group")
+    per_source = priced.pivot_table(index="group", columns=source_col, values=price_col, aggfunc="min")
+    per_source.columns = [f"{c}_price" for c in per_source.columns]
+
+    out = pd.DataFrame({
+        "canonical": canonical,
+        "listings": df.groupby("group").size(),
+        "sources": df.groupby("group")[source_col].agg(lambda s: ",".join(sorted(s.unique()))),
+    })
+    out = out.join(best[[price_col, source_col, name_col, url_col]].rename(columns={
+        price_col: "best_price", source_col: "best_source", name_col: "best_name", url_col: "best_url"}))
+    out = out.join(per_source)
+    out["best_price"] = out["best_price"].astype("Int64")
+    return out.sort_values("best_price", na_position="last").reset_index(drop=True)
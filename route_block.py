@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+純爬資料的瀏覽器不需要的請求，直接在 route 攔掉：圖片、影音、字型、第三方追蹤/廣告。
+
+    from route_block import SCRAPE_PROFILE
+
+    with get_pool().lease(block=SCRAPE_PROFILE) as page:      # browser_pool 代為掛上/卸下
+        page.goto(...)
+
+    SCRAPE_PROFILE.apply(page)                                # 或自己掛在 page / context 上
+    await SCRAPE_PROFILE.apply_async(page)                    # async API 版
+    print(SCRAPE_PROFILE.summary())
+
+- resource_types：依 request.resource_type 擋（預設 image / media / font）
+- domains：依網址的 host 擋（host 等於或以「.網域」結尾），預設是常見的分析/廣告網域
+- allow：各網站的白名單 {網站 host: [網址子字串, ...]}；網站 host 以發出請求的頁面為準，
+  命中白名單的請求一律放行（例如某站的商品清單要靠圖片 onload 才長出來）
+- stats：擋了幾個（依原因）、放行幾個；summary() 印成一行
+
+要截圖的流程（eztravel 的 1.x / 2.x）不要用這個 profile，畫面會缺圖；
+run_profile 的 debug 設定檔（會截圖）已經不套用它。
+"""
+
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass, field
+
+from playwright.sync_api import Error as PlaywrightError
+
+BLOCK_RESOURCE_TYPES = ("image", "media", "font")
+BLOCK_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googleadservices.com", "googlesyndication.com",
+    "doubleclick.net", "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "criteo.com", "criteo.net", "scorecardresearch.com", "hotjar.com", "clarity.ms",
+    "amazon-adsystem.com", "adnxs.com", "taboola.com", "outbrain.com", "tiktok.com",
+    "analytics.tiktok.com", "bat.bing.com", "cdn.segment.com", "newrelic.com", "nr-data.net",
+)
+# 各網站的白名單，例如 {"www.example.com": ["/api/", "cdn.example.com/fonts/icons"]}
+# 目前的爬蟲都不需要圖片/字型，先留空
+SITE_ALLOWLIST = {}
+
+
+def _host(url):
+    return urllib.parse.urlsplit(url).hostname or ""
+
+
+def _matches_domain(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def _page_host(request):
+    """發出請求的那一頁的 host（取不到時退回請求本身的 host）。"""
+    try:
+        return _host(request.frame.page.url) or _host(request.url)
+    except (PlaywrightError, AttributeError):
+        return _host(request.url)
+
+
+@dataclass
+class BlockProfile:
+    resource_types: tuple = BLOCK_RESOURCE_TYPES
+    domains: tuple = BLOCK_DOMAINS
+    allow: dict = field(default_factory=lambda: dict(SITE_ALLOWLIST))
+    stats: Counter = field(default_factory=Counter)
+
+    def block_reason(self, request):
+        """要擋就回傳原因字串（"type:image"、"domain:doubleclick.net"），放行回傳 None。"""
+        url = request.url
+        if not url.startswith(("http://", "https://")):
+            return None  # data:, blob: 之類不經網路
+        allowed = self.allow.get(_page_host(request), ())
+        if any(pattern in url for pattern in allowed):
+            return None
+        if request.resource_type in self.resource_types:
+            return f"type:{request.resource_type}"
+        host = _host(url)
+        if _matches_domain(host, self.domains):
+            return f"domain:{host}"
+        return None
+
+    def _decide(self, request):
+        reason = self.block_reason(request)
+        self.stats["blocked" if reason else "allowed"] += 1
+        if reason:
+            self.stats[reason] += 1
+        return reason
+
+    # ---------- sync API ----------
+
+    def _handle(self, route):
+        try:
+            if self._decide(route.request):
+                route.abort("blockedbyclient")
+            else:
+                route.continue_()
+        except PlaywrightError:
+            pass  # 頁面/請求已關閉
+
+    def apply(self, target):
+        """掛到 page 或 context 上。"""
+        target.route("**/*", self._handle)
+        return target
+
+    def remove(self, target):
+        try:
+            target.unroute("**/*", self._handle)
+        except PlaywrightError:
+            pass
+
+    # ---------- async API ----------
+
+    async def _handle_async(self, route):
+        try:
+            if self._decide(route.request):
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+        except PlaywrightError:
+            pass
+
+    async def apply_async(self, target):
+        await target.route("**/*", self._handle_async)
+        return target
+
+    def summary(self):
+        blocked = self.stats["blocked"]
+        total = blocked + self.stats["allowed"]
+        detail = "、".join(f"{k}={v}" for k, v in sorted(self.stats.items()) if k not in ("blocked", "allowed"))
+        return f"[block] 共 {total} 個請求，擋掉 {blocked} 個" + (f"（{detail}）" if detail else "")
+
+
+# 純爬資料用的預設 profile（各腳本共用，stats 一起累計）
+SCRAPE_PROFILE = BlockProfile()
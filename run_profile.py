@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+執行設定檔：同一支腳本在伺服器上跑 production、在自己電腦上除錯跑 debug，不必改程式裡的常數。
+
+                 headless  slow_mo  擋圖片/字型/追蹤碼  截圖   tracing
+    production   是        0        是                  否     否
+    debug        否        300 ms   否                  是     是（存到 traces/）
+
+選擇方式（優先序由高到低）：
+    python 2.1.py --debug                 # 或 --profile debug
+    SCRAPER_PROFILE=debug python 2.1.py
+    （都沒給）→ production
+
+    from run_profile import current_profile
+    PROFILE = current_profile()
+    with PROFILE.lease(viewport=...) as page:     # 依設定檔借分頁：block、tracing 自動處理
+        ...
+    PROFILE.screenshot(page, "screenshots/x.png")  # production 下什麼都不做
+
+    browser = p.chromium.launch(**PROFILE.launch_options())   # 不經過 browser_pool 時
+    PROFILE.attach(page.context)  ...  PROFILE.detach(page.context, "名稱")
+
+自己有 argparse 的腳本請呼叫 add_profile_arguments(parser)，再 current_profile(args.profile)。
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from browser_pool import get_pool
+from route_block import SCRAPE_PROFILE
+
+ENV_VAR = "SCRAPER_PROFILE"
+DEFAULT_PROFILE = "production"
+TRACE_DIR = "traces"
+
+
+@dataclass(frozen=True)
+class RunProfile:
+    name: str
+    headless: bool = True
+    slow_mo: int = 0
+    block: bool = True
+    screenshots: bool = False
+    tracing: bool = False
+
+    def launch_options(self):
+        """給 get_pool(**...) 或 chromium.launch(**...) 用。"""
+        options = {"headless": self.headless}
+        if self.slow_mo:
+            options["slow_mo"] = self.slow_mo
+        return options
+
+    @property
+    def block_profile(self):
+        return SCRAPE_PROFILE if self.block else None
+
+    def pool(self):
+        return get_pool(**self.launch_options())
+
+    def trace_path(self, name):
+        """traces/<name>_<時間>.zip；async 版的腳本自己 start/stop tracing 時用。"""
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        name = re.sub(r"[^\w.-]+", "_", name)
+        return os.path.join(TRACE_DIR, f"{name}_{time.strftime('%Y%m%d-%H%M%S')}.zip")
+
+    def _start_trace(self, context):
+        context.tracing.start(screenshots=True, snapshots=True, sources=True)
+
+    def _stop_trace(self, context, name):
+        path = self.trace_path(name)
+        context.tracing.stop(path=path)
+        print(f"[profile] trace 已存到 {path}（playwright show-trace {path}）", file=sys.stderr)
+
+    @contextmanager
+    def lease(self, trace_name="run", **lease_options):
+        """依設定檔向 browser_pool 借分頁：預設套用 block_profile，debug 時錄 trace。"""
+        lease_options.setdefault("block", self.block_profile)
+        with self.pool().lease(**lease_options) as page:
+            if self.tracing:
+                self._start_trace(page.context)
+            try:
+                yield page
+            finally:
+                if self.tracing:
+                    self._stop_trace(page.context, trace_name)
+
+    @contextmanager
+    def lease_context(self, trace_name="run", **lease_options):
+        lease_options.setdefault("block", self.block_profile)
+        with self.pool().lease_context(**lease_options) as context:
+            if self.tracing:
+                self._start_trace(context)
+            try:
+                yield context
+            finally:
+                if self.tracing:
+                    self._stop_trace(context, trace_name)
+
+    def attach(self, context):
+        """
+        自己 launch / new_context（不經過 browser_pool）的腳本用：對 context 套用擋資源與 tracing。
+        結束前記得呼叫 detach(context, 名稱) 把 trace 存下來。
+        """
+        if self.block:
+            SCRAPE_PROFILE.apply(context)
+        if self.tracing:
+            self._start_trace(context)
+        return context
+
+    def detach(self, context, trace_name="run"):
+        if self.tracing:
+            self._stop_trace(context, trace_name)
+
+    def screenshot(self, page, path, **kwargs):
+        """debug 才截圖；回傳是否有截。"""
+        if not self.screenshots:
+            return False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        page.screenshot(path=path, **kwargs)
+        return True
+
+
+PROFILES = {
+    "production": RunProfile("production"),
+    "debug": RunProfile("debug", headless=False, slow_mo=300, block=False, screenshots=True, tracing=True),
+}
+
+_current = None
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", choices=sorted(PROFILES), help=f"執行設定檔（預設讀 {ENV_VAR}，再不然 {DEFAULT_PROFILE}）")
+    parser.add_argument("--debug", dest="profile", action="store_const", const="debug", help="同 --profile debug")
+    return parser
+
+
+def set_profile(name):
+    global _current
+    if name not in PROFILES:
+        raise ValueError(f"未知的執行設定檔：{name}（可用：{', '.join(sorted(PROFILES))}）")
+    _current = PROFILES[name]
+    return _current
+
+
+def current_profile(name=None):
+    """
+    目前的設定檔（第一次呼叫時決定，之後都回傳同一個）。
+    name 有給就用它；否則看命令列的 --profile / --debug，再看環境變數。
+    """
+    if name:
+        return set_profile(name)
+    if _current is not None:
+        return _current
+    parser = add_profile_arguments(argparse.ArgumentParser(add_help=False))
+    args, _ = parser.parse_known_args()
+    return set_profile(args.profile or os.environ.get(ENV_VAR) or DEFAULT_PROFILE)
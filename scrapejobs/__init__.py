@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+爬蟲工作的註冊表與統一執行入口：在同一個行程裡同時跑多個爬蟲，共用瀏覽器、HTTP Session 與輸出檔。
+
+    python -m scrapejobs --list
+    python -m scrapejobs momo_search pchome_search -k "iphone 15" -k "ipad air"
+    python -m scrapejobs --all --debug
+    python -m scrapejobs pchome_search -k "iphone" --max-pages 50 --format parquet --rotate-rows 100000
+
+    from scrapejobs import JOBS, JobContext, run_jobs
+    results = run_jobs([JOBS["ptt_hotboards"]()], JobContext())
+
+新增工作：在 scrapejobs/jobs.py 寫一個 Job 子類別並加上 @register。
+"""
+
+from .base import JOBS, OUTPUT_DIR, OUTPUT_FORMAT, Job, JobContext, JobResult, register
+from .runner import run_jobs
+from . import jobs  # 登記內建工作
+
+__all__ = ["JOBS", "OUTPUT_DIR", "OUTPUT_FORMAT", "Job", "JobContext", "JobResult", "register", "run_jobs"]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import argparse
+import sys
+import time
+
+from run_profile import add_profile_arguments, current_profile
+
+from sinks import SINKS
+
+from . import JOBS, OUTPUT_DIR, OUTPUT_FORMAT, JobContext, run_jobs
+from .runner import BROWSER_WORKERS, HTTP_WORKERS
+
+
+def log(msg: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scrapejobs", description="在同一個行程裡同時執行多個爬蟲工作")
+    parser.add_argument("jobs", nargs="*", help="要執行的工作名稱（見 --list）")
+    parser.add_argument("--all", action="store_true", help="執行全部工作")
+    parser.add_argument("--list", action="store_true", help="列出可用的工作")
+    parser.add_argument("-k", "--keyword", dest="keywords", action="append", default=[], help="搜尋關鍵字（可重複）")
+    parser.add_argument("--max-pages", type=int, help="搜尋類工作最多抓幾頁")
+    parser.add_argument("--out-dir", default=OUTPUT_DIR)
+    parser.add_argument("--format", dest="fmt", default=OUTPUT_FORMAT, choices=[ext.lstrip(".") for ext in SINKS])
+    parser.add_argument("--rotate-rows", type=int, help="每個輸出檔最多幾筆，超過就換下一個檔")
+    parser.add_argument("--browsers", type=int, default=BROWSER_WORKERS, help="瀏覽器執行緒數（每條各開一個 browser）")
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS, help="HTTP 工作的執行緒數")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, cls in JOBS.items():
+            print(f"{name:<18}{'[瀏覽器] ' if cls.needs_browser else ''}{cls.description}")
+        return 0
+
+    names = list(JOBS) if args.all else args.jobs
+    unknown = [n for n in names if n not in JOBS]
+    if unknown or not names:
+        parser.error(f"未知的工作：{', '.join(unknown)}" if unknown else "請指定工作名稱，或用 --all")
+
+    profile = current_profile(args.profile)
+    log(f"執行設定檔：{profile.name}；工作：{', '.join(names)}")
+    jobs = [JOBS[n](keywords=args.keywords, max_pages=args.max_pages) for n in dict.fromkeys(names)]
+    ctx = JobContext(out_dir=args.out_dir, fmt=args.fmt, rotate_rows=args.rotate_rows, profile=profile)
+    results = run_jobs(jobs, ctx, browser_workers=args.browsers, http_workers=args.workers, log=log)
+
+    for r in results:
+        status = "OK  " if r.ok else "FAIL"
+        log(f"{status} {r.job:<18}{r.rows:>6} 筆 {r.elapsed:>7.1f}s  {r.output if r.ok else r.error}")
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+工作（Job）的基底類別、註冊表與共用資源。
+
+    @register
+    class MyJob(Job):
+        name = "my_job"
+        description = "..."
+        needs_browser = False          # True 的工作排在瀏覽器執行緒上跑
+
+        def run(self, ctx):
+            for row in ...:
+                yield row              # 一列一個 dict，一產生就寫進 ctx 的 sink
+
+JobContext 在同一次執行的所有工作之間共用：
+- session：http_session 的共用 Session（cached=True，帶磁碟快取）
+- pool()：目前執行緒、依 run_profile 設定的 BrowserPool（Playwright sync API 只能在建立它的執行緒用）
+- writer(path)：同一個輸出路徑只有一個 sinks.Sink（串流寫入、.part 原子換名），多個工作可以寫同一個檔
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+
+from http_session import get_session
+from run_profile import current_profile
+from sinks import open_sink
+
+OUTPUT_DIR = "output"
+OUTPUT_FORMAT = "csv"                  # csv / jsonl / parquet（見 sinks.py）
+
+# 名稱 → Job 類別
+JOBS = {}
+
+
+def register(cls):
+    """類別裝飾器：把 Job 子類別登記到 JOBS（名稱重複視為程式錯誤）。"""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} 沒有設定 name")
+    if cls.name in JOBS:
+        raise ValueError(f"工作名稱重複：{cls.name}")
+    JOBS[cls.name] = cls
+    return cls
+
+
+class Job:
+    name = ""
+    description = ""
+    needs_browser = False
+    output = None                      # 輸出檔名（不含副檔名）；None 則用 name
+
+    def __init__(self, keywords=(), max_pages=None):
+        self.keywords = list(keywords)
+        self.max_pages = max_pages
+
+    def output_path(self, out_dir=OUTPUT_DIR, fmt=OUTPUT_FORMAT):
+        return os.path.join(out_dir, f"{self.output or self.name}.{fmt}")
+
+    def run(self, ctx):
+        """產生資料列（dict）；子類別實作。"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+@dataclass
+class JobResult:
+    job: str
+    rows: int = 0
+    elapsed: float = 0.0
+    error: str = None
+    output: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@dataclass
+class JobContext:
+    out_dir: str = OUTPUT_DIR
+    fmt: str = OUTPUT_FORMAT
+    rotate_rows: int = None
+    profile: object = field(default_factory=current_profile)
+    writers: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def session(self):
+        return get_session(cached=True)
+
+    def pool(self):
+        return self.profile.pool()
+
+    def writer(self, path):
+        with self._lock:
+            if path not in self.writers:
+                self.writers[path] = open_sink(path, rotate_rows=self.rotate_rows)
+            return self.writers[path]
+
+    def close(self):
+        """收尾所有 sink（.part 換成正式檔名）；回傳關掉的 sink list。"""
+        with self._lock:
+            writers, self.writers = self.writers, {}
+        for sink in writers.values():
+            sink.close()
+        return list(writers.values())
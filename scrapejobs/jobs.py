@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+目前登記的工作。各工作只負責「產生資料列」，抓取邏輯沿用原本各腳本/模組裡的函式。
+"""
+
+from bs4 import BeautifulSoup
+
+import imdb_fetch
+import ppt2
+from eztravel_flight import STATE_SITE, VIEW_H, VIEW_W, log, search_flights, take_final_screenshots
+from momo_extract import absolute_url
+from momo_fetch import fetch_momo_products
+from pchome_crawl import iter_pchome_products
+from popup_guard import PopupGuard
+from price_normalize import normalize_rows, parse_price
+
+from .base import Job, register
+
+DEFAULT_KEYWORDS = ["iphone 15"]
+
+CWA_TYPHOON_LIST_URL = "https://rdc28.cwa.gov.tw/TDB/public/warning_typhoon_list/"
+CWA_COLUMNS = ["年度", "編號", "名稱", "英文名稱", "近臺強度", "最低氣壓(hPa)", "最大風速(m/s)"]
+
+
+@register
+class MomoSearchJob(Job):
+    name = "momo_search"
+    description = "momo 搜尋（先 HTTP，沒有商品才開瀏覽器）"
+    needs_browser = True
+
+    def run(self, ctx):
+        pool = ctx.pool()
+        for keyword in self.keywords or DEFAULT_KEYWORDS:
+            result = fetch_momo_products(keyword, pool=pool, session=ctx.session)
+            rows = normalize_rows({"keyword": keyword, "tier": result.tier, **p.to_dict(), "url": absolute_url(p.url)}
+                                  for p in result.products)
+            yield from rows
+
+
+@register
+class PChomeSearchJob(Job):
+    name = "pchome_search"
+    description = "PChome 搜尋 API（多頁平行）"
+
+    def run(self, ctx):
+        for keyword in self.keywords or DEFAULT_KEYWORDS:
+            for item in iter_pchome_products(keyword, sort="sale/dc", max_pages=self.max_pages, session=ctx.session):
+                yield {"keyword": keyword, **item, "price": parse_price(item["price"])}
+
+
+@register
+class PttHotboardsJob(Job):
+    name = "ptt_hotboards"
+    description = "PTT 熱門看板"
+
+    def run(self, ctx):
+        yield from ppt2.fetch_hotboards(ctx.session)
+
+
+@register
+class ImdbTop250Job(Job):
+    name = "imdb_top250"
+    description = "IMDb Top 250（先讀內嵌 JSON，必要時才開瀏覽器）"
+    needs_browser = True
+
+    def run(self, ctx):
+        rows, _ = imdb_fetch.load_rows()
+        for row in rows:
+            if row.get("片名"):
+                yield row
+
+
+@register
+class CwaTyphoonListJob(Job):
+    name = "cwa_typhoon_list"
+    description = "氣象署歷年有發布警報颱風列表"
+    needs_browser = True
+
+    def run(self, ctx):
+        with ctx.profile.lease(trace_name=self.name) as page:
+            page.goto(CWA_TYPHOON_LIST_URL, timeout=60000)
+            page.wait_for_selector("table tr td")
+            table_html = page.inner_html("table")
+        soup = BeautifulSoup(table_html, "html.parser")
+        for tr in soup.find_all("tr")[1:]:  # 忽略表頭
+            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+            if len(cells) >= 8:
+                yield dict(zip(CWA_COLUMNS, cells[1:8]))
+
+
+@register
+class EztravelFlightJob(Job):
+    name = "eztravel_flight"
+    description = "ezTravel 純機票搜尋（填表 + 送出，輸出結果頁網址）"
+    needs_browser = True
+
+    trip_type = "來回"
+    origin = "台北 TPE"
+    dest = "洛杉磯 LAX"
+    depart_date = "2025/09/01"
+    return_date = "2025/09/10"
+
+    def run(self, ctx):
+        with ctx.profile.lease(trace_name=self.name, state_site=STATE_SITE,
+                               viewport={"width": VIEW_W, "height": VIEW_H}) as page:
+            guard = PopupGuard(log=log).install(page)
+            result = search_flights(page, self.trip_type, self.origin, self.dest, self.depart_date, self.return_date,
+                                    guard=guard)
+            take_final_screenshots(page, prefix=self.name)
+            result["popups_closed"] = len(guard.closed)
+        yield result
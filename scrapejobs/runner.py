@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+同一個行程裡同時跑多個工作。
+
+Playwright 的 sync API 綁在建立它的執行緒上，所以分兩條「車道」：
+- 瀏覽器車道：browser_workers 條執行緒，各自一個 BrowserPool（一個 browser），needs_browser 的工作排這裡
+- HTTP 車道：http_workers 條執行緒，共用同一個 requests Session
+每條執行緒做完自己的工作後關掉自己建立的瀏覽器（browser_pool.close_all）。
+單一工作失敗只記在它的 JobResult，不影響其他工作。
+"""
+
+import queue
+import sys
+import threading
+import time
+import traceback
+
+import browser_pool
+
+from .base import JobResult
+
+BROWSER_WORKERS = 1
+HTTP_WORKERS = 4
+
+
+def _run_one(job, ctx, log):
+    result_path = job.output_path(ctx.out_dir, ctx.fmt)
+    writer = ctx.writer(result_path)
+    start = time.perf_counter()
+    rows = 0
+    error = None
+    log(f"[{job.name}] 開始")
+    try:
+        for row in job.run(ctx):
+            writer.write(row)
+            rows += 1
+    except (Exception, SystemExit) as e:  # 單一工作的錯誤（含舊腳本裡的 sys.exit）不能拖垮整批
+        error = f"{e.__class__.__name__}: {e}"
+        traceback.print_exc(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    log(f"[{job.name}] {'完成' if error is None else '失敗'}，{rows} 筆，{elapsed:.1f}s")
+    return JobResult(job.name, rows, elapsed, error, result_path)
+
+
+def _lane(jobs, ctx, results, log, browser):
+    try:
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                return
+            results.append(_run_one(job, ctx, log))
+    finally:
+        if browser:
+            browser_pool.close_all()
+
+
+def run_jobs(jobs, ctx, browser_workers=BROWSER_WORKERS, http_workers=HTTP_WORKERS, log=print):
+    """執行 jobs（Job 實例的 list），寫出所有輸出後回傳 JobResult 的 list（依 jobs 順序）。"""
+    lanes = []
+    results = []
+    for browser, workers in ((True, browser_workers), (False, http_workers)):
+        q = queue.Queue()
+        for job in jobs:
+            if job.needs_browser == browser:
+                q.put(job)
+        for _ in range(min(workers, q.qsize())):
+            lanes.append(threading.Thread(target=_lane, args=(q, ctx, results, log, browser), daemon=True))
+
+    for t in lanes:
+        t.start()
+    for t in lanes:
+        t.join()
+
+    for sink in ctx.close():
+        if sink.rows:
+            log(f"已輸出 {', '.join(sink.files)}（{sink.rows} 筆）")
+    order = {job.name: i for i, job in enumerate(jobs)}
+    return sorted(results, key=lambda r: order.get(r.job, len(order)))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+記住「哪個候選 selector / 策略成功過」的持久快取（每個網站一區）。
+
+flow.md 每次都是策略 1、2 逾時、策略 3 成功；2.1.py 的欄位/按鈕候選清單也一樣每次從頭試。
+這裡把成功的候選記下來（命中次數 + 最後成功時間），下次先試它，失手才退回完整清單：
+
+    cache = SelectorCache.for_url(FLIGHT_URL)
+    for sel in cache.ordered("click_search", candidates):
+        if try_click(sel):
+            cache.record_hit("click_search", sel)
+            break
+        cache.record_miss("click_search", sel)
+
+檔案格式（CACHE_PATH，JSON）：
+    {"flight.eztravel.com.tw": {"click_search": {"button:has-text('搜尋')":
+        {"hits": 3, "misses": 0, "last_success": "2025-09-01T10:00:00"}}}}
+"""
+
+import json
+import os
+import threading
+import urllib.parse
+from datetime import datetime
+
+CACHE_PATH = ".selector_cache.json"
+
+_file_lock = threading.Lock()
+
+
+def _load(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+class SelectorCache:
+    """單一網站的候選快取；多個網站共用同一個 JSON 檔，寫入時只覆蓋自己那一區。"""
+
+    def __init__(self, site, path=CACHE_PATH):
+        self.site = site
+        self.path = path
+        self._entries = _load(path).get(site, {})
+
+    @classmethod
+    def for_url(cls, url, path=CACHE_PATH):
+        return cls(urllib.parse.urlsplit(url).netloc, path)
+
+    def _stats(self, key, candidate):
+        return self._entries.setdefault(key, {}).setdefault(
+            candidate, {"hits": 0, "misses": 0, "last_success": None})
+
+    def winner(self, key):
+        """最近一次成功的候選；沒有紀錄回傳 None。"""
+        best = None
+        for candidate, st in self._entries.get(key, {}).items():
+            if not st.get("last_success"):
+                continue
+            if best is None or (st["last_success"], st["hits"]) > (best[1]["last_success"], best[1]["hits"]):
+                best = (candidate, st)
+        return best[0] if best else None
+
+    def split(self, key, candidates, ident=str):
+        """
+        把 candidates 分成 (成功過的, 其餘)：成功過的依最近成功、命中次數排序，其餘維持原本順序。
+        candidates 不是字串時，用 ident(candidate) 取得記錄用的鍵。
+        """
+        entries = self._entries.get(key, {})
+        known, rest = [], []
+        for cand in candidates:
+            st = entries.get(ident(cand))
+            (known if st and st.get("last_success") else rest).append(cand)
+        known.sort(key=lambda c: (entries[ident(c)]["last_success"], entries[ident(c)]["hits"]), reverse=True)
+        return known, rest
+
+    def ordered(self, key, candidates, ident=str):
+        """成功過的候選排前面，其餘接在後面（見 split）。"""
+        known, rest = self.split(key, candidates, ident)
+        return known + rest
+
+    def record_hit(self, key, candidate):
+        st = self._stats(key, candidate)
+        st["hits"] += 1
+        st["last_success"] = datetime.now().isoformat(timespec="seconds")
+        self.save()
+
+    def record_miss(self, key, candidate):
+        """只記錄「成功過的候選這次失手」；從沒成功過的候選不值得寫進檔案。"""
+        st = self._entries.get(key, {}).get(candidate)
+        if st is None:
+            return
+        st["misses"] += 1
+        self.save()
+
+    def save(self):
+        """重讀檔案、換掉自己網站那一區後以 tmp + os.replace 寫回（其他網站的紀錄不受影響）。"""
+        with _file_lock:
+            data = _load(self.path)
+            data[self.site] = self._entries
+            # _file_lock 只管得到同一個行程；別的行程可能同時在存，暫存檔各用各的
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
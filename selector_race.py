@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+多個定位策略 × 所有 frame 同時競速，取第一個可見的元素（Playwright 同步版）。
+
+原本 click_lax_anywhere 是「主頁面 5 個策略逐一 wait_for(5 秒)，再每個 iframe 各來一輪」，
+前兩個策略在 eztravel 每次都逾時（見 flow.md），最差要 5 × frame 數 × 5 秒才輪到 JS 兜底。
+race_locators() 改成每一輪把所有 frame 的所有策略各看一次 is_visible()（不等待），
+輪與輪之間用主頁面「全部策略 or_ 起來」的 locator 等一小段：主頁面任一策略一出現就立刻醒來。
+整體只受一個 timeout 限制，時間到就放棄，不會有背景殘留的等待。
+
+    strategies = [
+        ("li > span", lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text="洛杉磯"))),
+        ("純文字", lambda ctx: ctx.get_by_text("洛杉磯", exact=True)),
+    ]
+    hit = race_locators(page, strategies, timeout=5000)
+    if hit:
+        hit.locator.click()
+
+strategies 的元素可以是 (名稱, build) 或單純 build；build(ctx) 對 page 或 frame 回傳 Locator。
+同一輪有多個命中時，依 strategies 的順序、主頁面優先。
+傳入 cache=SelectorCache(...)、key=... 會先試上次贏的策略（見 selector_cache.py）。
+
+要「找到就點」時用 click_first_anywhere()（命中 span 會往上點 li、click 失敗改 force、最後 JS 兜底）：
+
+    click_first_anywhere(page, list_item_strategies("洛杉磯"), fallback_text="洛杉磯", key="click_lax")
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from playwright.sync_api import Error as PlaywrightError
+
+from selector_cache import SelectorCache
+from waits import record_wait
+
+# ====== 可調參數 ======
+RACE_TIMEOUT = 5000     # 毫秒；整場競速的上限
+POLL_MS = 150           # 每輪之間最多等多久再重新掃 iframe
+CACHED_TIMEOUT = 2000   # 毫秒；有快取贏家時先單獨等它多久
+
+
+@dataclass
+class RaceHit:
+    strategy: str       # 策略名稱
+    index: int          # 在 strategies 中的位置（從 0 起算）
+    frame: str          # "主頁面" 或 "iframe#n"
+    locator: Any        # 命中的 Locator（已取 .first）
+    elapsed_ms: float
+
+
+def _normalize(strategies):
+    named = []
+    for i, s in enumerate(strategies):
+        if isinstance(s, tuple):
+            named.append(s)
+        else:
+            named.append((f"策略 {i + 1}", s))
+    return named
+
+
+def _contexts(page, include_frames):
+    yield "主頁面", page
+    if not include_frames:
+        return
+    n = 0
+    for frame in page.frames:
+        if frame == page.main_frame:
+            continue
+        n += 1
+        yield f"iframe#{n}", frame
+
+
+def _scan(page, named, include_frames):
+    """掃一輪：回傳第一個可見的 (frame 名稱, 策略 index, locator)。"""
+    for frame_name, ctx in _contexts(page, include_frames):
+        for i, (_, build) in enumerate(named):
+            try:
+                loc = build(ctx).first
+                if loc.is_visible():
+                    return frame_name, i, loc
+            except PlaywrightError:
+                # frame 中途被卸載、選擇器語法不適用等，當作這輪沒命中
+                continue
+    return None
+
+
+def _main_frame_any(page, named):
+    combined = None
+    for _, build in named:
+        try:
+            loc = build(page)
+        except PlaywrightError:
+            continue
+        combined = loc if combined is None else combined.or_(loc)
+    return combined
+
+
+def _race(page, named, deadline, include_frames, poll_ms):
+    """競速直到 deadline（perf_counter 秒）；回傳 (frame 名稱, 策略 index, locator) 或 None。"""
+    main_any = _main_frame_any(page, named)
+    while True:
+        found = _scan(page, named, include_frames)
+        if found:
+            return found
+        remaining = (deadline - time.perf_counter()) * 1000
+        if remaining <= 0:
+            return None
+        # 主頁面任一策略出現就提前醒來；iframe 則等下一輪掃描
+        try:
+            if main_any is not None:
+                main_any.first.wait_for(state="visible", timeout=max(1, min(poll_ms, remaining)))
+            else:
+                page.wait_for_timeout(min(poll_ms, remaining))
+        except PlaywrightError:
+            pass
+
+
+def race_locators(page, strategies, timeout=RACE_TIMEOUT, include_frames=True, poll_ms=POLL_MS,
+                  label=None, log=None, cache=None, key=None):
+    """
+    所有策略 × 所有 frame 競速；回傳 RaceHit，逾時回傳 None。
+    有給 cache（selector_cache.SelectorCache）與 key 時，先單獨試上次贏的策略（最多 CACHED_TIMEOUT），
+    失手才整組競速；贏家會寫回快取。
+    """
+    named = _normalize(strategies)
+    start = time.perf_counter()
+    deadline = start + timeout / 1000
+
+    found = None
+    cached = None
+    if cache is not None and key:
+        best = cache.winner(key)
+        cached = next((i for i, (name, _) in enumerate(named) if name == best), None)
+    if cached is not None:
+        found = _race(page, [named[cached]], min(deadline, start + CACHED_TIMEOUT / 1000),
+                      include_frames, poll_ms)
+        if found:
+            frame_name, _, loc = found
+            found = (frame_name, cached, loc)
+        else:
+            cache.record_miss(key, named[cached][0])
+            if log:
+                log(f"  - 快取的策略「{named[cached][0]}」這次沒命中，改為全部競速")
+    if found is None:
+        found = _race(page, named, deadline, include_frames, poll_ms)
+
+    hit = None
+    if found:
+        frame_name, i, loc = found
+        hit = RaceHit(named[i][0], i, frame_name, loc, (time.perf_counter() - start) * 1000)
+        if cache is not None and key:
+            cache.record_hit(key, hit.strategy)
+
+    record_wait("race", label, hit is not None, start, timeout)
+    if log:
+        if hit:
+            log(f"  - 競速命中：{hit.strategy}（{hit.frame}，{hit.elapsed_ms:.0f} ms）")
+        else:
+            log(f"  - 競速逾時：{len(named)} 個策略在 {timeout} ms 內都沒有可見元素")
+    return hit
+
+
+def list_item_strategies(text):
+    """清單選項（<li><span>文字</span></li>，例如 eztravel 的目的地清單）的常用定位策略。"""
+    exact = re.compile(rf"^\s*{re.escape(text)}\s*$")
+    return [
+        ("CSS :has 結構匹配 (li > span)",
+         lambda ctx: ctx.locator("li", has=ctx.locator("span", has_text=text))),
+        ("ARIA Role=listitem + 名稱比對",
+         lambda ctx: ctx.get_by_role("listitem", name=exact)),
+        ("純文字比對（精確）",
+         lambda ctx: ctx.get_by_text(text, exact=True)),
+        (f"XPath: //li[span[normalize-space()='{text}']]",
+         lambda ctx: ctx.locator(f"xpath=//li[span[normalize-space()='{text}']]")),
+        ("先抓 span 再往上找最近 li",
+         lambda ctx: ctx.locator(f"span:has-text('{text}')")),
+    ]
+
+
+_CLICK_LIST_ITEM_JS = """
+(text) => {
+    const el = Array.from(document.querySelectorAll('li span')).find(n => (n.textContent || '').trim() === text);
+    const li = el && el.closest('li');
+    if (!li) return false;
+    li.click();
+    return true;
+}
+"""
+
+
+def _click_hit(loc, log):
+    # 抓到的是 span 就往上找最近的 li 再點
+    try:
+        if loc.evaluate("el => el.tagName.toLowerCase()") == "span":
+            loc = loc.locator("xpath=ancestor::li[1]")
+    except PlaywrightError:
+        pass
+    loc.scroll_into_view_if_needed()
+    try:
+        loc.click()
+    except PlaywrightError as e:
+        if log:
+            log(f"  - 一般 click 失敗：{e.__class__.__name__}，改用 force=True")
+        loc.click(force=True)
+
+
+def click_first_anywhere(page, candidates, timeout=RACE_TIMEOUT, fallback_text=None, key=None, log=None):
+    """
+    candidates 在主頁面 + 所有 iframe 同時競速（race_locators），點第一個可見的；回傳是否點到。
+    最差只等一次 timeout，而不是「策略數 × frame 數」次。
+    fallback_text：都沒命中（或點不下去）時，用 JS 找文字完全相同的 li span、點它的 li。
+    key：有給就以 SelectorCache.for_url(page.url) 記住這次贏的策略。
+    """
+    cache = SelectorCache.for_url(page.url) if key else None
+    hit = race_locators(page, candidates, timeout=timeout, cache=cache, key=key, log=log)
+    if hit:
+        try:
+            _click_hit(hit.locator, log)
+            return True
+        except PlaywrightError as e:
+            if log:
+                log(f"  ✖ 點擊命中元素失敗：{e.__class__.__name__}")
+    if not fallback_text:
+        return False
+    try:
+        ok = bool(page.evaluate(_CLICK_LIST_ITEM_JS, fallback_text))
+    except PlaywrightError:
+        ok = False
+    if log:
+        log("  ✅ JS 兜底點擊成功" if ok else f"  ✖ JS 兜底也找不到『{fallback_text}』")
+    return ok
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+串流輸出：資料列一抓到就寫進檔案，不必等整批結果變成 DataFrame 才一次寫出。
+
+    from sinks import open_sink
+
+    with open_sink("output/momo.csv") as sink:          # 依副檔名選 CSV / JSONL / Parquet
+        for row in rows:
+            sink.write(row)
+
+    open_sink("output/pchome.jsonl", rotate_rows=100_000)   # 每 10 萬筆換一個檔
+
+- 寫入中的檔案是 <檔名>.part；close()（或正常離開 with）時以 os.replace 換成正式檔名，
+  讀的人永遠不會看到寫一半的檔案；with 區塊丟出例外、或行程整個被砍掉時，.part 原樣留著（已寫的資料都在裡面）
+- CSV / JSONL 每筆都 flush；Parquet 每 batch_rows 筆寫一個 row group，記憶體只放一個 batch
+- rotate_rows / rotate_bytes：超過就把目前的檔案收尾、開下一個（x-00001.csv、x-00002.csv…）
+- schema：{欄位: 型別}（"int64"、"string"…，或 pyarrow.Schema）；Parquet 照它建欄位型別，
+  CSV 沒給 columns 時用它的欄位順序。沒給的話 Parquet 由第一個 batch 推得
+- 某一筆寫不進去（例如 Parquet 型別不符）只略過那一筆並記 log（計入 skipped），之前寫的都保留；
+  其他錯誤（磁碟滿等）照常丟出，.part 不刪，可以事後救回
+- write() 有鎖，可被多個執行緒共用
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+
+CSV_ENCODING = "utf-8-sig"      # Excel 開得了中文
+PARQUET_BATCH_ROWS = 5000
+
+# 單筆資料本身有問題（序列化失敗、型別不符；pyarrow 的 ArrowInvalid / ArrowTypeError 也是它們的子類別）
+ROW_ERRORS = (TypeError, ValueError)
+
+
+def _rotated_path(path, index):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{index:05d}{ext}"
+
+
+def _log_skipped(path, row, err):
+    print(f"[sink] {path}：略過一筆寫不進去的資料（{err.__class__.__name__}: {err}）：{row!r:.200}", file=sys.stderr)
+
+
+def _schema_names(schema):
+    if schema is None:
+        return None
+    return list(getattr(schema, "names", None) or schema)     # pyarrow.Schema 或 {欄位: 型別}
+
+
+class Sink:
+    """串流輸出的共同部分：.part 檔、原子換名、輪替、計數。子類別實作 _open / _write / _close_file。"""
+
+    def __init__(self, path, rotate_rows=None, rotate_bytes=None, schema=None):
+        self.path = path
+        self.schema = schema
+        self.rotate_rows = rotate_rows
+        self.rotate_bytes = rotate_bytes
+        self.rows = 0                  # 總筆數（不含略過的）
+        self.skipped = 0               # 寫不進去而略過的筆數
+        self.files = []                # 已完成的檔案
+        self._index = 0
+        self._file_rows = 0
+        self._current = None           # 目前這個檔案的正式路徑
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def rotating(self):
+        return bool(self.rotate_rows or self.rotate_bytes)
+
+    def _start(self):
+        self._index += 1
+        self._current = _rotated_path(self.path, self._index) if self.rotating else self.path
+        os.makedirs(os.path.dirname(self._current) or ".", exist_ok=True)
+        self._file_rows = 0
+        self._open(self._current + ".part")
+
+    def _finish(self, promote=True):
+        """收尾目前的檔案；promote=False 時只關檔，.part 留著不換名。"""
+        current, self._current = self._current, None
+        if current is None:
+            return
+        self._close_file()
+        if promote and os.path.exists(current + ".part"):
+            os.replace(current + ".part", current)
+            self.files.append(current)
+
+    def _full(self):
+        if self.rotate_rows and self._file_rows >= self.rotate_rows:
+            return True
+        return bool(self.rotate_bytes and self._tell() >= self.rotate_bytes)
+
+    def write(self, row):
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"{self.path} 已經關閉")
+            if self._current is None:
+                self._start()
+            try:
+                self._write(row)
+            except ROW_ERRORS as e:
+                self._skip(row, e)
+                return
+            self.rows += 1
+            self._file_rows += 1
+            if self.rotating and self._full():
+                self._finish()
+
+    def _skip(self, row, err):
+        self.skipped += 1
+        _log_skipped(self._current or self.path, row, err)
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+        return self
+
+    def write_frame(self, df):
+        """寫出整個 DataFrame；NaN / NA 一律寫成空值（None）。"""
+        return self.write_many(df.astype(object).where(df.notna(), None).to_dict("records"))
+
+    def close(self, promote=True):
+        """
+        把最後一個檔案收尾；回傳總筆數。一筆都沒寫就不產生檔案。
+        promote=False：只關檔，最後一個檔案留在 .part（with 區塊丟出例外時用）。
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._finish(promote)
+            return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(promote=exc_type is None)
+        return False
+
+    # ---- 子類別實作 ----
+    def _open(self, part_path):
+        raise NotImplementedError
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def _close_file(self):
+        raise NotImplementedError
+
+    def _tell(self):
+        return 0
+
+
+class CsvSink(Sink):
+    """欄位以 columns 為準，沒給就取第一筆的 key；之後多出來的欄位略過、缺的留空。"""
+
+    def __init__(self, path, columns=None, encoding=CSV_ENCODING, **kwargs):
+        super().__init__(path, **kwargs)
+        self.columns = list(columns or _schema_names(self.schema) or []) or None
+        self.encoding = encoding
+        self._f = None
+        self._writer = None
+
+    def _open(self, part_path):
+        self._f = open(part_path, "w", newline="", encoding=self.encoding)
+        self._writer = None
+
+    def _write(self, row):
+        if self._writer is None:
+            if self.columns is None:
+                self.columns = list(row)
+            self._writer = csv.DictWriter(self._f, fieldnames=self.columns, extrasaction="ignore", restval="")
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self._f.flush()
+
+    def _close_file(self):
+        self._f.close()
+
+    def _tell(self):
+        return self._f.tell()
+
+
+class JsonlSink(Sink):
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._f = None
+
+    def _open(self, part_path):
+        self._f = open(part_path, "w", encoding="utf-8")
+
+    def _write(self, row):
+        self._f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self._f.flush()
+
+    def _close_file(self):
+        self._f.close()
+
+    def _tell(self):
+        return self._f.tell()
+
+
+class ParquetSink(Sink):
+    """
+    需要 pyarrow。有給 schema 就照它建欄位型別；沒給則由第一個 batch 推得，之後的 batch 轉成同一個 schema
+    （第一個 batch 整欄都是空值時會被推成 null 型別，之後有值的資料列都會被略過，所以欄位可能整批空白時請給 schema）。
+    一個 batch 轉不成 table 時改成一筆一筆轉，只略過轉不了的那幾筆。
+    """
+
+    def __init__(self, path, batch_rows=PARQUET_BATCH_ROWS, **kwargs):
+        super().__init__(path, **kwargs)
+        self.batch_rows = batch_rows
+        self._batch = []
+        self._writer = None
+        self._part = None
+
+    def _open(self, part_path):
+        self._part = part_path
+        self._writer = None
+
+    def _flush_batch(self):
+        if not self._batch:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        batch, self._batch = self._batch, []
+        if self.schema is None:
+            try:
+                self.schema = pa.Table.from_pylist(batch).schema
+            except ROW_ERRORS:
+                self.schema = pa.Table.from_pylist(batch[:1]).schema   # 欄位型別不一致：以第一筆為準
+        elif not isinstance(self.schema, pa.Schema):
+            self.schema = pa.schema(list(dict(self.schema).items()))
+        try:
+            table = pa.Table.from_pylist(batch, schema=self.schema)
+        except ROW_ERRORS:
+            table = self._convert_rows(pa, batch)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._part, self.schema)
+        self._writer.write_table(table)
+
+    def _convert_rows(self, pa, batch):
+        tables = []
+        for row in batch:
+            try:
+                tables.append(pa.Table.from_pylist([row], schema=self.schema))
+            except ROW_ERRORS as e:
+                self.rows -= 1             # write() 時已經算進去了
+                self._skip(row, e)
+        return pa.concat_tables(tables) if tables else self.schema.empty_table()
+
+    def _write(self, row):
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_rows:
+            self._flush_batch()
+
+    def _close_file(self):
+        try:
+            self._flush_batch()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _tell(self):
+        try:
+            return os.path.getsize(self._part)
+        except OSError:
+            return 0
+
+
+SINKS = {".csv": CsvSink, ".jsonl": JsonlSink, ".parquet": ParquetSink}
+
+
+def open_sink(path, **kwargs):
+    """依副檔名（.csv / .jsonl / .parquet）建立對應的 Sink。"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SINKS:
+        raise ValueError(f"不支援的輸出格式：{path}（可用：{', '.join(SINKS)}）")
+    return SINKS[ext](path, **kwargs)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+每個網站保存一份瀏覽器 storage state（cookies + localStorage），下次開 context 時直接帶入。
+
+eztravel 的腳本每次都從全新的 context 開始：cookie 同意、公告彈窗、首次造訪的導轉全部重來。
+保存上次結束時的狀態後，第二次起（warm run）這些都不會再出現：
+
+    from browser_pool import get_pool
+    with get_pool().lease(state_site="flight.eztravel.com.tw") as page:   # 借出時載入、歸還時存回
+        ...
+
+    store = StorageStateStore()                                            # 不經過 browser_pool 時
+    context = browser.new_context(**store.context_options(site))
+    ...
+    store.save(context, site)
+
+- 檔案放在 STATE_DIR/<site>.json，以 tmp + os.replace 寫入
+- 超過 MAX_AGE 沒更新，或裡面的 cookie 全都過期、也沒有 localStorage，就視為過期並刪除
+"""
+
+import json
+import os
+import re
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+
+STATE_DIR = ".storage_state"
+MAX_AGE = 7 * 24 * 3600         # 秒
+
+
+def _safe_name(site):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", site)
+
+
+class StorageStateStore:
+    def __init__(self, path=STATE_DIR, max_age=MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+
+    def path_for(self, site):
+        return os.path.join(self.path, _safe_name(site) + ".json")
+
+    def _usable(self, path):
+        if time.time() - os.path.getmtime(path) > self.max_age:
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        now = time.time()
+        # expires == -1 是 session cookie，沒有到期時間
+        live_cookies = [c for c in state.get("cookies", []) if c.get("expires", -1) < 0 or c["expires"] > now]
+        has_storage = any(o.get("localStorage") for o in state.get("origins", []))
+        return bool(live_cookies or has_storage)
+
+    def load(self, site):
+        """可用的 state 檔路徑；沒有或已過期回傳 None（過期的順便刪掉）。"""
+        path = self.path_for(site)
+        if not os.path.exists(path):
+            return None
+        if self._usable(path):
+            return path
+        self.clear(site)
+        return None
+
+    def context_options(self, site):
+        """給 browser.new_context(**...) 用：有可用的 state 就是 {"storage_state": path}，否則 {}。"""
+        path = self.load(site)
+        return {"storage_state": path} if path else {}
+
+    def save(self, context, site):
+        """把 context 目前的 cookies / localStorage 存成 site 的 state。"""
+        os.makedirs(self.path, exist_ok=True)
+        path = self.path_for(site)
+        tmp = path + ".tmp"
+        try:
+            context.storage_state(path=tmp)
+        except PlaywrightError:
+            return None  # context 已經關掉了
+        os.replace(tmp, path)
+        return path
+
+    def clear(self, site):
+        try:
+            os.remove(self.path_for(site))
+        except OSError:
+            pass
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 專案的模組都放在根目錄（沒有套件），測試直接從根目錄匯入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
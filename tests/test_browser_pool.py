@@ -0,0 +1,81 @@
+from browser_pool import BrowserPool
+from storage_state import StorageStateStore
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    def close(self):
+        self.context.pages.remove(self)
+
+
+class FakeContext:
+    browser = None
+
+    def __init__(self, options):
+        self.options = options
+        self.pages = []
+        self.closed = False
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def storage_state(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"cookies": [], "origins": []}')
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+
+def _pool(tmp_path):
+    pool = BrowserPool(state_store=StorageStateStore(str(tmp_path / "state")))
+    pool._browser = FakeBrowser()
+    return pool
+
+
+def test_state_site_contexts_not_shared_with_plain_leases(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.lease(state_site="flight.eztravel.com.tw") as page:
+        site_context = page.context
+    with pool.lease() as page:
+        assert page.context is not site_context
+    with pool.lease(state_site="flight.eztravel.com.tw") as page:
+        assert page.context is site_context
+
+
+class FailingBlock:
+    def apply(self, target):
+        raise RuntimeError("route failed")
+
+    def remove(self, target):
+        pass
+
+
+def test_context_returned_when_block_apply_fails(tmp_path):
+    pool = _pool(tmp_path)
+    try:
+        with pool.lease(block=FailingBlock()):
+            pass
+    except RuntimeError:
+        pass
+    [context] = pool._browser.contexts
+    assert context.pages == []
+    with pool.lease() as page:
+        assert page.context is context
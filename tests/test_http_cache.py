@@ -0,0 +1,122 @@
+import os
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+
+from http_cache import CachedSession, ResponseCache
+
+URL = "https://example.com/page"
+
+
+class FakeAdapter(BaseAdapter):
+    """依序回傳 (status, headers, body)；記下每個送出的請求。"""
+
+    def __init__(self, *responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        status, headers, body = self.responses.pop(0)
+        resp = requests.models.Response()
+        resp.status_code = status
+        resp.headers = requests.structures.CaseInsensitiveDict(headers)
+        resp._content = body
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def _session(tmp_path, adapter, **cache_options):
+    session = CachedSession(cache=ResponseCache(str(tmp_path / "cache"), **cache_options))
+    session.mount("https://", adapter)
+    return session
+
+
+def test_fresh_hit_skips_network(tmp_path):
+    adapter = FakeAdapter((200, {"ETag": '"v1"'}, b"hello"))
+    session = _session(tmp_path, adapter)
+    first = session.get(URL)
+    second = session.get(URL)
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.content == b"hello"
+    assert len(adapter.sent) == 1
+    assert session.cache.stats["fresh_hits"] == 1
+
+
+def test_stale_entry_revalidated_with_304(tmp_path):
+    adapter = FakeAdapter((200, {"ETag": '"v1"'}, b"hello"), (304, {}, b""))
+    session = _session(tmp_path, adapter, fresh_for=0)
+    session.get(URL)
+    resp = session.get(URL)
+    assert adapter.sent[1].headers["If-None-Match"] == '"v1"'
+    assert (resp.status_code, resp.content, resp.from_cache) == (200, b"hello", True)
+
+
+def test_expired_entry_refetched(tmp_path):
+    adapter = FakeAdapter((200, {}, b"old"), (200, {}, b"new"))
+    session = _session(tmp_path, adapter, max_age=-1)
+    session.get(URL)
+    resp = session.get(URL)
+    assert (resp.content, resp.from_cache) == (b"new", False)
+    assert "If-None-Match" not in adapter.sent[1].headers
+
+
+def test_uncached_paths_set_from_cache(tmp_path):
+    adapter = FakeAdapter((200, {}, b"posted"), (200, {}, b"streamed"))
+    session = _session(tmp_path, adapter)
+    assert session.post(URL, data=b"x").from_cache is False
+    assert session.get(URL, stream=True).from_cache is False
+
+
+def _response(body):
+    resp = requests.models.Response()
+    resp.status_code = 200
+    resp._content = body
+    return resp
+
+
+def test_body_removed_before_publish_is_rewritten(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    write = cache._write_body
+    lost = []
+
+    def write_then_lose(body):
+        digest, size = write(body)
+        if not lost:
+            lost.append(digest)
+            os.remove(cache._body_path(digest))       # 別的執行緒把它當孤兒刪掉
+        return digest, size
+
+    cache._write_body = write_then_lose
+    cache.store(URL, _response(b"body"))
+    assert cache.lookup(URL)["body"] == b"body"
+
+
+def test_concurrent_writers_same_body(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(20):
+                cache.store(f"{URL}/{n}/{i}", _response(b"shared body" * 100))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert all(cache.lookup(f"{URL}/{n}/{i}")["body"] == b"shared body" * 100
+               for n in range(8) for i in range(20))
+    bodies = os.listdir(os.path.dirname(cache._body_path(cache._db.execute(
+        "SELECT body_hash FROM entries LIMIT 1").fetchone()[0])))
+    assert [name for name in bodies if name.endswith(".tmp")] == []
@@ -0,0 +1,90 @@
+import json
+
+from price_changes import ChangeTracker, _state_path, diff_snapshot
+
+
+def _row(source, pid, price, name=None):
+    return {"Source": source, "Id": pid, "name": name or f"{source}-{pid}", "current_price": price,
+            "url": f"https://example.com/{pid}"}
+
+
+def _snapshot(rows):
+    return diff_snapshot({}, rows)[1]
+
+
+def _kinds(events):
+    return sorted((e["event"], e["product_id"]) for e in events)
+
+
+def test_first_run_everything_new():
+    events, snapshot = diff_snapshot({}, [_row("PChome", "A", 100), _row("Momo", "B", 200)])
+    assert _kinds(events) == [("new", "A"), ("new", "B")]
+    assert snapshot[("PChome", "A")]["price"] == 100
+
+
+def test_drop_emitted_rise_and_unchanged_silent():
+    previous = _snapshot([_row("PChome", "A", 1000), _row("PChome", "B", 500), _row("PChome", "C", 300)])
+    events, snapshot = diff_snapshot(previous, [_row("PChome", "A", 900), _row("PChome", "B", 600),
+                                                _row("PChome", "C", 300)])
+    [drop] = events
+    assert (drop["event"], drop["product_id"], drop["old_price"], drop["price"]) == ("drop", "A", 1000, 900)
+    assert (drop["delta"], drop["pct"]) == (-100, -10.0)
+    assert snapshot[("PChome", "B")]["price"] == 600
+
+
+def test_price_up_only_when_enabled():
+    previous = _snapshot([_row("PChome", "A", 100)])
+    events, _ = diff_snapshot(previous, [_row("PChome", "A", 120)], emit_price_up=True)
+    assert _kinds(events) == [("up", "A")]
+
+
+def test_delisted_after_consecutive_misses():
+    snapshot = _snapshot([_row("PChome", "A", 100), _row("PChome", "B", 200)])
+    events, snapshot = diff_snapshot(snapshot, [_row("PChome", "B", 200)], delist_after=2)
+    assert events == []
+    assert snapshot[("PChome", "A")]["missed"] == 1
+    events, snapshot = diff_snapshot(snapshot, [_row("PChome", "B", 200)], delist_after=2)
+    assert _kinds(events) == [("delisted", "A")]
+    assert ("PChome", "A") not in snapshot
+
+
+def test_reappearing_resets_miss_counter():
+    snapshot = _snapshot([_row("PChome", "A", 100), _row("PChome", "B", 200)])
+    _, snapshot = diff_snapshot(snapshot, [_row("PChome", "B", 200)], delist_after=2)
+    _, snapshot = diff_snapshot(snapshot, [_row("PChome", "A", 100), _row("PChome", "B", 200)], delist_after=2)
+    events, snapshot = diff_snapshot(snapshot, [_row("PChome", "B", 200)], delist_after=2)
+    assert events == []
+    assert snapshot[("PChome", "A")]["missed"] == 1
+
+
+def test_source_with_no_rows_is_kept():
+    snapshot = _snapshot([_row("PChome", "A", 100), _row("Momo", "M", 300)])
+    for _ in range(3):
+        events, snapshot = diff_snapshot(snapshot, [_row("PChome", "A", 100)], delist_after=1)
+        assert events == []
+    assert snapshot[("Momo", "M")] == {"name": "Momo-M", "url": "https://example.com/M", "price": 300, "missed": 0}
+
+
+def test_duplicate_keeps_cheaper_listing():
+    events, snapshot = diff_snapshot({}, [_row("Momo", "A", 500), _row("Momo", "A", 450), _row("Momo", "A", 480)])
+    assert len(events) == 1
+    assert snapshot[("Momo", "A")]["price"] == 450
+
+
+def test_state_paths_do_not_collide(tmp_path):
+    assert _state_path("s", "iphone 15") != _state_path("s", "iphone_15")
+    kwargs = dict(state_dir=str(tmp_path / "state"), feed_path=str(tmp_path / "feed.jsonl"))
+    ChangeTracker("iphone 15", **kwargs).update([_row("PChome", "A", 100)])
+    events = ChangeTracker("iphone_15", **kwargs).update([_row("PChome", "B", 200)])
+    assert _kinds(events) == [("new", "B")]
+    assert ChangeTracker("iphone 15", **kwargs).update([_row("PChome", "A", 90)])[0]["event"] == "drop"
+
+
+def test_tracker_appends_feed(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    tracker = ChangeTracker("kw", state_dir=str(tmp_path / "state"), feed_path=str(feed))
+    tracker.update([_row("PChome", "A", 100)])
+    tracker.update([_row("PChome", "A", 100)])
+    tracker.update([_row("PChome", "A", 80)])
+    lines = [json.loads(line) for line in feed.read_text(encoding="utf-8").splitlines()]
+    assert [(e["keyword"], e["event"]) for e in lines] == [("kw", "new"), ("kw", "drop")]
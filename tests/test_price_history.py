@@ -0,0 +1,74 @@
+import os
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from price_history import PriceHistory, product_id_from_url, snapshot_rows
+
+ROWS = [
+    {"Source": "Momo", "name": "Apple iPhone 15 128G 黑", "current_price": "$29,900",
+     "url": "https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code=12345"},
+    {"Source": "PChome", "name": "iPhone 15 128GB 藍", "current_price": 28990,
+     "url": "https://24h.pchome.com.tw/prod/DYAJ9A-A900G5FNZ"},
+    {"Source": "PChome", "name": "AirPods Pro", "current_price": "N/A", "url": "N/A"},
+]
+
+
+def _history(tmp_path):
+    history = PriceHistory(str(tmp_path / "history"))
+    history.append(snapshot_rows(ROWS, keyword="iphone 15"), ts=datetime(2025, 9, 1, 10, 0))
+    history.append(snapshot_rows(ROWS[:2], keyword="iphone 15"), ts=datetime(2025, 9, 2, 10, 0))
+    return history
+
+
+def test_product_id_from_url():
+    assert product_id_from_url(ROWS[0]["url"]) == "12345"
+    assert product_id_from_url(ROWS[1]["url"]) == "DYAJ9A-A900G5FNZ"
+    assert product_id_from_url("N/A") is None
+
+
+def test_snapshot_rows():
+    records = list(snapshot_rows(ROWS, keyword="iphone 15"))
+    assert [(r["source"], r["product_id"], r["price"]) for r in records] == [
+        ("Momo", "12345", 29900), ("PChome", "DYAJ9A-A900G5FNZ", 28990), ("PChome", "AirPods Pro", None)]
+
+
+def test_append_writes_one_file_per_call(tmp_path):
+    history = _history(tmp_path)
+    assert history.append([], ts=datetime(2025, 9, 3)) == 0
+    assert sorted(os.listdir(history.path)) == ["date=2025-09-01", "date=2025-09-02"]
+    for partition in os.listdir(history.path):
+        files = os.listdir(os.path.join(history.path, partition))
+        assert len(files) == 1 and files[0].endswith(".parquet") and not files[0].startswith(".")
+    assert len(history.query()) == 5
+
+
+def test_filters(tmp_path):
+    history = _history(tmp_path)
+    assert len(history.query(source="PChome")) == 3
+    assert history.query(product_id="12345")["price"].tolist() == [29900, 29900]
+    assert set(history.query(name="IPHONE 15")["source"]) == {"Momo", "PChome"}
+    assert len(history.query(start="2025-09-02")) == 2
+    assert len(history.query(end=datetime(2025, 9, 1, 23))) == 3
+
+
+def test_partitions_outside_range_are_not_read(tmp_path):
+    history = _history(tmp_path)
+    bad = os.path.join(history.path, "date=2025-10-01")
+    os.makedirs(bad)
+    pq.write_table(pa.table({"ts": ["x"], "price": ["not a number"]}), os.path.join(bad, "part-bad.parquet"))
+    assert len(history.query(end="2025-09-30")) == 5
+    with pytest.raises(pa.ArrowException):              # 不限日期時真的會讀到它
+        history.query()
+
+
+def test_price_over_time(tmp_path):
+    history = _history(tmp_path)
+    df = history.price_over_time(product_id="DYAJ9A-A900G5FNZ", source="PChome")
+    assert df["ts"].tolist() == [datetime(2025, 9, 1, 10), datetime(2025, 9, 2, 10)]
+    assert str(df["price"].dtype) == "Int64"
+    assert PriceHistory(str(tmp_path / "missing")).query().empty
+    with pytest.raises(ValueError):
+        history.price_over_time()
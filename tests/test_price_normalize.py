@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_normalize import discount_percent, normalize_prices, normalize_rows, parse_price
+
+CASES = [
+    (32900, 32900),
+    (32900.0, 32900),
+    ("32900", 32900),
+    ("$32,900", 32900),
+    ("NT$ 32,900 元", 32900),
+    ("＄３２，９００", 32900),
+    ("1,299~1,599", 1299),
+    ("$1299 - $1599", 1299),
+    ("1299.6", 1300),
+    ("-100", 100),
+    ("1e3", 1),
+    (-100, -100),
+    ("N/A", None),
+    ("", None),
+    ("價格請洽", None),
+    ("inf", None),
+    (None, None),
+    (np.nan, None),
+    (float("inf"), None),
+    (pd.NA, None),
+    (True, None),
+]
+
+
+@pytest.mark.parametrize("value, expected", CASES)
+def test_scalar_and_vectorized_agree(value, expected):
+    assert parse_price(value) == expected
+    got = normalize_prices(pd.Series([value], dtype="object")).iloc[0]
+    assert (None if pd.isna(got) else int(got)) == expected
+
+
+def test_mixed_column_keeps_index_and_dtype():
+    s = pd.Series(["$1,299", 500, None, "N/A"], index=[10, 11, 12, 13], dtype="object")
+    out = normalize_prices(s)
+    assert out.dtype == "Int64"
+    assert list(out.index) == [10, 11, 12, 13]
+    assert out.tolist() == [1299, 500, pd.NA, pd.NA]
+
+
+def test_string_dtype_column():
+    assert normalize_prices(pd.Series(["＄３２，９００", None], dtype="string")).tolist() == [32900, pd.NA]
+
+
+def test_discount_percent():
+    pct = discount_percent(["$1,000", "1000", None, "0", "500"], ["800", "$1,200", "100", "0", None])
+    assert pct.tolist() == [20, pd.NA, pd.NA, pd.NA, pd.NA]
+
+
+def test_normalize_rows_uses_none_and_adds_discount():
+    rows = normalize_rows([{"name": "a", "current_price": "$900", "original_price": "1,000"},
+                           {"name": "b", "current_price": "N/A", "original_price": None}])
+    assert rows == [{"name": "a", "current_price": 900, "original_price": 1000, "discount_pct": 10},
+                    {"name": "b", "current_price": None, "original_price": None, "discount_pct": None}]
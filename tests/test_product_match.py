@@ -0,0 +1,43 @@
+import pandas as pd
+
+from product_match import best_prices, match_groups
+
+COLOUR_TITLES = [
+    "Apple iPhone 15 128GB 黑色",
+    "Apple iPhone 15 128GB",
+    "Apple iPhone 15 128GB 藍色",
+    "Apple iPhone 15 128GB 粉",
+]
+
+
+def test_colourless_listing_does_not_bridge_colours():
+    groups = match_groups(COLOUR_TITLES)
+    coloured = [groups[0], groups[2], groups[3]]
+    assert len(set(coloured)) == 3
+    assert groups[1] in coloured
+
+
+def test_best_price_is_per_colour():
+    df = pd.DataFrame({
+        "name": COLOUR_TITLES,
+        "current_price": [100, 200, 300, 400],
+        "Source": ["Momo", "PChome", "Momo", "PChome"],
+        "url": ["u0", "u1", "u2", "u3"],
+    })
+    best = best_prices(df).set_index("canonical")["best_price"]
+    assert best["iphone 15 128gb 藍"] == 300
+    assert best["iphone 15 128gb 粉"] == 400
+    assert len(best) == 3
+
+
+def test_same_colour_listings_still_merge():
+    groups = match_groups(["Apple iPhone 15 128GB 黑色", "iPhone 15 128G 黑色 公司貨", "Apple iPhone 15 128GB"])
+    assert len(set(groups)) == 1
+
+
+def test_best_prices_on_empty_frame():
+    empty = pd.DataFrame(columns=["Source", "name", "current_price", "url"])
+    best = best_prices(empty)
+    assert best.empty
+    assert list(best.columns) == ["canonical", "listings", "sources", "best_price", "best_source",
+                                  "best_name", "best_url"]
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sinks import CsvSink, JsonlSink, ParquetSink
+
+SCHEMA = {"name": "string", "current_price": "int64"}
+
+
+def test_parquet_schema_keeps_all_null_first_batch(tmp_path):
+    path = str(tmp_path / "x.parquet")
+    with ParquetSink(path, batch_rows=2, schema=SCHEMA) as sink:
+        sink.write_many([{"name": "a", "current_price": None}, {"name": "b", "current_price": None},
+                         {"name": "c", "current_price": 100}])
+    table = pq.read_table(path)
+    assert table.schema.field("current_price").type == pa.int64()
+    assert table.column("current_price").to_pylist() == [None, None, 100]
+
+
+def test_parquet_bad_rows_skipped_rest_kept(tmp_path):
+    path = str(tmp_path / "x.parquet")
+    with ParquetSink(path, batch_rows=2) as sink:          # 沒給 schema：第一個 batch 把 current_price 推成 null
+        sink.write({"name": "a", "current_price": None})
+        sink.write({"name": "b", "current_price": None})
+        sink.write({"name": "c", "current_price": 100})
+        sink.write({"name": "d", "current_price": None})
+    assert (sink.rows, sink.skipped) == (3, 1)
+    assert pq.read_table(path).column("name").to_pylist() == ["a", "b", "d"]
+    assert not os.path.exists(path + ".part")
+
+
+def test_jsonl_bad_row_skipped(tmp_path):
+    path = str(tmp_path / "x.jsonl")
+    loop = {}
+    loop["self"] = loop
+    with JsonlSink(path) as sink:
+        sink.write_many([{"name": "a"}, loop, {"name": "b"}])
+    assert (sink.rows, sink.skipped) == (2, 1)
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == ["a", "b"]
+
+
+def test_exception_in_with_leaves_part(tmp_path):
+    path = str(tmp_path / "x.csv")
+    with pytest.raises(RuntimeError):
+        with CsvSink(path) as sink:
+            sink.write({"name": "a"})
+            raise RuntimeError("scrape failed")
+    assert not os.path.exists(path)
+    with open(path + ".part", encoding="utf-8-sig") as f:
+        assert f.read().splitlines() == ["name", "a"]
+
+
+def test_csv_columns_from_schema(tmp_path):
+    path = str(tmp_path / "x.csv")
+    with CsvSink(path, schema=SCHEMA) as sink:
+        sink.write({"current_price": 1, "name": "a", "extra": "x"})
+    with open(path, encoding="utf-8-sig") as f:
+        assert f.read().splitlines() == ["name,current_price", "a,1"]
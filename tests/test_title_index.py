@@ -0,0 +1,37 @@
+import pandas as pd
+
+from title_index import TitleIndex
+
+TITLES = [
+    "【CP認證福利品】 iPhone 15 128GB 藍色",
+    "Apple iPhone 15 256G 天峰藍",
+    "Apple iPhone 15 128G 黑色",
+    "iPhone 14 128GB 藍",
+]
+
+
+def _index():
+    index = TitleIndex()
+    index.add_rows({"name": t} for t in TITLES)
+    return index
+
+
+def test_single_cjk_character_query():
+    assert _index().search("iphone 15 藍").tolist() == [0, 1]
+    assert _index().search("藍").tolist() == [0, 1, 3]
+
+
+def test_bigram_and_phrase_queries():
+    index = _index()
+    assert index.search("藍色 iphone").tolist() == [0]
+    assert index.search("天峰藍").tolist() == [1]
+    assert index.search("峰藍天").tolist() == []
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    _index().save(str(tmp_path))
+    loaded = TitleIndex.load(str(tmp_path))
+    assert loaded.search("iphone 15 藍").tolist() == [0, 1]
+    assert isinstance(loaded.lookup("黑色"), pd.DataFrame)
+    assert loaded.lookup("黑色")["name"].tolist() == [TITLES[2]]
+    loaded.close()
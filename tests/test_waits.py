@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from waits import Readiness, wait_any
+
+
+class FakePage:
+    def __init__(self, goto_seconds):
+        self.goto_seconds = goto_seconds
+        self.wait_timeouts = []
+
+    def goto(self, url, timeout, wait_until):
+        time.sleep(self.goto_seconds)
+
+    def evaluate(self, script, args):
+        self.wait_timeouts.append(args[-1])
+        return {"ok": True, "count": args[1]}
+
+
+def test_wait_any_rejects_empty_selectors():
+    with pytest.raises(ValueError):
+        wait_any(FakePage(0), [])
+
+
+def test_readiness_goto_shares_one_timeout():
+    page = FakePage(goto_seconds=0.3)
+    assert Readiness("li.item").goto(page, "https://example.com/", timeout=1000)
+    [wait_timeout] = page.wait_timeouts
+    assert wait_timeout <= 720
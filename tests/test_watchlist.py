@@ -0,0 +1,66 @@
+import time
+
+import watchlist
+from price_changes import ChangeTracker
+from watchlist import STARTUP_SPREAD, Watch, WatchlistRunner, load_state, save_state
+
+
+def _watch(keyword, tmp_path, **kwargs):
+    tracker = ChangeTracker(keyword, state_dir=str(tmp_path / "state"), feed_path=str(tmp_path / "feed.jsonl"))
+    return Watch(keyword, tracker=tracker, **kwargs)
+
+
+def test_observe_adapts_interval(tmp_path):
+    busy = _watch("busy", tmp_path, min_interval=100, max_interval=10000, interval=1000)
+    quiet = _watch("quiet", tmp_path, min_interval=100, max_interval=10000, interval=1000)
+    for _ in range(10):
+        busy.observe(True, 0)
+        quiet.observe(False, 0)
+    assert 100 <= busy.interval < 300
+    assert 5000 < quiet.interval <= 10000
+    assert busy.next_run == busy.interval
+
+
+def test_first_observation_is_baseline(tmp_path):
+    w = _watch("kw", tmp_path, interval=1000)
+    rate = w.change_rate
+    w.observe(None, 50)
+    assert (w.change_rate, w.interval, w.next_run, w.runs) == (rate, 1000, 1050, 1)
+
+
+def test_failed_backs_off_up_to_max(tmp_path):
+    w = _watch("kw", tmp_path, interval=1000, max_interval=3000)
+    w.failed(0)
+    assert w.interval == 2000
+    w.failed(0)
+    assert (w.interval, w.next_run) == (3000, 3000)
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "watchlist_state.json")
+    saved = _watch("saved", tmp_path, interval=1200)
+    saved.observe(True, 100)
+    save_state([saved], path)
+
+    again, new = _watch("saved", tmp_path), _watch("new", tmp_path)
+    before = time.time()
+    load_state([again, new], path)
+    assert again.state() == saved.state()
+    assert before <= new.next_run <= time.time() + STARTUP_SPREAD
+
+
+def test_slow_keyword_does_not_hold_back_others(tmp_path, monkeypatch):
+    finished = []
+
+    def fake_fetch(watch, session):
+        if watch.keyword == "slow":
+            time.sleep(0.5)
+        finished.append(watch.keyword)
+        return [], False
+
+    monkeypatch.setattr(watchlist, "fetch_http", fake_fetch)
+    monkeypatch.setattr(watchlist, "MAX_IN_FLIGHT", 2)
+    watches = [_watch(k, tmp_path) for k in ("slow", "a", "b", "c")]
+    WatchlistRunner(watches, workers=2, state_path=str(tmp_path / "s.json")).run(once=True)
+    assert finished[-1] == "slow"
+    assert all(w.runs == 1 for w in watches)
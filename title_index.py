@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+商品品名的倒排索引：查「哪些存下來的刊登同時提到 256GB + 藍色 + iPhone 15」不必每次 str.contains 全表掃描。
+
+    from title_index import TitleIndex
+
+    index = TitleIndex()
+    index.add_csv("combined_products_sync.csv")
+    index.add_csv("momo_products_sync.csv")
+    index.lookup("256GB 藍色 iPhone 15")          # DataFrame：符合的刊登
+    index.save("title_index")
+
+    index = TitleIndex.load("title_index")        # posting list 以 mmap 讀入，不必整個載進記憶體
+
+    python title_index.py build title_index combined_products_sync.csv momo_products_sync.csv
+    python title_index.py query title_index "256GB 藍色 iPhone 15"
+
+- 品名先用 product_match.normalize_titles 正規化（全形 → 半形、小寫、容量統一成 128gb）
+- 斷詞：英數字一段一個 token；中日韓文字切成相鄰兩字（bigram），建索引時每個字也另外當一個 token（unigram），
+  所以單字查詢（藍、黑）也查得到；查詢時兩個字以上的中文詞只用 bigram
+- 每個 token 的 posting list 是遞增的文件編號 array('I')；查詢從最短的 list 開始，
+  用 searchsorted 在其他 list 裡找，不必把長 list 整個讀過
+- 三個字以上的中文詞（天峰藍）bigram 都命中不代表真的連在一起，最後再用子字串確認一次
+
+存檔格式（目錄）：
+    postings.u32   所有 posting list 接在一起（uint32）
+    vocab.json     token → [起點, 長度]
+    docs.jsonl     一行一筆刊登（name 與加索引時帶的欄位）
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from product_match import CJK, normalize_titles
+
+# ====== 可調參數 ======
+INDEX_DIR = "title_index"
+DOC_COLUMNS = ["Source", "current_price", "url"]   # add_csv 時除了 name 之外一起存的欄位（有才存）
+
+POSTINGS_FILE = "postings.u32"
+VOCAB_FILE = "vocab.json"
+DOCS_FILE = "docs.jsonl"
+
+_RUNS = re.compile(rf"[{CJK}]+|[^\s{CJK}]+")
+_IS_CJK = re.compile(rf"[{CJK}]")
+
+
+def tokenize(norm, unigrams=False):
+    """
+    正規化後的品名 → token list（英數字整段、中文 bigram），保留出現順序、不重複。
+    unigrams=True（建索引用）時中文每個字也各自是一個 token。
+    """
+    tokens = []
+    for run in _RUNS.findall(norm):
+        if not _IS_CJK.match(run):
+            tokens.append(run)
+            continue
+        if len(run) == 1 or unigrams:
+            tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return list(dict.fromkeys(tokens))
+
+
+def _atomic_write(path, write):
+    tmp = path + ".part"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class TitleIndex:
+    def __init__(self):
+        self.docs = []                 # 文件編號 → dict（name + 其他欄位）
+        self._postings = {}            # token → array('I')（可追加）
+        self._vocab = None             # load() 之後：token → (起點, 長度)
+        self._flat = None              # load() 之後：整個 postings.u32 的 uint32 view
+        self._mm = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    @property
+    def vocabulary_size(self):
+        return len(self._postings) if self._vocab is None else len(self._vocab)
+
+    # ---- 建索引 ----
+    def add_rows(self, rows, name_col="name", **fields):
+        """
+        加入一批資料列（dict）；fields 會寫進每一筆（例如 file="momo_products_sync.csv"）。
+        回傳第一筆的文件編號。
+        """
+        self._thaw()
+        rows = list(rows)
+        first = len(self.docs)
+        norms = normalize_titles([r.get(name_col) for r in rows])
+        for doc_id, (row, norm) in enumerate(zip(rows, norms), start=first):
+            self.docs.append({**row, **fields})
+            for token in tokenize(norm, unigrams=True):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array("I")
+                postings.append(doc_id)        # 文件編號只增不減，list 自然是排序好的
+        return first
+
+    def add_csv(self, path, name_col="name", columns=DOC_COLUMNS):
+        """讀一個爬蟲輸出的 CSV 加進索引；每筆另記 file / row，方便回頭找原始資料。"""
+        df = pd.read_csv(path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+        keep = [name_col] + [c for c in columns if c in df.columns and c != name_col]
+        df = df[keep].assign(file=os.path.basename(path), row=range(len(df)))
+        return self.add_rows(df.to_dict("records"), name_col=name_col)
+
+    def _thaw(self):
+        """load() 進來的索引要再加資料時，先把 mmap 上的 posting list 複製成可追加的 array。"""
+        if self._vocab is None:
+            return
+        self._postings = {token: array("I", self._flat[start:start + count].tolist())
+                          for token, (start, count) in self._vocab.items()}
+        self.close()
+
+    # ---- 查詢 ----
+    def postings(self, token):
+        """某個 token 的 posting list（np.uint32，唯讀 view，不複製）。"""
+        if self._vocab is not None:
+            start, count = self._vocab.get(token, (0, 0))
+            return self._flat[start:start + count]
+        found = self._postings.get(token)
+        if not found:
+            return np.empty(0, dtype=np.uint32)
+        return np.frombuffer(found, dtype=np.uint32)
+
+    def search(self, query, verify=True):
+        """回傳同時含有 query 所有詞的文件編號（np.ndarray，遞增）。"""
+        norm = normalize_titles([query]).iloc[0]
+        tokens = tokenize(norm)
+        if not tokens:
+            return np.empty(0, dtype=np.uint32)
+        lists = sorted((self.postings(t) for t in tokens), key=len)
+        hits = np.array(lists[0])
+        for postings in lists[1:]:
+            if not len(hits):
+                break
+            pos = np.minimum(np.searchsorted(postings, hits), len(postings) - 1)
+            hits = hits[postings[pos] == hits]
+        if verify and len(hits):
+            hits = self._verify(hits, norm)
+        return hits
+
+    def _verify(self, hits, norm):
+        """三個字以上的中文詞要在品名裡真的連在一起出現。"""
+        phrases = [run for run in _RUNS.findall(norm) if _IS_CJK.match(run) and len(run) > 2]
+        if not phrases:
+            return hits
+        names = normalize_titles([self.docs[i].get("name") for i in hits])
+        ok = np.ones(len(hits), dtype=bool)
+        for phrase in phrases:
+            ok &= names.str.contains(phrase, regex=False).to_numpy()
+        return hits[ok]
+
+    def lookup(self, query, verify=True):
+        """search() 的結果轉成 DataFrame（含 doc_id 欄位）。"""
+        hits = self.search(query, verify)
+        return pd.DataFrame([{"doc_id": int(i), **self.docs[i]} for i in hits])
+
+    # ---- 存檔 / 讀檔 ----
+    def save(self, path=INDEX_DIR):
+        """寫出 postings.u32 / vocab.json / docs.jsonl（各自 .part 再換名）。"""
+        self._thaw()
+        os.makedirs(path, exist_ok=True)
+        vocab, offset = {}, 0
+        for token, postings in self._postings.items():
+            vocab[token] = [offset, len(postings)]
+            offset += len(postings)
+
+        def write_postings(f):
+            for postings in self._postings.values():
+                postings.tofile(f)
+
+        def write_docs(f):
+            for doc in self.docs:
+                f.write((json.dumps(doc, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+
+        _atomic_write(os.path.join(path, POSTINGS_FILE), write_postings)
+        _atomic_write(os.path.join(path, DOCS_FILE), write_docs)
+        _atomic_write(os.path.join(path, VOCAB_FILE),
+                      lambda f: f.write(json.dumps(vocab, ensure_ascii=False).encode("utf-8")))
+        return path
+
+    @classmethod
+    def load(cls, path=INDEX_DIR):
+        """讀回 save() 的目錄；posting list 直接 mmap，查詢時只會讀到用到的那幾段。"""
+        index = cls()
+        with open(os.path.join(path, VOCAB_FILE), encoding="utf-8") as f:
+            index._vocab = {token: tuple(span) for token, span in json.load(f).items()}
+        with open(os.path.join(path, DOCS_FILE), encoding="utf-8") as f:
+            index.docs = [json.loads(line) for line in f]
+        postings_path = os.path.join(path, POSTINGS_FILE)
+        if os.path.getsize(postings_path):
+            with open(postings_path, "rb") as f:
+                index._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index._flat = np.frombuffer(index._mm, dtype=np.uint32)
+        else:
+            index._flat = np.empty(0, dtype=np.uint32)
+        return index
+
+    def close(self):
+        """放掉 load() 的 mmap；之後只能再 add，不能查原本的資料。"""
+        self._vocab = self._flat = None
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass                   # 外面還拿著 postings() 的 view，等它被回收時一起關
+            self._mm = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="商品品名倒排索引")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="從 CSV 建索引")
+    build.add_argument("index_dir")
+    build.add_argument("csv", nargs="+")
+    query = sub.add_parser("query", help="查詢（空白分隔的詞全部都要出現）")
+    query.add_argument("index_dir")
+    query.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = TitleIndex()
+        for path in args.csv:
+            index.add_csv(path)
+        index.save(args.index_dir)
+        print(f"已建立索引：{len(index)} 筆刊登、{index.vocabulary_size} 個 token → {args.index_dir}")
+    else:
+        index = TitleIndex.load(args.index_dir)
+        found = index.lookup(args.query)
+        print(f"{len(found)} 筆符合「{args.query}」")
+        if len(found):
+            print(found.to_markdown(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+以「條件成立」取代固定秒數的等待（Playwright 同步版）。
+
+原本的 eztravel 腳本到處是 wait_for_timeout(1200)、time.sleep(0.6)、截圖前 wait_for_timeout(8000/20000)，
+網站快的時候白等，慢的時候又不夠。這裡提供幾種以事件為準的等待：
+
+- wait_dom_settled()：MutationObserver 觀察到 DOM 連續 quiet_ms 毫秒沒有變動
+- wait_for_response()：等到符合條件的網路回應（可同時執行觸發它的動作）
+- wait_url_change()：等網址跳離目前頁面（點了會換頁的按鈕之後）
+- wait_any()：多個 selector 任一個可見即通過（取代逐一 wait_for_selector 各等 8 秒）
+- wait_element_stable()：元素位置/大小連續 stable_ms 毫秒不變（動畫中的面板、日曆）
+- wait_count_stable()：selector 至少 min_count 個，且數量連續 stable_ms 毫秒不變（商品列表畫完了）
+- Readiness：把上面的條件包成各網站可重用的「可以擷取了」判斷，取代 networkidle
+  （廣告很多的購物網站 networkidle 常常要等數十秒，甚至永遠等不到）
+
+全部都不丟例外（只有 wait_any 給空的 selectors 會丟 ValueError）：條件成立回 True
+（wait_any 回傳命中的 selector，認不出是哪一個時回 ANY_UNKNOWN），逾時回 False / None，
+呼叫端照原本「失敗也繼續」的流程走。每次等待實際花了多久都記在 WAIT_LOG，
+print_wait_summary() 可在流程結束時印出來。
+"""
+
+import re
+import time
+from dataclasses import dataclass
+
+from playwright.sync_api import Error as PlaywrightError
+
+# ====== 可調參數 ======
+DOM_QUIET_MS = 300          # DOM 多久沒變動算「穩定」
+STABLE_MS = 200             # 元素位置多久沒變算「穩定」
+DEFAULT_TIMEOUT = 10000     # 毫秒
+
+ANY_UNKNOWN = "(無法確認是哪一個 selector)"   # wait_any 等到了、但回頭檢查時已經沒有任何一個可見
+
+
+@dataclass
+class WaitRecord:
+    kind: str
+    label: str
+    ok: bool
+    elapsed_ms: float
+    timeout_ms: int
+
+
+WAIT_LOG = []
+
+_SETTLE_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quiet, hard;
+    const done = ok => { obs.disconnect(); clearTimeout(quiet); clearTimeout(hard); resolve(ok); };
+    const obs = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => done(true), quietMs);
+    });
+    obs.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    quiet = setTimeout(() => done(true), quietMs);
+    hard = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+# 用 setTimeout 輪詢而不是 requestAnimationFrame：背景分頁的 rAF 會被暫停
+_STABLE_JS = """
+(el, [stableMs, timeoutMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let last = null, since = start;
+    const tick = () => {
+        const r = el.getBoundingClientRect();
+        const key = [r.x, r.y, r.width, r.height].join(',');
+        const now = performance.now();
+        if (key !== last) { last = key; since = now; }
+        if (r.width > 0 && r.height > 0 && now - since >= stableMs) return resolve(true);
+        if (now - start >= timeoutMs) return resolve(false);
+        setTimeout(tick, 16);
+    };
+    tick();
+})
+"""
+
+
+# 回傳 {ok, count}；ok 表示數量 >= minCount 且 stableMs 內沒變
+COUNT_STABLE_JS = """
+([selector, minCount, stableMs, timeoutMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let last = -1, since = start;
+    const tick = () => {
+        const n = document.querySelectorAll(selector).length;
+        const now = performance.now();
+        if (n !== last) { last = n; since = now; }
+        if (n >= minCount && now - since >= stableMs) return resolve({ ok: true, count: n });
+        if (now - start >= timeoutMs) return resolve({ ok: false, count: n });
+        setTimeout(tick, 50);
+    };
+    tick();
+})
+"""
+
+
+def record_wait(kind, label, ok, start, timeout):
+    rec = WaitRecord(kind, label or "", bool(ok), (time.perf_counter() - start) * 1000, timeout)
+    WAIT_LOG.append(rec)
+    return rec
+
+
+def is_xhr(response):
+    """常用的 wait_for_response 條件：任何 XHR / fetch 回應。"""
+    return response.request.resource_type in ("xhr", "fetch")
+
+
+def _response_matcher(match):
+    if callable(match):
+        return match
+    if isinstance(match, re.Pattern):
+        return lambda r: bool(match.search(r.url))
+    return lambda r: match in r.url
+
+
+def wait_dom_settled(page, quiet_ms=DOM_QUIET_MS, timeout=DEFAULT_TIMEOUT, label=None):
+    """等 DOM 連續 quiet_ms 毫秒沒有變動（page 或 frame 皆可）。"""
+    start = time.perf_counter()
+    try:
+        ok = page.evaluate(_SETTLE_JS, [quiet_ms, timeout])
+    except PlaywrightError:
+        # 等待途中換頁，執行環境被銷毀：等新頁面的 DOM 好了再算一次
+        try:
+            page.wait_for_load_state("domcontentloaded", timeout=timeout)
+            remaining = max(timeout - (time.perf_counter() - start) * 1000, quiet_ms)
+            ok = page.evaluate(_SETTLE_JS, [quiet_ms, int(remaining)])
+        except PlaywrightError:
+            ok = False
+    record_wait("dom", label, ok, start, timeout)
+    return bool(ok)
+
+
+def wait_for_response(page, match=is_xhr, action=None, timeout=DEFAULT_TIMEOUT, label=None):
+    """
+    等一個符合 match 的回應（match 可為網址子字串、re.Pattern 或 callable(response)）。
+    有給 action 時先開始監聽再執行 action，不會漏掉動作一送出就回來的回應。
+    回傳 Response 或 None。
+    """
+    predicate = _response_matcher(match)
+    start = time.perf_counter()
+    response = None
+    try:
+        if action is None:
+            response = page.wait_for_event("response", predicate=predicate, timeout=timeout)
+        else:
+            with page.expect_response(predicate, timeout=timeout) as info:
+                action()
+            response = info.value
+    except PlaywrightError:
+        response = None
+    record_wait("response", label, response is not None, start, timeout)
+    return response
+
+
+def wait_url_change(page, old_url=None, timeout=DEFAULT_TIMEOUT, label=None):
+    """等網址不再是 old_url（預設為呼叫當下的網址）。只比對到 hash 之前。"""
+    base = (old_url or page.url).split("#")[0]
+    start = time.perf_counter()
+    try:
+        page.wait_for_url(lambda url: url.split("#")[0] != base, timeout=timeout, wait_until="commit")
+        ok = True
+    except PlaywrightError:
+        ok = False
+    record_wait("url", label, ok, start, timeout)
+    return ok
+
+
+def wait_any(page, selectors, timeout=DEFAULT_TIMEOUT, label=None):
+    """
+    多個 selector 同時等，任一個可見就回傳那個 selector；全部逾時回 None。
+    等到之後元素又馬上消失、認不出是哪一個時回傳 ANY_UNKNOWN（仍算等到）。
+    """
+    if not selectors:
+        raise ValueError("wait_any 至少要給一個 selector")
+    start = time.perf_counter()
+    combined = None
+    for sel in selectors:
+        loc = page.locator(sel)
+        combined = loc if combined is None else combined.or_(loc)
+    hit = None
+    try:
+        combined.first.wait_for(state="visible", timeout=timeout)
+        for sel in selectors:
+            try:
+                if page.locator(sel).first.is_visible():
+                    hit = sel
+                    break
+            except PlaywrightError:
+                continue
+        hit = hit or ANY_UNKNOWN
+    except PlaywrightError:
+        hit = None
+    record_wait("any", label, hit is not None, start, timeout)
+    return hit
+
+
+def wait_element_stable(locator, stable_ms=STABLE_MS, timeout=DEFAULT_TIMEOUT, label=None):
+    """等元素出現，且位置/大小連續 stable_ms 毫秒不變（動畫結束）。"""
+    start = time.perf_counter()
+    try:
+        locator.wait_for(state="visible", timeout=timeout)
+        remaining = max(timeout - (time.perf_counter() - start) * 1000, stable_ms)
+        ok = locator.evaluate(_STABLE_JS, [stable_ms, int(remaining)])
+    except PlaywrightError:
+        ok = False
+    record_wait("stable", label, ok, start, timeout)
+    return bool(ok)
+
+
+def wait_count_stable(page, selector, min_count=1, stable_ms=STABLE_MS, timeout=DEFAULT_TIMEOUT, label=None):
+    """等 selector 至少 min_count 個，且數量連續 stable_ms 毫秒不變。"""
+    start = time.perf_counter()
+    try:
+        result = page.evaluate(COUNT_STABLE_JS, [selector, min_count, stable_ms, timeout])
+        ok = result["ok"]
+    except PlaywrightError:
+        ok = False
+    record_wait("count", label or selector, ok, start, timeout)
+    return bool(ok)
+
+
+def _remaining(start, timeout):
+    """從 start（perf_counter 秒）起算、總上限 timeout 毫秒還剩多少毫秒（至少 1）。"""
+    return max(int(timeout - (time.perf_counter() - start) * 1000), 1)
+
+
+@dataclass
+class Readiness:
+    """
+    某類頁面「可以擷取了」的條件，取代 wait_for_load_state("networkidle")：
+    - selector / min_count / stable_ms：列表節點至少 min_count 個且數量 stable_ms 內不變
+    - response：另外（或單獨）要求收到某個回應，例如搜尋 API 的 XHR（同 wait_for_response 的 match）
+
+        MOMO_SEARCH_READY = Readiness("li.listAreaLi", min_count=1, stable_ms=200)
+        ok = MOMO_SEARCH_READY.goto(page, url)
+    """
+    selector: str = None
+    min_count: int = 1
+    stable_ms: int = STABLE_MS
+    response: object = None
+    name: str = ""
+
+    def wait(self, page, timeout=DEFAULT_TIMEOUT):
+        """已經導覽完成（domcontentloaded）之後呼叫；只檢查 selector 條件。"""
+        if not self.selector:
+            return True
+        return wait_count_stable(page, self.selector, self.min_count, self.stable_ms, timeout,
+                                 label=self.name or None)
+
+    def goto(self, page, url, timeout=60000):
+        """
+        導覽到 url（domcontentloaded）並等條件成立；要等 response 時會在 goto 之前就開始監聽。
+        timeout 是整體上限：goto 用掉的時間會從條件等待裡扣掉。
+        """
+        start = time.perf_counter()
+        if self.response is None:
+            page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            return self.wait(page, _remaining(start, timeout))
+        response = wait_for_response(
+            page, self.response, timeout=timeout, label=f"{self.name or 'ready'} 回應",
+            action=lambda: page.goto(url, timeout=timeout, wait_until="domcontentloaded"))
+        return response is not None and self.wait(page, _remaining(start, timeout))
+
+    # ---------- async API（price_async 用）----------
+
+    async def wait_async(self, page, timeout=DEFAULT_TIMEOUT):
+        if not self.selector:
+            return True
+        result = await page.evaluate(COUNT_STABLE_JS, [self.selector, self.min_count, self.stable_ms, timeout])
+        return bool(result["ok"])
+
+    async def goto_async(self, page, url, timeout=60000):
+        start = time.perf_counter()
+        if self.response is None:
+            await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            return await self.wait_async(page, _remaining(start, timeout))
+        async with page.expect_response(_response_matcher(self.response), timeout=timeout):
+            await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+        return await self.wait_async(page, _remaining(start, timeout))
+
+
+def print_wait_summary(log=print):
+    """逐筆列出這次執行的所有等待與實際耗時，最後加總。"""
+    if not WAIT_LOG:
+        return
+    log("等待耗時統計：")
+    for rec in WAIT_LOG:
+        mark = "✅" if rec.ok else "⌛"
+        log(f"  {mark} {rec.kind:<8} {rec.label or '-':<16} {rec.elapsed_ms:7.0f} ms（上限 {rec.timeout_ms} ms）")
+    total = sum(rec.elapsed_ms for rec in WAIT_LOG)
+    log(f"  共 {len(WAIT_LOG)} 次，合計 {total / 1000:.2f} 秒")
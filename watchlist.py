@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+關鍵字監看排程：讀一份 watchlist，每個關鍵字照自己的間隔輪詢 momo / PChome，
+結果交給 price_changes.ChangeTracker 比對，只把降價 / 新上架 / 下架寫進變動紀錄。
+
+    python watchlist.py watchlist.json
+    python watchlist.py watchlist.json --once          # 每個關鍵字各跑一次就結束（給 cron 用）
+    python watchlist.py watchlist.json --workers 16 --debug
+
+watchlist.json（字串 = 全部用預設值）：
+    [
+        "iphone 15",
+        {"keyword": "ipad air", "sources": ["pchome"], "interval": 1800},
+        {"keyword": "switch oled", "min_interval": 600, "max_interval": 43200, "max_pages": 2}
+    ]
+
+間隔怎麼調：
+- 每次輪詢後更新「變動率」（有沒有變動的指數移動平均，0~1）
+- 間隔 = max_interval × (min_interval / max_interval) ^ 變動率：
+  常常變價的商品越來越接近 min_interval，一直沒變的慢慢退到 max_interval
+- 抓取失敗就把間隔拉長（FAIL_BACKOFF 倍），不更新變動率
+- 各關鍵字的間隔、變動率、下次時間存在 watchlist_state.json，重開後接著用
+
+資源共用：
+- 一個 heapq 依「下次輪詢時間」排好所有關鍵字；每有一個做完就回頭看 heap，把到期的立刻丟給 worker，
+  不必等同一批的其他關鍵字（同時在跑的最多 MAX_IN_FLIGHT 個）
+- HTTP（PChome API、momo 搜尋頁）丟給 worker 執行緒，共用同一個 http_session Session
+- momo 的 HTTP 結果不夠時才用瀏覽器補抓；Playwright sync API 只能在建立它的執行緒用，
+  所以瀏覽器一律在排程主執行緒上、用同一個 run_profile 的 BrowserPool。
+  限制：瀏覽器補抓是一個接一個跑的，補抓期間 worker 照常跑 HTTP，但下一個關鍵字的補抓要排隊；
+  比預定晚超過 LATE_WARN 秒才開始的關鍵字會記 log
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import browser_pool
+from http_session import get_session
+from momo_extract import absolute_url
+from momo_fetch import fetch_momo_browser, fetch_momo_http, has_real_products
+from pchome_crawl import iter_pchome_products
+from price import RESULT_COLUMNS
+from price_changes import FEED_PATH, ChangeTracker, summarize
+from price_normalize import normalize_rows, parse_price
+from run_profile import add_profile_arguments, current_profile
+
+# ====== 可調參數 ======
+STATE_PATH = "watchlist_state.json"
+SOURCES = ("momo", "pchome")
+DEFAULT_INTERVAL = 3600        # 秒；新關鍵字的起始間隔
+MIN_INTERVAL = 300
+MAX_INTERVAL = 6 * 3600
+RATE_ALPHA = 0.3               # 變動率的指數移動平均權重（越大越快反應）
+FAIL_BACKOFF = 2.0             # 抓取失敗時間隔乘上的倍數
+STARTUP_SPREAD = 60            # 啟動時把第一次輪詢隨機攤在這幾秒內，避免全部同時打出去
+HTTP_WORKERS = 8
+MAX_IN_FLIGHT = 32             # 同時在跑（排隊中 + 執行中）的關鍵字上限
+IDLE_SLEEP = 30                # 沒有到期的關鍵字時最多睡幾秒（可被 Ctrl+C 中斷）
+LATE_WARN = 60                 # 秒；關鍵字比預定晚這麼多才開始就記 log
+
+
+def log(msg: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+@dataclass
+class Watch:
+    keyword: str
+    sources: tuple = SOURCES
+    interval: float = DEFAULT_INTERVAL
+    min_interval: float = MIN_INTERVAL
+    max_interval: float = MAX_INTERVAL
+    max_pages: int = 1
+    change_rate: float = None      # None：由起始間隔反推
+    next_run: float = 0.0
+    runs: int = 0
+    changes: int = 0
+    tracker: ChangeTracker = field(default=None, repr=False)
+
+    def __post_init__(self):
+        unknown = set(self.sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"{self.keyword}：不支援的來源 {', '.join(sorted(unknown))}（可用：{', '.join(SOURCES)}）")
+        self.sources = tuple(self.sources)
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        if self.change_rate is None:
+            self.change_rate = self._rate_for(self.interval)
+        self.tracker = self.tracker or ChangeTracker(self.keyword)
+
+    def _rate_for(self, interval):
+        if self.max_interval <= self.min_interval:
+            return 0.0
+        return math.log(interval / self.max_interval) / math.log(self.min_interval / self.max_interval)
+
+    def observe(self, changed, now):
+        """一次輪詢成功：更新變動率，依它算出新間隔。changed=None 是第一次建快照，不算變動率。"""
+        self.runs += 1
+        if changed is None:
+            self.next_run = now + self.interval
+            return
+        self.changes += bool(changed)
+        self.change_rate = RATE_ALPHA * bool(changed) + (1 - RATE_ALPHA) * self.change_rate
+        self.interval = self.max_interval * (self.min_interval / self.max_interval) ** self.change_rate
+        self.next_run = now + self.interval
+
+    def failed(self, now):
+        self.interval = min(self.interval * FAIL_BACKOFF, self.max_interval)
+        self.next_run = now + self.interval
+
+    def state(self):
+        return {"interval": self.interval, "change_rate": self.change_rate, "next_run": self.next_run,
+                "runs": self.runs, "changes": self.changes}
+
+
+def load_watchlist(path):
+    """watchlist.json → Watch 的 list（同一個關鍵字只留第一筆）。"""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    watches = {}
+    for entry in entries:
+        entry = {"keyword": entry} if isinstance(entry, str) else dict(entry)
+        entry["keyword"] = entry["keyword"].strip()
+        watches.setdefault(entry["keyword"], Watch(**entry))
+    return list(watches.values())
+
+
+def load_state(watches, path=STATE_PATH):
+    """套用上次存的間隔 / 變動率 / 下次時間；新的關鍵字在 STARTUP_SPREAD 秒內隨機開始。"""
+    saved = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    now = time.time()
+    for w in watches:
+        s = saved.get(w.keyword)
+        if s:
+            w.interval = min(max(s["interval"], w.min_interval), w.max_interval)
+            w.change_rate = s["change_rate"]
+            w.next_run = s["next_run"]
+            w.runs, w.changes = s.get("runs", 0), s.get("changes", 0)
+        else:
+            w.next_run = now + random.uniform(0, STARTUP_SPREAD)
+
+
+def save_state(watches, path=STATE_PATH):
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({w.keyword: w.state() for w in watches}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+# ---- 抓取 ----
+def _momo_rows(products):
+    rows = normalize_rows({**p.to_dict(RESULT_COLUMNS), "url": absolute_url(p.url)} for p in products)
+    return [{"Source": "Momo", **row} for row in rows]
+
+
+def fetch_http(watch, session):
+    """
+    worker 執行緒：抓這個關鍵字所有「只需要 HTTP」的部分。
+    回傳 (rows, 要不要用瀏覽器補抓 momo)。
+    """
+    rows = []
+    need_browser = False
+    if "momo" in watch.sources:
+        products = fetch_momo_http(watch.keyword, session=session)
+        if has_real_products(products):
+            rows.extend(_momo_rows(products))
+        else:
+            need_browser = True
+    if "pchome" in watch.sources:
+        for item in iter_pchome_products(watch.keyword, max_pages=watch.max_pages, session=session):
+            rows.append({"Source": "PChome", "Id": item["Id"], "name": item["name"],
+                         "current_price": parse_price(item["price"]), "url": item["url"]})
+    return rows, need_browser
+
+
+class WatchlistRunner:
+    def __init__(self, watches, profile=None, workers=HTTP_WORKERS, state_path=STATE_PATH):
+        self.watches = watches
+        self.profile = profile or current_profile()
+        self.session = get_session()           # 不用磁碟快取：要的就是最新價格
+        self.pool = self.profile.pool()        # 排程主執行緒的 BrowserPool，所有 momo 瀏覽器補抓共用
+        self.workers = workers
+        self.state_path = state_path
+        self._heap = []
+        self._seq = 0
+        self._started = time.time()
+
+    def _push(self, watch):
+        self._seq += 1
+        heapq.heappush(self._heap, (watch.next_run, self._seq, watch))
+
+    def _submit_due(self, executor, in_flight):
+        """把到期的關鍵字丟給 worker，直到 in_flight 滿了或沒有到期的。"""
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now and len(in_flight) < MAX_IN_FLIGHT:
+            watch = heapq.heappop(self._heap)[2]
+            late = now - watch.next_run
+            if watch.next_run >= self._started and late > LATE_WARN:   # 啟動前就過期的不算
+                log(f"[{watch.keyword}] 比預定晚 {late:.0f} 秒才開始（worker 或瀏覽器補抓忙不過來）")
+            in_flight[executor.submit(fetch_http, watch, self.session)] = watch
+
+    def _finish(self, watch, rows, now):
+        baseline = not os.path.exists(watch.tracker.state_path)   # 第一次跑每個商品都是 new，不代表常變價
+        events = watch.tracker.update(rows)
+        watch.observe(None if baseline else bool(events), now)
+        counts = summarize(events)
+        log(f"[{watch.keyword}] {len(rows)} 筆，{'、'.join(f'{k} {v}' for k, v in counts.items()) or '沒有變動'}；"
+            f"變動率 {watch.change_rate:.2f}，{watch.interval / 60:.0f} 分鐘後再看")
+
+    def _complete(self, fut, watch):
+        """主執行緒：收一個 worker 的結果，必要時用瀏覽器補抓，更新間隔後排回 heap。"""
+        try:
+            rows, need_browser = fut.result()
+            if need_browser:               # 瀏覽器只在這條執行緒上用
+                rows.extend(_momo_rows(fetch_momo_browser(watch.keyword, pool=self.pool)))
+        except Exception as e:             # 單一關鍵字失敗不影響其他關鍵字
+            watch.failed(time.time())
+            log(f"[{watch.keyword}] 抓取失敗：{e.__class__.__name__}: {e}；{watch.interval / 60:.0f} 分鐘後重試")
+        else:
+            self._finish(watch, rows, time.time())
+        self._push(watch)
+
+    def run(self, once=False):
+        """持續輪詢直到 Ctrl+C；once=True 時每個關鍵字立刻各跑一次就結束。"""
+        if once:
+            for w in self.watches:
+                w.next_run = 0.0
+        for w in self.watches:
+            self._push(w)
+        self._started = time.time()
+        log(f"監看 {len(self.watches)} 個關鍵字（設定檔 {self.profile.name}），變動寫入 {FEED_PATH}")
+        in_flight = {}                     # future -> Watch
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while True:
+                    self._submit_due(executor, in_flight)
+                    if not in_flight:
+                        if once or not self._heap:     # once：跑過的都已排到未來，沒有到期的就是全部跑完了
+                            break
+                        time.sleep(min(max(self._heap[0][0] - time.time(), 0), IDLE_SLEEP))
+                        continue
+                    if len(in_flight) >= MAX_IN_FLIGHT or not self._heap:
+                        timeout = None             # 只能等有人做完
+                    else:
+                        timeout = min(max(self._heap[0][0] - time.time(), 0), IDLE_SLEEP)
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        self._complete(fut, in_flight.pop(fut))
+                        self._submit_due(executor, in_flight)   # 瀏覽器補抓期間到期的先交給 worker
+                    if done:
+                        save_state(self.watches, self.state_path)
+        except KeyboardInterrupt:
+            log("中斷，儲存狀態後結束")
+            save_state(self.watches, self.state_path)
+        finally:
+            browser_pool.close_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="依自適應間隔輪詢關鍵字價格，只輸出變動")
+    parser.add_argument("watchlist", help="watchlist.json")
+    parser.add_argument("--once", action="store_true", help="每個關鍵字各跑一次就結束")
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS, help="HTTP 執行緒數")
+    parser.add_argument("--state", default=STATE_PATH, help="間隔 / 變動率的狀態檔")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    watches = load_watchlist(args.watchlist)
+    load_state(watches, args.state)
+    WatchlistRunner(watches, current_profile(args.profile), args.workers, args.state).run(once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())